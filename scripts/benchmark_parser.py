@@ -0,0 +1,63 @@
+"""
+Micro-benchmark dos backends de parsing.
+Compara o tempo de parsing das páginas salvas em tests/fixtures e verifica
+que todos os backends produzem exatamente os mesmos livros.
+
+Para executar:
+    python scripts/benchmark_parser.py --iterations 200
+"""
+import argparse
+import sys
+import os
+import time
+from pathlib import Path
+
+# Adiciona src ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.scraper.backends import PARSER_BACKENDS, get_parser_backend
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+
+def load_fixtures():
+    """Carrega as páginas HTML salvas."""
+    return {path.name: path.read_text(encoding="utf-8") for path in sorted(FIXTURES_DIR.glob("*.html"))}
+
+
+def run(iterations: int):
+    """Executa o benchmark e imprime uma tabela com os resultados."""
+    pages = load_fixtures()
+    reference = None
+
+    print(f"{'backend':<14}{'páginas/s':>12}{'ms/página':>12}   saída")
+    for name in PARSER_BACKENDS:
+        backend = get_parser_backend(name)
+        if backend.name != name:
+            print(f"{name:<14}{'-':>12}{'-':>12}   indisponível")
+            continue
+
+        # Saída de referência: livros e paginador de cada página
+        output = {
+            page: (listing.books, listing.page_count, listing.next_href)
+            for page, listing in ((page, backend.parse_listing(html, "Teste")) for page, html in pages.items())
+        }
+        if reference is None:
+            reference = output
+        identical = "idêntica" if output == reference else "DIVERGENTE"
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for html in pages.values():
+                backend.parse_listing(html, "Teste")
+        elapsed = time.perf_counter() - start
+
+        total_pages = iterations * len(pages)
+        print(f"{name:<14}{total_pages / elapsed:>12.1f}{elapsed * 1000 / total_pages:>12.3f}   {identical}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos backends de parsing HTML")
+    parser.add_argument("--iterations", type=int, default=100, help="Repetições por página")
+    args = parser.parse_args()
+    run(args.iterations)
@@ -0,0 +1,231 @@
+"""
+Benchmark do scraper contra o espelho offline.
+Sobe o espelho (scripts/mirror_server.py) em um processo separado e mede,
+cada fase em um processo próprio (para isolar o pico de memória):
+
+- parser: BookParser/backends em páginas renderizadas pelo espelho, sem rede
+- scrape_category: a maior categoria do catálogo
+- scrape_all: o catálogo completo
+
+Para cada fase: páginas/s, livros/s, CPU de parsing x CPU de rede/event loop
+e pico de RSS.
+
+Para executar:
+    python scripts/benchmark_scraper.py --books 10000 --categories 50
+    python scripts/benchmark_scraper.py --books 100000 --latency-ms 20 --error-rate 0.01 --rate-limit 0
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+# Adiciona src ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# As configurações exigem DATABASE_URL, que o benchmark não usa
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from scripts.mirror_server import add_mirror_arguments, mirror_config, serve
+
+
+def free_port() -> int:
+    """Reserva uma porta livre local."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, timeout: float = 15.0):
+    """Aguarda o espelho responder."""
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Espelho não respondeu em {url}")
+
+
+def peak_rss_mb() -> float:
+    """Pico de memória residente do processo (MB)."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def children_cpu() -> float:
+    """CPU consumida pelos processos filhos já encerrados (pool de parsing)."""
+    import resource
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _quiet_logs():
+    """Silencia os logs por requisição durante as medições."""
+    import logging
+
+    logging.getLogger("books-api").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _configure(base_url: str, options: dict):
+    """Aplica as configurações do scraper no processo da fase."""
+    from src.core.config import settings
+
+    settings.SCRAPE_URL = base_url
+    settings.SCRAPE_RATE_LIMIT = options["rate_limit"]
+    settings.SCRAPE_CONCURRENCY = options["concurrency"]
+    settings.SCRAPE_MAX_CONNECTIONS = options["connections"]
+    settings.SCRAPE_MAX_KEEPALIVE = options["connections"]
+    settings.SCRAPE_PARSER_BACKEND = options["backend"]
+    settings.SCRAPE_PARSE_IN_PROCESSES = options["processes"]
+    settings.SCRAPE_DETAILS_ENABLED = options["details"]
+
+
+def _timed_scraper():
+    """Cria um BookScraper que acumula o CPU gasto no parsing feito no event loop."""
+    from src.scraper.scraper import BookScraper
+
+    scraper = BookScraper()
+    scraper.parse_cpu = 0.0
+    for name in ("parse_listing", "parse_detail"):
+        original = getattr(scraper.backend, name)
+
+        def timed(*args, _original=original):
+            start = time.thread_time()
+            try:
+                return _original(*args)
+            finally:
+                scraper.parse_cpu += time.thread_time() - start
+
+        setattr(scraper.backend, name, timed)
+    return scraper
+
+
+def phase_parser(config, options: dict) -> dict:
+    """Parsing puro das listagens renderizadas pelo espelho, sem rede."""
+    from src.scraper.backends import get_parser_backend
+    from scripts.mirror import MirrorCatalog, MirrorRenderer
+
+    _quiet_logs()
+    catalog = MirrorCatalog(config.books, config.categories)
+    renderer = MirrorRenderer(catalog)
+    size = catalog.category_size(0)
+    pages = [renderer.category_page(0, page) for page in range(1, catalog.page_count(size) + 1)]
+    pages = (pages * (1 + options["parser_pages"] // len(pages)))[:options["parser_pages"]]
+
+    backend = get_parser_backend(options["backend"])
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    books = sum(len(backend.parse_listing(html, "Teste").books) for html in pages)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return {"pages": len(pages), "books": books, "wall": wall, "cpu": cpu, "parse_cpu": cpu, "rss": peak_rss_mb()}
+
+
+def phase_scrape(config, options: dict, base_url: str, category_only: bool) -> dict:
+    """Executa scrape_category (maior categoria) ou scrape_all contra o espelho."""
+    import asyncio
+    from scripts.mirror import MirrorCatalog, mirror_totals
+
+    _quiet_logs()
+    _configure(base_url, options)
+    scraper = _timed_scraper()
+    catalog = MirrorCatalog(config.books, config.categories)
+
+    async def run_category():
+        # A categoria 0 é a maior (distribuição round-robin)
+        url = f"{base_url}/catalogue/category/books/{catalog.category_slug(0)}/index.html"
+        async with scraper.build_client() as client:
+            return await scraper.scrape_category(client, catalog.category_name(0), url)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    children_start = children_cpu()
+    books = asyncio.run(run_category() if category_only else scraper.scrape_all())
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    parse_cpu = scraper.parse_cpu + children_cpu() - children_start
+
+    if category_only:
+        pages = catalog.page_count(catalog.category_size(0))
+    else:
+        pages = mirror_totals(config)[0]
+    return {"pages": pages, "books": len(books), "wall": wall, "cpu": cpu, "parse_cpu": parse_cpu, "rss": peak_rss_mb()}
+
+
+def run_phase(function, *args) -> dict:
+    """Executa uma fase em um processo novo (pico de RSS isolado)."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(function, args)
+
+
+def report(name: str, result: dict):
+    """Imprime uma linha da tabela de resultados."""
+    wall = result["wall"] or 1e-9
+    network_cpu = max(0.0, result["cpu"] - result["parse_cpu"])
+    print(
+        f"{name:<16}{result['pages']:>9}{result['books']:>10}{wall:>9.2f}"
+        f"{result['pages'] / wall:>11.1f}{result['books'] / wall:>11.1f}"
+        f"{result['parse_cpu']:>11.2f}{network_cpu:>12.2f}{result['rss']:>10.1f}"
+    )
+
+
+def main(args):
+    """Sobe o espelho, executa as fases e imprime os resultados."""
+    config = mirror_config(args)
+    options = {
+        "rate_limit": args.rate_limit,
+        "concurrency": args.concurrency,
+        "connections": args.connections,
+        "backend": args.backend,
+        "processes": args.parse_in_processes,
+        "details": args.details,
+        "parser_pages": args.parser_pages,
+    }
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = multiprocessing.get_context("spawn").Process(target=serve, args=(config, "127.0.0.1", port), daemon=True)
+    server.start()
+    try:
+        wait_until_ready(base_url + "/index.html")
+        print(
+            f"espelho: {config.books} livros, {config.categories} categorias, latência {config.latency_ms}ms "
+            f"(+{config.jitter_ms}ms), erros {config.error_rate:.1%} | backend: {args.backend}"
+        )
+        print(
+            f"{'fase':<16}{'páginas':>9}{'livros':>10}{'tempo(s)':>9}{'páginas/s':>11}{'livros/s':>11}"
+            f"{'CPU parse':>11}{'CPU rede':>12}{'RSS(MB)':>10}"
+        )
+        phases = args.phases
+        if "parser" in phases:
+            report("parser", run_phase(phase_parser, config, options))
+        if "category" in phases:
+            report("scrape_category", run_phase(phase_scrape, config, options, base_url, True))
+        if "all" in phases:
+            report("scrape_all", run_phase(phase_scrape, config, options, base_url, False))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do scraper contra o espelho offline")
+    add_mirror_arguments(parser)
+    parser.add_argument("--phases", nargs="+", choices=["parser", "category", "all"], default=["parser", "category", "all"])
+    parser.add_argument("--rate-limit", type=float, default=0, help="Requisições/s por host (0 = sem limite)")
+    parser.add_argument("--concurrency", type=int, default=5, help="Categorias em paralelo")
+    parser.add_argument("--connections", type=int, default=10, help="Conexões HTTP simultâneas")
+    parser.add_argument("--backend", default="html.parser", help="Backend de parsing")
+    parser.add_argument("--parse-in-processes", action="store_true", help="Parsing em pool de processos")
+    parser.add_argument("--details", action="store_true", help="Inclui as páginas de detalhe")
+    parser.add_argument("--parser-pages", type=int, default=500, help="Páginas na fase de parsing puro")
+    main(parser.parse_args())
@@ -47,6 +47,17 @@ def get_recent_requests(limit=50):
     return None
 
 
+def get_scraping_metrics(limit=20):
+    """Busca a telemetria das execuções de scraping."""
+    try:
+        response = requests.get(f"{API_BASE_URL}/metrics/scraping?limit={limit}", timeout=5)
+        if response.status_code == 200:
+            return response.json()
+    except requests.exceptions.RequestException:
+        return None
+    return None
+
+
 def get_health():
     """Verifica saúde da API."""
     try:
@@ -213,6 +224,89 @@ if metrics:
 else:
     st.warning("Não foi possível carregar as métricas. Verifique a conexão com a API.")
 
+# Pool de conexões do banco
+pool = (metrics or {}).get("db_pool", {}).get("sync") or {}
+if pool.get("monitored"):
+    st.markdown("---")
+    st.markdown("## 🗄️ Pool de Conexões")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric(label="🔌 Em uso", value=f"{pool['in_use']}/{pool['size'] + max(pool['max_overflow'], 0)}")
+    with col2:
+        st.metric(label="📈 Saturação", value=f"{(pool['saturation'] or 0) * 100:.0f}%")
+    with col3:
+        st.metric(label="➕ Overflow", value=pool["overflow"])
+    with col4:
+        st.metric(label="⏱️ Espera p95 (ms)", value=pool["wait"]["p95_ms"] or 0)
+    with col5:
+        st.metric(label="⌛ Timeouts", value=pool["timeouts"])
+
+# Telemetria do scraping
+st.markdown("---")
+st.markdown("## 🕷️ Scraping")
+scraping = get_scraping_metrics()
+runs = [run for run in (scraping or {}).get("runs", []) if run.get("telemetry")]
+
+if scraping and (scraping.get("active") or runs):
+    # Job em andamento ou, na falta dele, a última execução gravada
+    current = scraping.get("active") or runs[0]
+    telemetry = current["telemetry"]
+    if scraping.get("active"):
+        st.info(f"Job em andamento: {current['job_id']}")
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric(label="📚 Livros/s", value=telemetry["books_per_second"] or 0)
+    with col2:
+        st.metric(label="⏱️ Fetch p95 (ms)", value=telemetry["fetch_latency"]["p95_ms"] or 0)
+    with col3:
+        st.metric(label="📦 Baixado (MB)", value=round(telemetry["bytes_downloaded"] / 1024 / 1024, 1))
+    with col4:
+        st.metric(label="🔁 Retries", value=telemetry["retries"])
+    with col5:
+        st.metric(label="💾 Gravação média (ms)", value=telemetry["db_write"]["avg_ms"] or 0)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("### Latência dos Fetches")
+        buckets = telemetry["fetch_latency"]["buckets"]
+        st.bar_chart(pd.DataFrame({"Faixa (ms)": list(buckets), "Fetches": list(buckets.values())}).set_index("Faixa (ms)"))
+    with col2:
+        st.markdown("### Livros/s por Categoria")
+        categories = pd.DataFrame([
+            {"Categoria": name, "Livros/s": stats["books_per_second"] or 0}
+            for name, stats in telemetry["categories"].items()
+        ])
+        if not categories.empty:
+            st.bar_chart(categories.sort_values("Livros/s").set_index("Categoria"))
+
+    if current.get("slowest_categories"):
+        st.markdown("### Categorias Mais Lentas")
+        st.dataframe(pd.DataFrame(current["slowest_categories"]), use_container_width=True, hide_index=True)
+
+    if runs:
+        # Comparação entre execuções para identificar regressões
+        st.markdown("### Execuções Recentes")
+        df_runs = pd.DataFrame([
+            {
+                "Início": run["started_at"],
+                "Status": run["status"],
+                "Páginas": run["telemetry"]["pages"],
+                "Livros": run["telemetry"]["books"],
+                "Livros/s": run["telemetry"]["books_per_second"],
+                "Fetch p50 (ms)": run["telemetry"]["fetch_latency"]["p50_ms"],
+                "Fetch p95 (ms)": run["telemetry"]["fetch_latency"]["p95_ms"],
+                "Parsing médio (ms)": run["telemetry"]["parse_time"]["avg_ms"],
+                "Retries": run["telemetry"]["retries"],
+                "Gravação média (ms)": run["telemetry"]["db_write"]["avg_ms"],
+            }
+            for run in reversed(runs)
+        ])
+        st.line_chart(df_runs.set_index("Início")[["Livros/s", "Fetch p95 (ms)"]])
+        st.dataframe(df_runs.iloc[::-1], use_container_width=True, hide_index=True)
+else:
+    st.info("Nenhuma execução de scraping registrada ainda.")
+
 # Footer
 st.markdown("---")
 st.markdown(
@@ -0,0 +1,300 @@
+"""
+Espelho offline do books.toscrape.com.
+Serve um catálogo sintético com a mesma estrutura de páginas do site
+(home, categorias paginadas, catálogo geral, páginas de detalhe e capas), em escala
+configurável e com latência e erros injetáveis. Usado em testes e benchmarks
+do scraper sem acesso à rede (fica em scripts/: não faz parte da aplicação).
+
+Os livros são gerados sob demanda a partir do índice: um catálogo de
+1 milhão de livros não ocupa memória.
+"""
+import asyncio
+import hashlib
+import random
+import re
+from dataclasses import dataclass
+from html import escape
+from typing import List, Optional, Tuple
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+
+# Livros por página de listagem (como no site original)
+PAGE_SIZE = 20
+
+# Nomes usados nas primeiras categorias; as demais são numeradas
+CATEGORY_NAMES = [
+    "Travel", "Mystery", "Historical Fiction", "Sequential Art", "Classics", "Philosophy",
+    "Romance", "Womens Fiction", "Fiction", "Childrens", "Religion", "Nonfiction", "Music",
+    "Default", "Science Fiction", "Sports and Games", "Add a comment", "Fantasy", "New Adult",
+    "Young Adult", "Science", "Poetry", "Paranormal", "Art", "Psychology", "Autobiography",
+]
+
+RATINGS = ["One", "Two", "Three", "Four", "Five"]
+WORDS = [
+    "light", "attic", "velvet", "soumission", "sharp", "objects", "requiem", "dead", "sapiens",
+    "history", "humankind", "black", "maria", "coming", "woman", "boys", "boat", "nine",
+    "americans", "quest", "gold", "olympic", "starving", "hearts", "shakespeare", "sonnets",
+]
+
+# Rotas do site: categoria paginada, catálogo geral e página de detalhe
+CATEGORY_ROUTE = re.compile(r"^/catalogue/category/books/[\w-]+_(\d+)/(index|page-(\d+))\.html$")
+CATALOGUE_ROUTE = re.compile(r"^/catalogue/page-(\d+)\.html$")
+DETAIL_ROUTE = re.compile(r"^/catalogue/[\w-]+_(\d+)/index\.html$")
+IMAGE_ROUTE = re.compile(r"^/media/cache/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{32})\.jpg$")
+
+# Capas distintas do catálogo: livros diferentes compartilham a mesma imagem
+COVER_VARIANTS = 50
+
+
+@dataclass
+class MirrorConfig:
+    """Parâmetros do espelho."""
+    books: int = 1000                  # Livros no catálogo
+    categories: int = 50               # Número de categorias
+    latency_ms: float = 0.0            # Latência fixa por resposta (ms)
+    jitter_ms: float = 0.0             # Latência aleatória adicional (0..jitter, ms)
+    error_rate: float = 0.0            # Proporção de respostas com erro
+    error_status: int = 503            # Status das respostas com erro
+    seed: Optional[int] = None         # Semente do gerador de erros/latência
+
+
+class MirrorCatalog:
+    """Catálogo sintético determinístico: cada livro é derivado do seu índice."""
+
+    def __init__(self, books: int, categories: int):
+        """Distribui `books` livros entre `categories` categorias (round-robin)."""
+        self.books = max(0, books)
+        self.categories = max(1, min(categories, max(1, books)))
+
+    def category_name(self, category: int) -> str:
+        """Nome da categoria."""
+        if category < len(CATEGORY_NAMES):
+            return CATEGORY_NAMES[category]
+        return f"Category {category + 1}"
+
+    def category_slug(self, category: int) -> str:
+        """Trecho da URL da categoria (ID do site começa em 2)."""
+        slug = self.category_name(category).lower().replace(" ", "-")
+        return f"{slug}_{category + 2}"
+
+    def category_size(self, category: int) -> int:
+        """Quantidade de livros da categoria."""
+        if category >= self.categories:
+            return 0
+        return (self.books - category + self.categories - 1) // self.categories
+
+    @staticmethod
+    def page_count(size: int) -> int:
+        """Total de páginas de uma listagem com `size` livros."""
+        return max(1, (size + PAGE_SIZE - 1) // PAGE_SIZE)
+
+    def book_category(self, index: int) -> int:
+        """Categoria do livro."""
+        return index % self.categories
+
+    def title(self, index: int) -> str:
+        """Título do livro."""
+        words = [WORDS[(index * 7 + offset * 13) % len(WORDS)] for offset in range(1 + index % 4)]
+        return f"{' '.join(words).title()} {index}"
+
+    def book_slug(self, index: int) -> str:
+        """Trecho da URL do livro."""
+        return f"{self.title(index).lower().replace(' ', '-')}_{index}"
+
+    def image_path(self, index: int) -> str:
+        """Caminho da capa (media/cache/ab/cd/<hash>.jpg)."""
+        digest = hashlib.md5(str(index).encode()).hexdigest()
+        return f"media/cache/{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+
+    def price(self, index: int) -> str:
+        """Preço formatado."""
+        return f"£{10 + (index * 7919 % 5000) / 100:.2f}"
+
+    def stock(self, index: int) -> int:
+        """Exemplares em estoque (0 = fora de estoque)."""
+        return index * 31 % 23
+
+
+class MirrorRenderer:
+    """Gera o HTML das páginas no formato do books.toscrape.com."""
+
+    def __init__(self, catalog: MirrorCatalog):
+        """Inicializa com o catálogo."""
+        self.catalog = catalog
+
+    def _nav(self, prefix: str) -> str:
+        """Barra lateral com todas as categorias (presente em todas as listagens)."""
+        items = "".join(
+            f'<li><a href="{prefix}catalogue/category/books/{self.catalog.category_slug(c)}/index.html">'
+            f"{escape(self.catalog.category_name(c))}</a></li>"
+            for c in range(self.catalog.categories)
+        )
+        return (
+            '<div class="side_categories"><ul class="nav nav-list"><li>'
+            f'<a href="{prefix}catalogue/category/books_1/index.html">Books</a><ul>{items}</ul></li></ul></div>'
+        )
+
+    def _pod(self, index: int, link_prefix: str, media_prefix: str) -> str:
+        """Card de um livro na listagem."""
+        catalog = self.catalog
+        title = escape(catalog.title(index))
+        href = f"{link_prefix}{catalog.book_slug(index)}/index.html"
+        availability = "In stock" if catalog.stock(index) else "Out of stock"
+        return (
+            '<li class="col-xs-6 col-sm-4 col-md-3 col-lg-3"><article class="product_pod">'
+            f'<div class="image_container"><a href="{href}"><img src="{media_prefix}{catalog.image_path(index)}" '
+            f'alt="{title}" class="thumbnail"></a></div>'
+            f'<p class="star-rating {RATINGS[index % 5]}"><i class="icon-star"></i></p>'
+            f'<h3><a href="{href}" title="{title}">{title}</a></h3>'
+            f'<div class="product_price"><p class="price_color">{catalog.price(index)}</p>'
+            f'<p class="instock availability"><i class="icon-ok"></i> {availability}</p>'
+            '<form><button type="submit" class="btn btn-primary btn-block">Add to basket</button></form>'
+            "</div></article></li>"
+        )
+
+    def _listing(self, title: str, indexes: List[int], page: int, pages: int, prefix: str,
+                 link_prefix: str, media_prefix: str) -> str:
+        """Página de listagem com barra lateral, cards e paginador."""
+        pods = "".join(self._pod(index, link_prefix, media_prefix) for index in indexes)
+        pager = ""
+        if pages > 1:
+            previous = f'<li class="previous"><a href="page-{page - 1}.html">previous</a></li>' if page > 1 else ""
+            following = f'<li class="next"><a href="page-{page + 1}.html">next</a></li>' if page < pages else ""
+            pager = f'<ul class="pager">{previous}<li class="current">Page {page} of {pages}</li>{following}</ul>'
+        return (
+            f"<!DOCTYPE html><html><head><title>{escape(title)} | Books to Scrape - Sandbox</title></head>"
+            f'<body><div class="container-fluid page"><div class="page_inner"><div class="row">'
+            f'<aside class="sidebar col-sm-4 col-md-3">{self._nav(prefix)}</aside>'
+            f'<div class="col-sm-8 col-md-9"><div class="page-header"><h1>{escape(title)}</h1></div>'
+            f'<section><ol class="row">{pods}</ol><div>{pager}</div></section></div>'
+            "</div></div></div></body></html>"
+        )
+
+    def home(self) -> str:
+        """Home: primeira página do catálogo geral."""
+        indexes = list(range(min(PAGE_SIZE, self.catalog.books)))
+        return self._listing("All products", indexes, 1, 1, "", "catalogue/", "")
+
+    def category_page(self, category: int, page: int) -> Optional[str]:
+        """Página `page` da categoria, ou None se não existir."""
+        catalog = self.catalog
+        size = catalog.category_size(category)
+        pages = catalog.page_count(size)
+        if size == 0 or not 1 <= page <= pages:
+            return None
+        positions = range((page - 1) * PAGE_SIZE, min(page * PAGE_SIZE, size))
+        indexes = [category + position * catalog.categories for position in positions]
+        return self._listing(catalog.category_name(category), indexes, page, pages, "../../../../",
+                             "../../../", "../../../../")
+
+    def catalogue_page(self, page: int) -> Optional[str]:
+        """Página `page` do catálogo geral, ou None se não existir."""
+        catalog = self.catalog
+        pages = catalog.page_count(catalog.books)
+        if catalog.books == 0 or not 1 <= page <= pages:
+            return None
+        indexes = list(range((page - 1) * PAGE_SIZE, min(page * PAGE_SIZE, catalog.books)))
+        return self._listing("All products", indexes, page, pages, "../", "", "../")
+
+    def detail(self, index: int) -> Optional[str]:
+        """Página de detalhe do livro, ou None se não existir."""
+        catalog = self.catalog
+        if not 0 <= index < catalog.books:
+            return None
+        title = escape(catalog.title(index))
+        stock = catalog.stock(index)
+        availability = f"In stock ({stock} available)" if stock else "Out of stock"
+        description = escape(" ".join(WORDS[(index + offset) % len(WORDS)] for offset in range(60)))
+        rows = [
+            ("UPC", hashlib.md5(f"upc-{index}".encode()).hexdigest()[:16]),
+            ("Product Type", "Books"),
+            ("Price (excl. tax)", catalog.price(index)),
+            ("Price (incl. tax)", catalog.price(index)),
+            ("Tax", "£0.00"),
+            ("Availability", availability),
+            ("Number of reviews", str(index % 7)),
+        ]
+        table = "".join(f"<tr><th>{name}</th><td>{value}</td></tr>" for name, value in rows)
+        return (
+            f"<!DOCTYPE html><html><head><title>{title} | Books to Scrape - Sandbox</title></head><body>"
+            f'<article class="product_page"><div class="row"><div class="col-sm-6 product_main"><h1>{title}</h1>'
+            f'<p class="price_color">{catalog.price(index)}</p>'
+            f'<p class="instock availability"><i class="icon-ok"></i> {availability}</p>'
+            f'<p class="star-rating {RATINGS[index % 5]}"></p></div></div>'
+            '<div id="product_description" class="sub-header"><h2>Product Description</h2></div>'
+            f"<p>{description}</p>"
+            '<div class="sub-header"><h2>Product Information</h2></div>'
+            f'<table class="table table-striped">{table}</table></article></body></html>'
+        )
+
+    @staticmethod
+    def cover(path: str) -> Optional[bytes]:
+        """Capa (bytes no formato JPEG) do caminho, ou None (404)."""
+        match = IMAGE_ROUTE.match(path)
+        if not match:
+            return None
+        variant = int(match.group(1), 16) % COVER_VARIANTS
+        payload = hashlib.sha256(f"cover-{variant}".encode()).digest() * 32
+        return b"\xff\xd8\xff\xe0" + payload + b"\xff\xd9"
+
+    def render(self, path: str) -> Optional[str]:
+        """Renderiza a página do caminho, ou None (404)."""
+        if path in ("/", "/index.html"):
+            return self.home()
+        match = CATEGORY_ROUTE.match(path)
+        if match:
+            return self.category_page(int(match.group(1)) - 2, int(match.group(3) or 1))
+        match = CATALOGUE_ROUTE.match(path)
+        if match:
+            return self.catalogue_page(int(match.group(1)))
+        match = DETAIL_ROUTE.match(path)
+        if match:
+            return self.detail(int(match.group(1)))
+        return None
+
+
+def create_mirror_app(config: Optional[MirrorConfig] = None) -> FastAPI:
+    """
+    Cria a aplicação do espelho.
+    Pode ser servida pelo uvicorn (mirror_server.py) ou usada em
+    processo com httpx.ASGITransport.
+    """
+    config = config or MirrorConfig()
+    renderer = MirrorRenderer(MirrorCatalog(config.books, config.categories))
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Books to Scrape - espelho offline", docs_url=None, redoc_url=None, openapi_url=None)
+    app.state.config = config
+    app.state.requests = 0
+
+    @app.get("/{path:path}")
+    async def serve(path: str, request: Request):
+        """Serve qualquer página do catálogo, com latência e erros injetados."""
+        app.state.requests += 1
+        delay = config.latency_ms + (rng.uniform(0, config.jitter_ms) if config.jitter_ms else 0)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if config.error_rate and rng.random() < config.error_rate:
+            return Response(status_code=config.error_status, headers={"Retry-After": "0"})
+
+        page = renderer.render(request.url.path)
+        if page is not None:
+            content, media_type = page.encode(), "text/html; charset=utf-8"
+        else:
+            content, media_type = renderer.cover(request.url.path), "image/jpeg"
+        if content is None:
+            return Response(status_code=404)
+
+        # O catálogo é determinístico: o ETag depende só do conteúdo
+        etag = f'"{hashlib.md5(content).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content, media_type=media_type, headers={"ETag": etag})
+
+    return app
+
+
+def mirror_totals(config: MirrorConfig) -> Tuple[int, int]:
+    """Retorna (páginas de listagem das categorias, livros) do catálogo."""
+    catalog = MirrorCatalog(config.books, config.categories)
+    pages = sum(catalog.page_count(catalog.category_size(c)) for c in range(catalog.categories))
+    return pages, catalog.books
@@ -0,0 +1,62 @@
+"""
+Servidor do espelho offline do books.toscrape.com.
+Serve um catálogo sintético para testes de carga e regressão do scraper.
+
+Para executar:
+    python scripts/mirror_server.py --books 100000 --categories 50 --latency-ms 20 --error-rate 0.01
+    SCRAPE_URL=http://127.0.0.1:8001 python scripts/run_scraper.py
+"""
+import argparse
+import sys
+import os
+
+# Adiciona src ao path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def add_mirror_arguments(parser: argparse.ArgumentParser):
+    """Opções do catálogo sintético (compartilhadas com o benchmark)."""
+    parser.add_argument("--books", type=int, default=1000, help="Livros no catálogo")
+    parser.add_argument("--categories", type=int, default=50, help="Número de categorias")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latência fixa por resposta (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Latência aleatória adicional (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proporção de respostas com erro (0-1)")
+    parser.add_argument("--error-status", type=int, default=503, help="Status HTTP das respostas com erro")
+    parser.add_argument("--seed", type=int, default=None, help="Semente da latência e dos erros")
+
+
+def mirror_config(args):
+    """Monta a MirrorConfig a partir dos argumentos."""
+    from scripts.mirror import MirrorConfig
+
+    return MirrorConfig(
+        books=args.books,
+        categories=args.categories,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed
+    )
+
+
+def serve(config, host: str, port: int):
+    """Sobe o espelho com o uvicorn."""
+    import uvicorn
+    from scripts.mirror import create_mirror_app
+
+    uvicorn.run(create_mirror_app(config), host=host, port=port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Espelho offline do books.toscrape.com")
+    add_mirror_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço")
+    parser.add_argument("--port", type=int, default=8001, help="Porta")
+    args = parser.parse_args()
+
+    # As configurações exigem DATABASE_URL, que o espelho não usa
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    config = mirror_config(args)
+    print(f"Espelho em http://{args.host}:{args.port} ({config.books} livros, {config.categories} categorias)")
+    serve(config, args.host, args.port)
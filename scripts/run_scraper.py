@@ -1,7 +1,19 @@
 """
 Script para executar o pipeline de scraping.
 Extrai livros do site e salva no banco de dados.
+
+Uso:
+    python scripts/run_scraper.py            # Crawl completo do site
+    python scripts/run_scraper.py --resume   # Retoma a última execução interrompida
+    python scripts/run_scraper.py --resume <run_id>
+    python scripts/run_scraper.py --reparse  # Reconstrói o catálogo a partir do arquivo de HTML
+    python scripts/run_scraper.py --workers 4            # Distribui as categorias entre 4 processos
+    python scripts/run_scraper.py --workers 4 --resume   # Retoma a última execução com workers
+    python scripts/run_scraper.py --join <run_id>        # Worker adicional (ex.: em outra máquina)
+    python scripts/run_scraper.py --join <run_id> --workers 6  # Idem, dividindo o orçamento por host entre 6 workers
+    python scripts/run_scraper.py --rollback  # Restaura a versão anterior do catálogo (books_previous)
 """
+import argparse
 import asyncio
 import sys
 import os
@@ -9,25 +21,111 @@ import os
 # Adiciona src ao path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.scraper.scraper import BookScraper
-from src.scraper.exporter import DataExporter
+from src.scraper.pipeline import ScrapePipeline
+from src.core.config import settings
 from src.core.logging import logger
 
-async def run():
-    """Executa o pipeline de scraping."""
+async def run(resume=False):
+    """Executa o pipeline de scraping (ou retoma uma execução interrompida)."""
     logger.info("Iniciando Pipeline de Scraping...")
-    scraper = BookScraper()
     try:
-        # Extrai livros do site
-        books = await scraper.scrape_all()
-        logger.info(f"Raspagem concluída com sucesso: {len(books)} livros.")
-        
-        # Salva no banco de dados
-        exporter = DataExporter()
-        exporter.export_to_db(books)
+        # Extrai livros do site e salva no banco em lotes, conforme são raspados
+        result = await ScrapePipeline(resume=resume).run()
+        logger.info(f"Raspagem concluída com sucesso: {result.books} livros (execução {result.run_id}).")
         
     except Exception as e:
         logger.error(f"Pipeline falhou: {e}")
 
+async def run_sharded(workers, resume=False):
+    """Executa o crawl distribuindo as categorias entre processos workers."""
+    from src.scraper.sharding import ShardCoordinator
+
+    logger.info(f"Iniciando Pipeline de Scraping com {workers} workers...")
+    try:
+        result = await ShardCoordinator(workers, resume=resume).run()
+        logger.info(f"Raspagem concluída: {result.books} livros (execução {result.run_id}).")
+    except Exception as e:
+        logger.error(f"Pipeline falhou: {e}")
+
+async def join(run_id, share=1):
+    """Consome categorias de uma execução já publicada na fila (SCRAPE_SHARD_QUEUE_PATH)."""
+    import socket
+    from src.scraper.sharding import ShardQueue, run_worker
+
+    worker = f"{socket.gethostname()}-{os.getpid()}"
+    try:
+        await run_worker(ShardQueue(settings.SCRAPE_SHARD_QUEUE_PATH), run_id, worker, share=share)
+    except Exception as e:
+        logger.error(f"Worker {worker} falhou: {e}")
+
+async def reparse():
+    """Reconstrói o catálogo a partir do arquivo de HTML, sem acesso à rede."""
+    from src.scraper.archive import RawArchive
+    from src.scraper.reparse import iter_archived_pages
+
+    logger.info(f"Reprocessando arquivo de HTML em {settings.SCRAPE_ARCHIVE_PATH}...")
+    archive = RawArchive(settings.SCRAPE_ARCHIVE_PATH)
+    try:
+        pages = iter_archived_pages(archive, settings.SCRAPE_PARSER_BACKEND, settings.SCRAPE_PARSE_WORKERS)
+        result = await ScrapePipeline().run(pages)
+        logger.info(f"Reprocessamento concluído: {result.books} livros.")
+    except Exception as e:
+        logger.error(f"Reprocessamento falhou: {e}")
+    finally:
+        archive.close()
+
+def rollback():
+    """Troca o catálogo publicado pela versão anterior (DB_STAGED_SWAP)."""
+    from src.core.database import engine
+    from src.repository.dataset_swap import DatasetSwap
+
+    swap = DatasetSwap(engine)
+    if swap.rollback():
+        logger.info(f"Versões do catálogo: {swap.versions()}")
+
 if __name__ == "__main__":
-    asyncio.run(run())
+    parser = argparse.ArgumentParser(description="Pipeline de scraping de livros")
+    parser.add_argument(
+        "--reparse",
+        action="store_true",
+        help="Reconstrói o catálogo a partir do arquivo de HTML (SCRAPE_ARCHIVE_PATH), sem rede"
+    )
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const=True,
+        default=False,
+        metavar="RUN_ID",
+        help="Retoma a última execução interrompida (ou a execução informada) a partir do checkpoint"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help=(
+            "Distribui as categorias entre N processos workers. O orçamento por host é dividido entre eles: "
+            "cada worker usa SCRAPE_RATE_LIMIT/N req/s e SCRAPE_SITE_CONCURRENCY//N requisições simultâneas. "
+            "Com --join, N é o total de workers da execução, para dividir o orçamento da mesma forma"
+        )
+    )
+    parser.add_argument(
+        "--join",
+        metavar="RUN_ID",
+        help="Atua como worker de uma execução com workers já iniciada (fila em SCRAPE_SHARD_QUEUE_PATH)"
+    )
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Restaura a versão anterior do catálogo (books_previous); repetir desfaz o rollback"
+    )
+    args = parser.parse_args()
+    if args.rollback:
+        rollback()
+    elif args.reparse:
+        asyncio.run(reparse())
+    elif args.join:
+        asyncio.run(join(args.join, max(1, args.workers)))
+    elif args.workers > 1:
+        asyncio.run(run_sharded(args.workers, args.resume))
+    else:
+        asyncio.run(run(args.resume))
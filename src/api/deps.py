@@ -2,35 +2,79 @@
 Dependências da API (Injeção de Dependências).
 Fornece instâncias de repositórios e serviços para os endpoints.
 """
+from typing import Any
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from src.core.database import get_db
+from starlette.concurrency import run_in_threadpool
+from src.core.config import settings
+from src.core.database import SessionLocal, get_async_sessionmaker, get_db
 from src.repository.sqlalchemy_repository import SQLAlchemyBookRepository
-from src.services.book_service import BookService
-from src.services.stats_service import StatsService
-from src.services.ml_service import MLService
+from src.services.book_service import AsyncBookService, BookService
+from src.services.stats_service import AsyncStatsService, StatsService
+from src.services.ml_service import AsyncMLService, MLService
 from src.services.auth_service import verify_token, get_user_by_username
 from src.models.user import UserModel
 
 # Esquema OAuth2 para extração do token do header Authorization
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-def get_book_repository(db: Session = Depends(get_db)) -> SQLAlchemyBookRepository:
-    """Retorna uma instância do repositório de livros."""
+
+class ThreadpoolService:
+    """
+    Expõe os métodos de um serviço síncrono como corrotinas executadas no
+    threadpool: as rotas `async def` do catálogo funcionam sem DB_ASYNC.
+    """
+
+    def __init__(self, service: Any):
+        """Inicializa com o serviço síncrono."""
+        self.service = service
+
+    def __getattr__(self, name: str):
+        """Retorna o método do serviço como corrotina."""
+        method = getattr(self.service, name)
+
+        async def call(*args, **kwargs):
+            return await run_in_threadpool(method, *args, **kwargs)
+        return call
+
+
+async def get_catalog_db():
+    """Sessão das rotas do catálogo: AsyncSession com DB_ASYNC, senão a Session síncrona."""
+    if settings.DB_ASYNC:
+        async with get_async_sessionmaker()() as db:
+            yield db
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+async def get_book_repository(db: Any = Depends(get_catalog_db)) -> Any:
+    """Retorna uma instância do repositório de livros (assíncrono com DB_ASYNC)."""
+    if settings.DB_ASYNC:
+        from src.repository.async_repository import AsyncSQLAlchemyBookRepository
+        return AsyncSQLAlchemyBookRepository(db)
     return SQLAlchemyBookRepository(db)
 
-def get_book_service(repo: SQLAlchemyBookRepository = Depends(get_book_repository)) -> BookService:
+async def get_book_service(repo: Any = Depends(get_book_repository)) -> AsyncBookService:
     """Retorna uma instância do serviço de livros."""
-    return BookService(repo)
+    if settings.DB_ASYNC:
+        return AsyncBookService(repo)
+    return ThreadpoolService(BookService(repo))
 
-def get_stats_service(repo: SQLAlchemyBookRepository = Depends(get_book_repository)) -> StatsService:
+async def get_stats_service(repo: Any = Depends(get_book_repository)) -> AsyncStatsService:
     """Retorna uma instância do serviço de estatísticas."""
-    return StatsService(repo)
+    if settings.DB_ASYNC:
+        return AsyncStatsService(repo)
+    return ThreadpoolService(StatsService(repo))
 
-def get_ml_service(repo: SQLAlchemyBookRepository = Depends(get_book_repository)) -> MLService:
+async def get_ml_service(repo: Any = Depends(get_book_repository)) -> AsyncMLService:
     """Retorna uma instância do serviço de ML."""
-    return MLService(repo)
+    if settings.DB_ASYNC:
+        return AsyncMLService(repo)
+    return ThreadpoolService(MLService(repo))
 
 def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -2,10 +2,11 @@
 Endpoints relacionados a livros.
 Fornece operações de listagem, busca e filtros.
 """
-from fastapi import APIRouter, Depends, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
 from typing import List, Optional
 from src.api.deps import get_book_service
-from src.services.book_service import BookService
+from src.services.book_service import AsyncBookService
+from src.repository.book_query import BookQuery, SORT_KEYS
 from src.schemas.responses import BookResponse, PaginatedBooks
 from src.core.exceptions import handle_not_found_exception
 
@@ -15,35 +16,74 @@ router = APIRouter()
     "/",
     response_model=PaginatedBooks,
     summary="Listar livros",
-    description="Retorna uma lista paginada de todos os livros disponíveis."
+    description="Retorna uma lista paginada de todos os livros disponíveis. Para percorrer o catálogo, prefira o `cursor` retornado em `next_cursor`: seu custo não cresce com a profundidade."
 )
-def list_books(
+async def list_books(
     page: int = Query(1, ge=1, description="Número da página"),
     limit: int = Query(50, ge=1, le=100, description="Quantidade de itens por página"),
-    service: BookService = Depends(get_book_service)
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (`next_cursor` da resposta anterior); ignora `page`"),
+    service: AsyncBookService = Depends(get_book_service)
 ):
-    """Lista todos os livros com paginação."""
-    books, total = service.get_books_paginated(page, limit)
+    """Lista todos os livros com paginação (por página ou por cursor)."""
+    try:
+        result = await service.get_books_paginated(page, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return PaginatedBooks(
-        total=total,
-        page=page,
+        total=result.total,
+        total_estimated=result.total_estimated,
+        page=None if cursor else page,
         limit=limit,
-        items=[book.dict() for book in books]
+        next_cursor=result.next_cursor,
+        items=[book.dict() for book in result.items]
     )
 
 @router.get(
     "/search",
     response_model=List[BookResponse],
     summary="Buscar livros",
-    description="Busca livros por título e/ou categoria."
+    description="Busca livros por título e/ou categoria. A busca por título usa o índice de texto do banco: resultados ordenados por relevância, palavras incompletas e tolerância a erros de digitação."
 )
-def search_books(
-    title: Optional[str] = Query(None, description="Título do livro (busca parcial)"),
+async def search_books(
+    title: Optional[str] = Query(None, description="Palavras do título (prefixos e erros de digitação são aceitos)"),
     category: Optional[str] = Query(None, description="Categoria do livro"),
-    service: BookService = Depends(get_book_service)
+    limit: Optional[int] = Query(
+        None, ge=1, le=100,
+        description="Quantidade máxima de livros (padrão: 50 na busca por título; sem título, todos os livros da categoria)"
+    ),
+    service: AsyncBookService = Depends(get_book_service)
 ):
     """Busca livros por título ou categoria."""
-    books = service.search_books(title, category)
+    books = await service.search_books(title, category, limit)
+    return [book.dict() for book in books]
+
+@router.get(
+    "/query",
+    response_model=List[BookResponse],
+    summary="Consultar livros",
+    description="Combina filtros (título, categoria, faixa de preço, avaliação mínima e disponibilidade) com uma ordenação e um limite, executados no banco."
+)
+async def query_books(
+    title: Optional[str] = Query(None, description="Título do livro (busca parcial)"),
+    category: Optional[str] = Query(None, description="Categoria do livro"),
+    min_price: Optional[float] = Query(None, ge=0, description="Preço mínimo"),
+    max_price: Optional[float] = Query(None, ge=0, description="Preço máximo"),
+    min_rating: Optional[int] = Query(None, ge=1, le=5, description="Avaliação mínima"),
+    available: Optional[bool] = Query(None, description="Apenas disponíveis (true) ou indisponíveis (false)"),
+    sort: str = Query("id", description=f"Ordenação: {', '.join(SORT_KEYS)} (prefixo '-' = decrescente)"),
+    limit: int = Query(50, ge=1, le=100, description="Quantidade de livros a retornar"),
+    offset: int = Query(0, ge=0, description="Livros a pular"),
+    service: AsyncBookService = Depends(get_book_service)
+):
+    """Consulta livros com filtros combinados."""
+    query = BookQuery(
+        title=title, category=category, min_price=min_price, max_price=max_price,
+        min_rating=min_rating, available=available, sort=sort, limit=limit, offset=offset
+    )
+    try:
+        books = await service.query_books(query)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     return [book.dict() for book in books]
 
 @router.get(
@@ -52,29 +92,31 @@ def search_books(
     summary="Livros mais bem avaliados",
     description="Retorna os livros com as melhores avaliações."
 )
-def get_top_rated(
+async def get_top_rated(
     limit: int = Query(10, ge=1, le=50, description="Quantidade de livros a retornar"),
-    service: BookService = Depends(get_book_service)
+    service: AsyncBookService = Depends(get_book_service)
 ):
     """Retorna os livros mais bem avaliados."""
-    books = service.get_top_rated(limit)
+    books = await service.get_top_rated(limit)
     return [book.dict() for book in books]
 
 @router.get(
     "/price-range",
     response_model=List[BookResponse],
     summary="Filtrar por faixa de preço",
-    description="Retorna livros dentro de uma faixa de preço específica."
+    description="Retorna livros dentro de uma faixa de preço específica, do mais barato ao mais caro, paginados por limit e offset."
 )
-def get_by_price_range(
+async def get_by_price_range(
     min_price: float = Query(0.0, description="Preço mínimo"),
     max_price: float = Query(1000.0, description="Preço máximo"),
-    service: BookService = Depends(get_book_service)
+    limit: int = Query(50, ge=1, le=100, description="Quantidade de livros a retornar"),
+    offset: int = Query(0, ge=0, description="Livros a pular"),
+    service: AsyncBookService = Depends(get_book_service)
 ):
     """Filtra livros por faixa de preço."""
     if min_price > max_price:
         return []
-    books = service.get_by_price_range(min_price, max_price)
+    books = await service.get_by_price_range(min_price, max_price, limit, offset)
     return [book.dict() for book in books]
 
 @router.get(
@@ -83,12 +125,12 @@ def get_by_price_range(
     summary="Detalhes do livro",
     description="Retorna os detalhes de um livro específico pelo seu ID."
 )
-def get_book(
+async def get_book(
     book_id: int = Path(..., ge=1, description="ID único do livro"),
-    service: BookService = Depends(get_book_service)
+    service: AsyncBookService = Depends(get_book_service)
 ):
     """Busca um livro pelo ID."""
-    book = service.get_book_by_id(book_id)
+    book = await service.get_book_by_id(book_id)
     if not book:
         handle_not_found_exception(f"Livro com id {book_id} não encontrado")
     return book.dict()
@@ -0,0 +1,35 @@
+"""
+Endpoint das capas dos livros.
+Serve as cópias locais baixadas pelo scraper (SCRAPE_IMAGES_ENABLED).
+"""
+from fastapi import APIRouter, Path, Request
+from fastapi.responses import FileResponse, Response
+from src.scraper.images import MEDIA_TYPES, image_file
+from src.core.config import settings
+from src.core.exceptions import handle_not_found_exception
+
+router = APIRouter()
+
+# O conteúdo de um hash nunca muda: pode ficar em cache por um ano
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get(
+    "/{image_hash}",
+    summary="Capa do livro",
+    description="Retorna a cópia local da capa pelo hash informado em `image_hash` do livro."
+)
+def get_image(
+    request: Request,
+    image_hash: str = Path(..., pattern="^[0-9a-f]{64}$", description="SHA-256 da imagem")
+):
+    """Serve a imagem armazenada com cabeçalhos de cache de longa duração."""
+    path = image_file(settings.SCRAPE_IMAGES_PATH, image_hash)
+    if path is None:
+        handle_not_found_exception(f"Imagem {image_hash} não encontrada")
+
+    etag = f'"{image_hash}"'
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=MEDIA_TYPES[path.suffix], headers=headers)
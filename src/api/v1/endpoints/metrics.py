@@ -2,22 +2,39 @@
 Endpoints de métricas e monitoramento.
 Fornece acesso às métricas de performance da API.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
 from typing import Dict, Any, List
+from src.core import database
+from src.core.database import get_db
 from src.core.middleware import metrics_store
+from src.core.pool_metrics import pool_status
+from src.services.scrape_metrics_service import ScrapeMetricsService
 
 router = APIRouter()
 
 
+def db_pool_metrics() -> Dict[str, Any]:
+    """Estado dos pools de conexões (o assíncrono só existe com DB_ASYNC, após o primeiro uso)."""
+    async_engine = database._async_engine
+    return {
+        "sync": pool_status(database.engine),
+        "async": pool_status(async_engine.sync_engine) if async_engine is not None else None
+    }
+
+
 @router.get(
     "/",
     response_model=Dict[str, Any],
     summary="Métricas consolidadas",
-    description="Retorna métricas consolidadas de performance da API: total de requisições, erros, tempo médio por endpoint."
+    description=(
+        "Retorna métricas consolidadas de performance da API: total de requisições, erros, tempo médio por endpoint "
+        "e estado do pool de conexões do banco."
+    )
 )
 def get_metrics():
     """Retorna métricas de performance da API."""
-    return metrics_store.get_metrics()
+    return {**metrics_store.get_metrics(), "db_pool": db_pool_metrics()}
 
 
 @router.get(
@@ -40,14 +57,49 @@ def get_recent_requests(limit: int = 100):
 def get_summary():
     """Retorna resumo das métricas."""
     metrics = metrics_store.get_metrics()
+    pool = pool_status(database.engine)
     return {
         "status": "online",
         "total_requests": metrics["summary"]["total_requests"],
         "error_rate": f"{metrics['summary']['error_rate']}%",
         "uptime_since": metrics["summary"]["uptime_since"],
+        "db_pool": {key: pool.get(key) for key in ("in_use", "saturation", "timeouts")},
         "top_endpoints": sorted(
             metrics["by_endpoint"].items(),
             key=lambda x: x[1]["requests"],
             reverse=True
         )[:5]
     }
+
+
+@router.get(
+    "/db-pool",
+    response_model=Dict[str, Any],
+    summary="Pool de conexões do banco",
+    description=(
+        "Retorna a configuração e a ocupação dos pools de conexões (síncrono e, com DB_ASYNC, assíncrono): "
+        "conexões em uso, ociosas e em overflow, saturação, tempo de espera pelo checkout (histograma e "
+        "percentis), timeouts e conexões descartadas pelo pre-ping."
+    )
+)
+def get_db_pool_metrics():
+    """Retorna o estado dos pools de conexões do banco."""
+    return db_pool_metrics()
+
+
+@router.get(
+    "/scraping",
+    response_model=Dict[str, Any],
+    summary="Métricas do scraping",
+    description=(
+        "Retorna a telemetria do job de scraping em andamento e das últimas execuções: latência dos fetches "
+        "(histograma e percentis), bytes baixados, retries, tempo de parsing por página, livros/s por categoria "
+        "e tempo de gravação no banco."
+    )
+)
+def get_scraping_metrics(
+    limit: int = Query(10, ge=1, le=100, description="Quantidade de execuções recentes"),
+    db: Session = Depends(get_db)
+):
+    """Retorna as métricas das execuções de scraping."""
+    return ScrapeMetricsService(db).get_metrics(limit)
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, Query
 from typing import List, Dict, Any
 from pydantic import BaseModel
 from src.api.deps import get_ml_service
-from src.services.ml_service import MLService
+from src.services.ml_service import AsyncMLService
 
 
 class PredictionInput(BaseModel):
@@ -30,11 +30,11 @@ router = APIRouter()
     summary="Features para ML",
     description="Retorna dados dos livros formatados como features para inferência de modelos. Inclui preço normalizado, código da categoria e avaliação."
 )
-def get_ml_features(
-    service: MLService = Depends(get_ml_service)
+async def get_ml_features(
+    service: AsyncMLService = Depends(get_ml_service)
 ):
     """Retorna features prontas para inferência."""
-    return service.get_features()
+    return await service.get_features()
 
 
 @router.get(
@@ -43,12 +43,12 @@ def get_ml_features(
     summary="Dataset para treinamento",
     description="Retorna dataset completo para treinamento de modelos ML, incluindo split treino/teste, features normalizadas e metadados."
 )
-def get_training_data(
+async def get_training_data(
     test_size: float = Query(0.2, ge=0.1, le=0.5, description="Proporção de dados para teste (0.1 a 0.5)"),
-    service: MLService = Depends(get_ml_service)
+    service: AsyncMLService = Depends(get_ml_service)
 ):
     """Retorna dataset formatado para treinamento de modelos."""
-    return service.get_training_data(test_size)
+    return await service.get_training_data(test_size)
 
 
 @router.post(
@@ -57,11 +57,11 @@ def get_training_data(
     summary="Receber predições",
     description="Endpoint para receber e processar predições de modelos ML. Valida e armazena as predições recebidas."
 )
-def receive_predictions(
+async def receive_predictions(
     request: PredictionsRequest,
-    service: MLService = Depends(get_ml_service)
+    service: AsyncMLService = Depends(get_ml_service)
 ):
     """Recebe e processa predições de modelos externos."""
     predictions = [pred.dict() for pred in request.predictions]
-    return service.save_prediction(predictions)
+    return await service.save_prediction(predictions)
 
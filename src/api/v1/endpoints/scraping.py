@@ -1,11 +1,18 @@
 """
 Endpoint de scraping (protegido).
-Permite disparo manual do processo de scraping apenas por administradores.
+Permite disparo manual do processo de scraping apenas por administradores,
+com acompanhamento do progresso e cancelamento dos jobs.
 """
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from typing import List
 from src.api.deps import get_current_admin_user
 from src.models.user import UserModel
-from src.core.logging import logger
+from src.schemas.responses import ScrapeJobResponse
+from src.services.scrape_job_service import job_manager
+from src.services.scrape_scheduler_service import scrape_scheduler
+from src.repository.dataset_swap import DatasetSwap
+from src.core.database import engine
+from src.core.exceptions import handle_not_found_exception
 
 router = APIRouter()
 
@@ -13,40 +20,113 @@ router = APIRouter()
 @router.post(
     "/trigger",
     summary="Disparar Scraping",
-    description="Inicia o processo de scraping de livros. Requer autenticação de admin."
+    description="Inicia o processo de scraping de livros. Se já houver um job em andamento, retorna esse job. Requer autenticação de admin."
 )
 def trigger_scraping(
-    background_tasks: BackgroundTasks,
+    resume: bool = Query(False, description="Retoma a última execução interrompida"),
+    workers: int = Query(0, ge=0, le=32, description="Processos workers (categorias distribuídas entre eles)"),
     current_user: UserModel = Depends(get_current_admin_user)
 ):
     """
     Dispara o processo de scraping em background.
     
     Apenas usuários administradores podem executar esta ação.
-    O scraping é executado de forma assíncrona em background.
+    O scraping é executado em um event loop dedicado, fora do threadpool da API.
+    Disparos enquanto há um job ativo não iniciam outro crawl: retornam o job em andamento.
+    Com `resume=true`, continua a partir do checkpoint da última execução interrompida.
+    Com `workers` > 1, as categorias são distribuídas entre processos workers.
     """
-    # Importa aqui para evitar dependência circular
-    from src.scraper.scraper import BookScraper
-    from src.scraper.exporter import DataExporter
-    
-    def run_scraping():
-        """Executa o scraping em background."""
-        try:
-            logger.info(f"Scraping iniciado pelo usuário: {current_user.username}")
-            scraper = BookScraper()
-            # O método scrape_all é assíncrono, precisamos executá-lo
-            import asyncio
-            books = asyncio.run(scraper.scrape_all())
-            
-            exporter = DataExporter()
-            exporter.export_to_db(books)
-            logger.info(f"Scraping concluído. {len(books)} livros extraídos.")
-        except Exception as e:
-            logger.error(f"Erro durante scraping: {str(e)}")
-    
-    background_tasks.add_task(run_scraping)
-    
+    job, created = job_manager.trigger(current_user.username, resume, workers)
     return {
-        "message": "Scraping iniciado em background",
-        "triggered_by": current_user.username
+        "message": "Scraping iniciado em background" if created else "Scraping já em andamento",
+        "triggered_by": job.triggered_by,
+        "resume": bool(job.resume),
+        "workers": job.workers,
+        "job_id": job.id,
+        "status": job.status,
+        "joined": not created
     }
+
+
+@router.get(
+    "/schedule",
+    summary="Agendamento do scraping",
+    description="Retorna a cadência do scraping agendado, a próxima tentativa desta instância e a concessão (lease) da janela atual. Requer autenticação de admin."
+)
+def get_schedule(current_user: UserModel = Depends(get_current_admin_user)):
+    """Estado do agendador e da concessão."""
+    return scrape_scheduler.status()
+
+
+@router.get(
+    "/versions",
+    summary="Versões do catálogo",
+    description="Retorna a quantidade de livros da versão publicada, da anterior (books_previous) e das tabelas de staging em andamento. Requer autenticação de admin."
+)
+def get_versions(current_user: UserModel = Depends(get_current_admin_user)):
+    """Versões do catálogo mantidas pela troca atômica."""
+    return DatasetSwap(engine).versions()
+
+
+@router.post(
+    "/rollback",
+    summary="Restaurar versão anterior",
+    description="Troca o catálogo publicado pela versão anterior. Uma segunda chamada desfaz o rollback. Requer autenticação de admin."
+)
+def rollback_catalog(current_user: UserModel = Depends(get_current_admin_user)):
+    """Volta o catálogo para a versão anterior à última troca."""
+    swap = DatasetSwap(engine)
+    if not swap.rollback():
+        handle_not_found_exception("Não há versão anterior do catálogo")
+    return {"message": "Catálogo restaurado para a versão anterior", "versions": swap.versions()}
+
+
+@router.get(
+    "/jobs",
+    response_model=List[ScrapeJobResponse],
+    summary="Listar jobs de scraping",
+    description="Retorna os jobs de scraping recentes, do mais novo ao mais antigo. Requer autenticação de admin."
+)
+def list_jobs(current_user: UserModel = Depends(get_current_admin_user)):
+    """Lista os jobs recentes."""
+    return [job.snapshot() for job in job_manager.list()]
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=ScrapeJobResponse,
+    summary="Progresso do job",
+    description="Retorna estado, páginas processadas, livros extraídos, taxa e tempo restante estimado do job. Requer autenticação de admin."
+)
+def get_job(
+    job_id: str = Path(..., description="ID do job"),
+    current_user: UserModel = Depends(get_current_admin_user)
+):
+    """Retorna o progresso de um job."""
+    job = job_manager.get(job_id)
+    if not job:
+        handle_not_found_exception("Job não encontrado")
+    return job.snapshot()
+
+
+@router.delete(
+    "/jobs/{job_id}",
+    response_model=ScrapeJobResponse,
+    summary="Cancelar job",
+    description="Cancela um job em andamento. O checkpoint é mantido e a execução pode ser retomada. Requer autenticação de admin."
+)
+def cancel_job(
+    job_id: str = Path(..., description="ID do job"),
+    current_user: UserModel = Depends(get_current_admin_user)
+):
+    """Cancela um job em andamento."""
+    job = job_manager.get(job_id)
+    if not job:
+        handle_not_found_exception("Job não encontrado")
+    if not job.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job já finalizado ({job.status})"
+        )
+    job_manager.cancel(job_id)
+    return job.snapshot()
@@ -3,7 +3,7 @@ Roteador principal da API v1.
 Agrupa todos os endpoints em um único roteador.
 """
 from fastapi import APIRouter
-from src.api.v1.endpoints import books, categories, health, stats, ml, auth, scraping, metrics
+from src.api.v1.endpoints import books, categories, health, stats, ml, auth, scraping, metrics, images
 
 # Roteador principal da API
 api_router = APIRouter()
@@ -13,6 +13,7 @@ api_router.include_router(health.router, prefix="/health", tags=["Saúde"])
 api_router.include_router(auth.router, prefix="/auth", tags=["Autenticação"])
 api_router.include_router(books.router, prefix="/books", tags=["Livros"])
 api_router.include_router(categories.router, prefix="/categories", tags=["Categorias"])
+api_router.include_router(images.router, prefix="/images", tags=["Imagens"])
 api_router.include_router(stats.router, prefix="/stats", tags=["Estatísticas"])
 api_router.include_router(ml.router, prefix="/ml", tags=["Machine Learning"])
 api_router.include_router(scraping.router, prefix="/scraping", tags=[])
@@ -16,16 +16,73 @@ class Settings(BaseSettings):
     
     # Configurações de scraping
     SCRAPE_URL: str = "http://books.toscrape.com"
+    SCRAPE_SITES: str = "books.toscrape"        # Sites raspados: nome[=URL], separados por vírgula
     MAX_RETRIES: int = 3
-    RETRY_DELAY: int = 5
+    RETRY_DELAY: float = 0.5                    # Base do backoff exponencial com jitter (s)
+    RETRY_MAX_DELAY: float = 30.0               # Teto do backoff e do Retry-After (s)
+    SCRAPE_CONCURRENCY: int = 5                 # Categorias raspadas em paralelo
+    SCRAPE_SITE_CONCURRENCY: int = 10           # Requisições simultâneas por site
+    SCRAPE_FRONTIER_CAPACITY: int = 1000000     # URLs previstas na fronteira (filtro de Bloom)
+    SCRAPE_FRONTIER_ERROR_RATE: float = 1e-6    # Taxa de falsos positivos da fronteira
+    SCRAPE_RATE_LIMIT: float = 5.0              # Requisições por segundo por host
+    SCRAPE_RATE_BURST: int = 5                  # Rajada máxima do token bucket
+    SCRAPE_TIMEOUT: float = 10.0                # Timeout de cada requisição (s)
+    SCRAPE_MAX_CONNECTIONS: int = 10            # Conexões simultâneas no pool HTTP
+    SCRAPE_MAX_KEEPALIVE: int = 10              # Conexões keep-alive mantidas no pool
+    SCRAPE_HTTP2: bool = False                  # Usa HTTP/2 (requer o pacote h2)
+    SCRAPE_PARSER_BACKEND: str = "html.parser"  # html.parser, lxml ou selectolax
+    SCRAPE_PARSE_IN_PROCESSES: bool = False     # Faz o parsing em um pool de processos
+    SCRAPE_PARSE_WORKERS: int = 0               # Processos de parsing (0 = um por núcleo)
+    SCRAPE_QUEUE_SIZE: int = 20                 # Páginas em espera no pipeline (backpressure)
+    SCRAPE_BATCH_SIZE: int = 200                # Livros por lote gravado no banco
+    SCRAPE_CACHE_ENABLED: bool = False          # Revalida páginas com ETag/Last-Modified
+    SCRAPE_CACHE_MAX_ENTRIES: int = 10000       # Máximo de URLs no cache HTTP
+    SCRAPE_CACHE_MAX_MB: int = 200              # Tamanho máximo do cache HTTP (MB)
+    SCRAPE_ARCHIVE_ENABLED: bool = False        # Arquiva o HTML bruto das listagens (zstd)
+    SCRAPE_DETAILS_ENABLED: bool = False        # Enriquece os livros com a página de detalhe
+    SCRAPE_DETAIL_CONCURRENCY: int = 10         # Páginas de detalhe buscadas em paralelo
+    SCRAPE_DETAIL_CACHE_ENTRIES: int = 1000     # Detalhes recentes mantidos para URLs repetidas
+    SCRAPE_IMAGES_ENABLED: bool = False         # Baixa as capas para o armazenamento local
+    SCRAPE_IMAGE_CONCURRENCY: int = 10          # Capas baixadas em paralelo
+    SCRAPE_RETRY_ROUNDS: int = 2                # Rodadas da fila de retry ao fim do crawl
+    SCRAPE_BREAKER_FAILURE_RATIO: float = 0.5   # Proporção de falhas que abre o circuito (0 = desativado)
+    SCRAPE_BREAKER_MIN_REQUESTS: int = 10       # Requisições mínimas na janela antes de avaliar
+    SCRAPE_BREAKER_WINDOW: int = 50             # Últimas requisições consideradas por host
+    SCRAPE_BREAKER_COOLDOWN: float = 30.0       # Tempo com o circuito aberto (s)
+    SCRAPE_SCHEDULE_ENABLED: bool = False       # Scraping periódico iniciado pela própria API
+    SCRAPE_SCHEDULE_INTERVAL: float = 86400.0   # Duração de cada janela do agendamento (s)
+    SCRAPE_SCHEDULE_JITTER: float = 300.0       # Atraso aleatório após o início da janela (s)
+    SCRAPE_SCHEDULE_WORKERS: int = 0            # Processos workers do crawl agendado (0 = sem sharding)
+    SCRAPE_LEASE_TTL: float = 300.0             # Validade da concessão sem renovação (s)
+    SCRAPE_RUN_STALE_AFTER: float = 120.0       # Execução "running" sem checkpoint há mais tempo é tida como abandonada (s)
     
     # Caminhos do sistema
     BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
     DATA_PATH: Path = BASE_DIR / "data" / "processed" / "books.csv"
+    SCRAPE_CACHE_PATH: Path = BASE_DIR / "data" / "cache" / "http_cache.sqlite3"
+    SCRAPE_ARCHIVE_PATH: Path = BASE_DIR / "data" / "archive"
+    SCRAPE_IMAGES_PATH: Path = BASE_DIR / "data" / "images"
+    SCRAPE_SHARD_QUEUE_PATH: Path = BASE_DIR / "data" / "queue" / "shards.sqlite3"
     
     
     # Define o caminho do banco de dados (Obrigatório via environment)
     DATABASE_URL: Optional[str] = None
+    DB_BULK_BATCH_SIZE: int = 1000              # Linhas por lote nas gravações em massa
+    DB_EXECUTEMANY_MODE: str = "values_plus_batch"  # Modo executemany do psycopg2
+    DB_ASYNC: bool = False                      # Rotas do catálogo com AsyncEngine (asyncpg/aiosqlite)
+    DB_ASYNC_URL: Optional[str] = None          # URL do engine assíncrono (padrão: DATABASE_URL com o driver assíncrono)
+    DB_POOL_SIZE: int = 5                       # Conexões mantidas abertas no pool (por engine e processo)
+    DB_MAX_OVERFLOW: int = 10                   # Conexões extras abertas em picos, além de DB_POOL_SIZE
+    DB_POOL_TIMEOUT: float = 30.0               # Espera máxima por uma conexão livre do pool (s)
+    DB_POOL_RECYCLE: int = 1800                 # Idade máxima de uma conexão antes de reabri-la (s; -1 = nunca)
+    DB_POOL_PRE_PING: bool = True               # Testa a conexão no checkout (descarta conexões derrubadas)
+    DB_STAGED_SWAP: bool = True                 # Ingestão em staging trocada atomicamente com `books` ao final
+    DB_SWAP_LOCK_TIMEOUT: float = 5.0           # Espera máxima pelo lock da troca no PostgreSQL (s)
+    DB_STAGING_TTL: float = 86400.0             # Staging de execução interrompida mantida para a retomada (s)
+    BOOKS_COUNT_CACHE_TTL: float = 30.0         # Validade do total de livros em cache (s)
+    BOOKS_COUNT_ESTIMATE_MIN: int = 100000      # A partir deste tamanho o total vem das estatísticas do PostgreSQL
+    SEARCH_TEXT_CONFIG: str = "simple"          # Configuração de texto do PostgreSQL (to_tsvector)
+    SEARCH_FUZZY_MIN_SIMILARITY: float = 0.6    # Similaridade mínima na busca tolerante a erros (0-1)
 
     def model_post_init(self, __context: Any):
         if not self.DATABASE_URL:
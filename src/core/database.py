@@ -1,13 +1,45 @@
 """
 Configuração do banco de dados SQLite.
 Utiliza SQLAlchemy como ORM.
+
+Com DB_ASYNC, as rotas de leitura do catálogo usam um AsyncEngine (asyncpg no
+PostgreSQL, aiosqlite no SQLite), criado sob demanda: os drivers assíncronos e
+o greenlet só são exigidos nesse modo.
 """
+from typing import Any, Optional
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from src.core.config import settings
+from src.core.pool_metrics import pool_options
+
+
+def engine_options(database_url: Any) -> dict:
+    """Opções do engine conforme o driver do banco (inclui o pool de conexões)."""
+    url = make_url(database_url)
+    options = pool_options(url)
+    if url.get_backend_name() == "postgresql" and url.get_driver_name() == "psycopg2":
+        # Agrupa INSERT/UPDATE com várias linhas em poucos round-trips
+        options["executemany_mode"] = settings.DB_EXECUTEMANY_MODE
+        options["insertmanyvalues_page_size"] = settings.DB_BULK_BATCH_SIZE
+    return options
+
+
+# Driver assíncrono de cada banco
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(database_url: str) -> URL:
+    """URL do banco com o driver assíncrono (DB_ASYNC_URL, se definida, prevalece)."""
+    url = make_url(settings.DB_ASYNC_URL or database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if settings.DB_ASYNC_URL or driver is None:
+        return url
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}")
+
 
 # Cria o engine de conexão com o banco
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 
 # Fábrica de sessões
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -22,3 +54,40 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Engine e fábrica de sessões assíncronas (criados no primeiro uso, com DB_ASYNC)
+_async_engine: Optional[Any] = None
+_async_sessionmaker: Optional[Any] = None
+
+
+def get_async_engine():
+    """Retorna o AsyncEngine, criando-o no primeiro uso."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        url = async_database_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(url, **engine_options(url))
+        _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    """Fábrica de sessões assíncronas (AsyncSession)."""
+    get_async_engine()
+    return _async_sessionmaker
+
+
+async def get_async_db():
+    """Retorna uma sessão assíncrona do banco de dados."""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    """Fecha as conexões do AsyncEngine (encerramento da aplicação)."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_sessionmaker = None
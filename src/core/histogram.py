@@ -0,0 +1,53 @@
+"""
+Histograma de durações.
+Buckets fixos e memória constante: usado na telemetria do scraping e nas
+métricas do pool de conexões do banco.
+"""
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+# Limites superiores dos buckets dos histogramas (ms)
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class Histogram:
+    """Histograma de durações com buckets fixos (memória constante)."""
+
+    def __init__(self, bounds: List[float] = LATENCY_BUCKETS_MS):
+        """Cria os buckets (o último recebe os valores acima do maior limite)."""
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Registra uma duração (ms)."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentil aproximado: limite superior do bucket que o contém."""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """Contagem, média, percentis e buckets."""
+        labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max, 2),
+            "buckets": dict(zip(labels, self.counts))
+        }
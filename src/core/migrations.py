@@ -0,0 +1,42 @@
+"""
+Migrações leves do schema.
+O projeto cria as tabelas com `Base.metadata.create_all`, que não altera
+tabelas existentes. Aqui complementamos com migrações aditivas: colunas novas
+(sempre anuláveis) e índices ausentes são criados em bancos já populados,
+assim como o índice de busca por título (src/repository/title_search.py).
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from src.core.database import Base
+from src.core.logging import logger
+
+
+def ensure_schema(engine: Engine):
+    """Cria tabelas, colunas e índices que ainda não existem no banco."""
+    # Importa os models para registrá-los no metadata
+    import src.models  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing]
+
+        with engine.begin() as conn:
+            for column in missing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+                logger.info(f"Migração: coluna '{table.name}.{column.name}' adicionada")
+
+        # Comparados pelas colunas: após a troca do catálogo (dataset_swap) os índices têm outros nomes
+        existing_indexes = {tuple(index["column_names"]) for index in inspect(engine).get_indexes(table.name)}
+        for index in table.indexes:
+            if tuple(column.name for column in index.columns) not in existing_indexes:
+                index.create(bind=engine, checkfirst=True)
+                logger.info(f"Migração: índice '{index.name}' criado")
+
+    from src.repository.title_search import get_title_search
+
+    with engine.begin() as conn:
+        get_title_search(engine.dialect.name).ensure(conn)
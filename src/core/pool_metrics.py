@@ -0,0 +1,139 @@
+"""
+Pool de conexões do banco.
+Configura o pool a partir de Settings (tamanho, overflow, timeout, recycle e
+pre-ping) e mede o checkout de conexões: tempo de espera (histograma),
+timeouts, conexões invalidadas, em uso e em overflow. Os números são
+expostos em /metrics/db-pool para dimensionar as instâncias.
+"""
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy import event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from src.core.config import settings
+from src.core.histogram import Histogram
+
+# Limites dos buckets da espera pelo checkout (ms): em um pool folgado ela fica abaixo de 1ms
+POOL_WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 30000]
+
+
+class PoolMetrics:
+    """Contadores do checkout de conexões de um pool."""
+
+    def __init__(self):
+        """Inicializa os contadores."""
+        self._lock = threading.Lock()
+        self.wait = Histogram(POOL_WAIT_BUCKETS_MS)
+        self.timeouts = 0
+        self.invalidated = 0
+        self.peak_in_use = 0
+
+    def record_checkout(self, wait_ms: float, in_use: int):
+        """Registra um checkout e o tempo de espera pela conexão."""
+        with self._lock:
+            self.wait.observe(wait_ms)
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def record_timeout(self):
+        """Registra um checkout que esgotou DB_POOL_TIMEOUT."""
+        with self._lock:
+            self.timeouts += 1
+
+    def record_invalidation(self):
+        """Registra uma conexão descartada (pre-ping falhou ou erro de desconexão)."""
+        with self._lock:
+            self.invalidated += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Checkouts, espera, timeouts e invalidações."""
+        with self._lock:
+            return {
+                "checkouts": self.wait.count,
+                "wait": self.wait.summary(),
+                "timeouts": self.timeouts,
+                "invalidated": self.invalidated,
+                "peak_in_use": self.peak_in_use
+            }
+
+
+class MonitoredPoolMixin:
+    """Mede o checkout de conexões de um pool baseado em fila."""
+
+    @property
+    def metrics(self) -> PoolMetrics:
+        """Métricas deste pool (um pool recriado pelo dispose começa do zero)."""
+        metrics = self.__dict__.get("_metrics")
+        if metrics is None:
+            metrics = self.__dict__["_metrics"] = PoolMetrics()
+            event.listen(self, "invalidate", lambda *args: metrics.record_invalidation())
+        return metrics
+
+    def connect(self):
+        """Checkout de uma conexão, medindo a espera (inclui o pre-ping)."""
+        metrics = self.metrics
+        begin = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            metrics.record_timeout()
+            raise
+        metrics.record_checkout((time.perf_counter() - begin) * 1000, self.checkedout())
+        return connection
+
+
+class MonitoredQueuePool(MonitoredPoolMixin, QueuePool):
+    """QueuePool com métricas de checkout."""
+
+
+class MonitoredAsyncQueuePool(MonitoredPoolMixin, AsyncAdaptedQueuePool):
+    """Pool do AsyncEngine com métricas de checkout."""
+
+
+def pool_options(database_url: Any) -> Dict[str, Any]:
+    """Opções de pool do engine (os limites só valem para pools baseados em fila)."""
+    url: URL = make_url(database_url)
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    default_pool = url.get_dialect().get_pool_class(url)
+    if issubclass(default_pool, AsyncAdaptedQueuePool):
+        options["poolclass"] = MonitoredAsyncQueuePool
+    elif issubclass(default_pool, QueuePool):
+        options["poolclass"] = MonitoredQueuePool
+    else:
+        # Ex.: SQLite em memória (uma conexão por thread)
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE
+    )
+    return options
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """Configuração, ocupação atual e métricas de checkout do pool do engine."""
+    pool = engine.pool
+    if not isinstance(pool, MonitoredPoolMixin):
+        return {"pool": type(pool).__name__, "monitored": False}
+
+    # Configuração informada ao engine (a mesma de pool_options)
+    options = pool_options(engine.url)
+    size, in_use = pool.size(), pool.checkedout()
+    max_overflow = options["max_overflow"]
+    capacity = size + max(max_overflow, 0)
+    return {
+        "pool": type(pool).__name__,
+        "monitored": True,
+        "size": size,
+        "max_overflow": max_overflow,
+        "timeout_seconds": options["pool_timeout"],
+        "recycle_seconds": options["pool_recycle"],
+        "pre_ping": options["pool_pre_ping"],
+        "in_use": in_use,
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(in_use / capacity, 3) if capacity else None,
+        **pool.metrics.summary()
+    }
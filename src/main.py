@@ -4,7 +4,8 @@ Ponto de entrada principal da API FastAPI.
 from fastapi import FastAPI
 from src.api.v1.router import api_router
 from src.core.config import settings
-from src.core.database import engine, Base, SessionLocal
+from src.core.database import engine, SessionLocal
+from src.core.migrations import ensure_schema
 from src.models.book import BookModel
 from src.core.logging import logger
 from src.core.middleware import LoggingMiddleware
@@ -58,8 +59,8 @@ async def startup_event():
     logger.info("Iniciando Books API...")
     try:
 
-        # Cria as tabelas no banco de dados
-        Base.metadata.create_all(bind=engine)
+        # Cria as tabelas no banco de dados (e colunas/índices novos)
+        ensure_schema(engine)
         
         # Garante que o usuário admin existe
         from src.services.auth_service import ensure_admin_user
@@ -73,8 +74,34 @@ async def startup_event():
         logger.error(f"Erro durante a inicialização do banco: {e}")
         logger.warning("A aplicação continuará subindo para responder ao health check.")
 
+    # Rotas do catálogo sobre o AsyncEngine (exige asyncpg/aiosqlite e greenlet)
+    if settings.DB_ASYNC:
+        from src.core.database import get_async_engine
+        logger.info(f"Camada de banco assíncrona ativa ({get_async_engine().url.drivername})")
+
+    # Scraping periódico: todas as instâncias agendam, só a que obtém a concessão executa
+    if settings.SCRAPE_SCHEDULE_ENABLED:
+        from src.services.scrape_scheduler_service import scrape_scheduler
+        scrape_scheduler.start()
+
     logger.info("Books API pronta e ouvindo.")
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """Evento executado ao encerrar a aplicação."""
+    # Para o agendador e libera a concessão, para que outra instância retome a janela
+    from src.services.scrape_scheduler_service import scrape_scheduler
+    scrape_scheduler.stop()
+    # Cancela o scraping em andamento (o checkpoint permite retomá-lo)
+    from src.services.scrape_job_service import job_manager
+    job_manager.shutdown()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    """Fecha as conexões do engine assíncrono (DB_ASYNC)."""
+    from src.core.database import dispose_async_engine
+    await dispose_async_engine()
+
 @app.get("/", tags=["Raiz"], summary="Página inicial", description="Retorna mensagem de boas-vindas")
 def root():
     """Rota raiz - retorna mensagem de boas-vindas."""
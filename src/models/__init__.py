@@ -2,3 +2,5 @@
 Pacote de models SQLAlchemy.
 """
 from src.models.user import UserModel
+from src.models.book import BookModel
+from src.models.scrape_run import ScrapeRunModel, ScrapeRunPageModel, ScrapeRunCategoryModel, ScrapeLeaseModel
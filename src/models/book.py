@@ -2,7 +2,7 @@
 Model SQLAlchemy para livros.
 Define a estrutura da tabela no banco de dados.
 """
-from sqlalchemy import Column, Integer, String, Float, Boolean
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, Index
 from src.core.database import Base
 
 class BookModel(Base):
@@ -11,8 +11,21 @@ class BookModel(Base):
 
     id = Column(Integer, primary_key=True, index=True)          # ID único
     title = Column(String, index=True)                          # Título do livro
-    price = Column(Float)                                       # Preço em libras
+    price = Column(Float, index=True)                           # Preço em libras
     rating = Column(Integer)                                    # Avaliação (1-5)
     availability = Column(Boolean)                              # Disponível em estoque
     category = Column(String, index=True)                       # Categoria do livro
     image_url = Column(String)                                  # URL da imagem de capa
+    image_hash = Column(String(64))                             # SHA-256 da capa no armazenamento local
+    source_url = Column(String, unique=True, index=True)        # URL do livro no site (chave natural)
+    content_hash = Column(String(64))                           # Hash dos dados da listagem
+    upc = Column(String(32))                                    # Código UPC (página de detalhe)
+    description = Column(Text)                                  # Descrição (página de detalhe)
+    stock_count = Column(Integer)                               # Exemplares em estoque (página de detalhe)
+    num_reviews = Column(Integer)                               # Número de avaliações (página de detalhe)
+
+    # Índices compostos das consultas (src/repository/book_query.py)
+    __table_args__ = (
+        Index("ix_books_rating_price", rating.desc(), price),  # Mais bem avaliados, desempate pelo preço
+        Index("ix_books_category_price", category, price),      # Faixa de preço dentro de uma categoria
+    )
@@ -0,0 +1,58 @@
+"""
+Models SQLAlchemy para execuções de scraping.
+Guardam o checkpoint de cada execução (páginas e categorias concluídas),
+permitindo retomar um crawl interrompido.
+"""
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from datetime import datetime
+from src.core.database import Base
+
+
+class ScrapeRunModel(Base):
+    """Execução do pipeline de scraping."""
+    __tablename__ = "scrape_runs"
+
+    id = Column(String(32), primary_key=True)                    # ID da execução (UUID hex)
+    status = Column(String(16), index=True)                      # running, failed ou completed
+    kind = Column(String(16), nullable=True)                     # pipeline, sharded ou export (dono da staging)
+    started_at = Column(DateTime, default=datetime.utcnow)       # Início
+    updated_at = Column(DateTime, default=datetime.utcnow)       # Último checkpoint
+    finished_at = Column(DateTime, nullable=True)                # Conclusão
+    pages = Column(Integer, default=0)                           # Páginas gravadas
+    books = Column(Integer, default=0)                           # Livros gravados
+    telemetry = Column(Text, nullable=True)                      # Métricas da execução (JSON)
+
+
+class ScrapeRunPageModel(Base):
+    """Página de listagem já gravada no banco em uma execução."""
+    __tablename__ = "scrape_run_pages"
+
+    id = Column(Integer, primary_key=True)                       # ID único
+    run_id = Column(String(32), index=True)                      # Execução
+    category = Column(String)                                    # Categoria
+    page = Column(Integer)                                       # Número da página
+    keys = Column(Text)                                          # Chaves naturais dos livros (JSON)
+
+
+class ScrapeRunCategoryModel(Base):
+    """Categoria concluída em uma execução."""
+    __tablename__ = "scrape_run_categories"
+
+    id = Column(Integer, primary_key=True)                       # ID único
+    run_id = Column(String(32), index=True)                      # Execução
+    category = Column(String)                                    # Categoria
+    books = Column(Integer)                                      # Livros extraídos
+    complete = Column(Boolean)                                   # Todas as páginas obtidas sem erro
+
+
+class ScrapeLeaseModel(Base):
+    """Concessão do scraping agendado: garante uma única instância por janela."""
+    __tablename__ = "scrape_leases"
+
+    name = Column(String(64), primary_key=True)                  # Nome da tarefa agendada
+    slot = Column(Integer, default=-1)                           # Janela concedida (tempo / intervalo)
+    holder = Column(String(128), nullable=True)                  # Instância que detém a concessão
+    acquired_at = Column(DateTime, nullable=True)                # Obtenção
+    expires_at = Column(DateTime, nullable=True)                 # Expira se não for renovada
+    completed_at = Column(DateTime, nullable=True)               # Conclusão do crawl da janela
+    status = Column(String(16), nullable=True)                   # Estado final do job da janela
@@ -0,0 +1,60 @@
+"""
+Repositório SQLAlchemy assíncrono para livros (DB_ASYNC).
+Leituras do catálogo sobre uma AsyncSession, com as mesmas instruções do
+repositório síncrono (src/repository/book_query.py). Total e busca textual,
+que dependem do dialeto, reaproveitam o repositório síncrono via `run_sync`
+(o I/O continua assíncrono). As gravações continuam no repositório síncrono.
+"""
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.repository.book_query import BookQuery, build_book_query, build_categories_query, build_page_query
+from src.repository.sqlalchemy_repository import SQLAlchemyBookRepository, book_to_schema
+from src.schemas.responses import BookBase as BookSchema
+from src.models.book import BookModel
+
+
+class AsyncSQLAlchemyBookRepository:
+    """Repositório de livros usando AsyncSession."""
+
+    def __init__(self, db: AsyncSession, model: Any = BookModel):
+        """Inicializa com uma sessão assíncrona do banco."""
+        self.db = db
+        self.model = model
+
+    async def get_all(self) -> List[BookSchema]:
+        """Retorna todos os livros."""
+        result = await self.db.execute(select(self.model))
+        return [book_to_schema(b) for b in result.scalars()]
+
+    async def get_by_id(self, id: int) -> Optional[BookSchema]:
+        """Busca um livro pelo ID."""
+        db_book = await self.db.get(self.model, id)
+        return book_to_schema(db_book) if db_book else None
+
+    async def get_page(self, limit: int, offset: int = 0, after_id: Optional[int] = None) -> List[BookSchema]:
+        """Retorna uma página em ordem de ID, paginada no banco (ver SQLAlchemyBookRepository.get_page)."""
+        result = await self.db.execute(build_page_query(self.model, limit, offset, after_id))
+        return [book_to_schema(b) for b in result.scalars()]
+
+    async def count(self) -> Tuple[int, bool]:
+        """Retorna o total de livros (em cache ou estimado) e se ele é uma estimativa."""
+        return await self.db.run_sync(lambda db: SQLAlchemyBookRepository(db, self.model).count())
+
+    async def find(self, title: Optional[str] = None, category: Optional[str] = None) -> List[BookSchema]:
+        """Busca livros por título e/ou categoria."""
+        return await self.query(BookQuery(title=title, category=category))
+
+    async def query(self, query: BookQuery) -> List[BookSchema]:
+        """Executa uma consulta com filtros combinados, ordenada e limitada no banco."""
+        result = await self.db.execute(build_book_query(self.model, query))
+        return [book_to_schema(b) for b in result.scalars()]
+
+    async def search(self, query: str, category: Optional[str] = None, limit: int = 50) -> List[BookSchema]:
+        """Busca por título no índice de texto do banco, do mais ao menos relevante."""
+        return await self.db.run_sync(lambda db: SQLAlchemyBookRepository(db, self.model).search(query, category, limit))
+
+    async def get_categories(self) -> List[str]:
+        """Retorna todas as categorias distintas."""
+        result = await self.db.execute(build_categories_query(self.model))
+        return list(result.scalars())
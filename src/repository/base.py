@@ -3,7 +3,7 @@ Repositório base abstrato.
 Define a interface que todos os repositórios devem implementar.
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional, Generic, TypeVar
+from typing import Any, List, Optional, Generic, Tuple, TypeVar
 
 T = TypeVar("T")
 
@@ -24,3 +24,23 @@ class BaseRepository(ABC, Generic[T]):
     def find(self, **kwargs) -> List[T]:
         """Busca registros com filtros."""
         pass
+
+    @abstractmethod
+    def get_page(self, limit: int, offset: int = 0, after_id: Optional[int] = None) -> List[T]:
+        """Retorna uma página de registros em ordem de ID (após `after_id`, se informado)."""
+        pass
+
+    @abstractmethod
+    def count(self) -> Tuple[int, bool]:
+        """Retorna o total de registros e se ele é uma estimativa."""
+        pass
+
+    @abstractmethod
+    def query(self, query: Any) -> List[T]:
+        """Retorna os registros que atendem aos filtros, na ordenação pedida."""
+        pass
+
+    @abstractmethod
+    def search(self, query: str, category: Optional[str] = None, limit: int = 50) -> List[T]:
+        """Busca textual por título, do mais ao menos relevante."""
+        pass
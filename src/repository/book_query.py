@@ -0,0 +1,79 @@
+"""
+Consultas de livros.
+Filtros combináveis e ordenação compilados em uma única instrução SQL, que
+os índices da tabela `books` atendem: (rating DESC, price) para os mais bem
+avaliados, (category, price) para faixas de preço dentro de uma categoria e
+price para faixas de preço no catálogo todo.
+
+As instruções são montadas aqui e executadas tanto pelo repositório síncrono
+quanto pelo assíncrono.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from sqlalchemy import Select, select
+
+# Ordenações disponíveis; o ID desempata para a ordem ser estável entre páginas
+SORT_KEYS: Dict[str, Callable[[Any], Tuple]] = {
+    "id": lambda model: (model.id,),
+    "-rating": lambda model: (model.rating.desc(), model.price, model.id),
+    "price": lambda model: (model.price, model.id),
+    "-price": lambda model: (model.price.desc(), model.id),
+    "title": lambda model: (model.title, model.id),
+}
+
+
+@dataclass
+class BookQuery:
+    """Filtros, ordenação e limite de uma consulta de livros."""
+    title: Optional[str] = None          # Trecho do título (sem diferenciar maiúsculas)
+    category: Optional[str] = None       # Categoria exata
+    min_price: Optional[float] = None    # Preço mínimo (inclusive)
+    max_price: Optional[float] = None    # Preço máximo (inclusive)
+    min_rating: Optional[int] = None     # Avaliação mínima
+    available: Optional[bool] = None     # Disponibilidade em estoque
+    sort: str = "id"                     # Chave de SORT_KEYS
+    limit: Optional[int] = None          # None = sem limite
+    offset: int = 0
+
+
+def build_book_query(model: Any, query: BookQuery) -> Select:
+    """Monta o SELECT da consulta sobre o model (tabela `books` ou staging)."""
+    if query.sort not in SORT_KEYS:
+        raise ValueError(f"Ordenação desconhecida: '{query.sort}'. Opções: {', '.join(SORT_KEYS)}")
+
+    statement = select(model)
+    if query.title:
+        statement = statement.where(model.title.ilike(f"%{query.title}%"))
+    if query.category:
+        statement = statement.where(model.category == query.category)
+    if query.min_price is not None:
+        statement = statement.where(model.price >= query.min_price)
+    if query.max_price is not None:
+        statement = statement.where(model.price <= query.max_price)
+    if query.min_rating is not None:
+        statement = statement.where(model.rating >= query.min_rating)
+    if query.available is not None:
+        statement = statement.where(model.availability == query.available)
+
+    statement = statement.order_by(*SORT_KEYS[query.sort](model))
+    if query.limit is not None:
+        statement = statement.limit(query.limit)
+    if query.offset:
+        statement = statement.offset(query.offset)
+    return statement
+
+
+def build_page_query(model: Any, limit: int, offset: int = 0, after_id: Optional[int] = None) -> Select:
+    """Página em ordem de ID; com `after_id` (cursor), começa após esse livro."""
+    statement = select(model)
+    if after_id is not None:
+        statement = statement.where(model.id > after_id)
+    statement = statement.order_by(model.id).limit(limit)
+    if offset:
+        statement = statement.offset(offset)
+    return statement
+
+
+def build_categories_query(model: Any) -> Select:
+    """Categorias distintas, em ordem alfabética."""
+    return select(model.category).distinct().order_by(model.category)
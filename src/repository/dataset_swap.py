@@ -0,0 +1,191 @@
+"""
+Troca atômica do catálogo (blue/green).
+A ingestão grava em uma tabela de staging, criada como cópia do catálogo
+atual (mesmos IDs), e ao final a staging substitui a tabela `books` em uma
+única transação (renomeação). Enquanto o crawl roda, as leituras da API
+continuam na versão anterior, completa; a versão substituída fica em
+`books_previous` para rollback imediato.
+
+Cada staging pertence a uma execução registrada em scrape_runs. Ao preparar
+uma nova, são descartadas as staging sem dono, as de execuções concluídas e as
+de execuções interrompidas há mais de DB_STAGING_TTL ou cuja cópia do catálogo
+já foi superada por uma execução concluída depois; as das execuções ativas
+(checkpoint há menos de SCRAPE_RUN_STALE_AFTER) nunca são descartadas.
+"""
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import registry
+from sqlalchemy.schema import CreateTable
+from src.models.book import BookModel
+from src.models.scrape_run import ScrapeRunModel
+from src.repository.sqlalchemy_repository import invalidate_book_count
+from src.repository.title_search import get_title_search
+from src.core.config import settings
+from src.core.logging import logger
+
+# Tabela lida pela API e versão anterior mantida para rollback
+LIVE_TABLE = BookModel.__tablename__
+PREVIOUS_TABLE = f"{LIVE_TABLE}_previous"
+STAGING_PREFIX = f"{LIVE_TABLE}_stage_"
+
+# Models das tabelas de staging (mapeados fora do Base: não entram no ensure_schema)
+_staging_registry = registry()
+_staging_models: Dict[str, Any] = {}
+
+
+def staging_table_name(run_id: str) -> str:
+    """Tabela de staging da execução: a mesma em uma retomada e em todos os workers."""
+    return f"{STAGING_PREFIX}{re.sub(r'[^0-9a-z]', '', run_id.lower())[:12]}"
+
+
+def book_table_model(name: str) -> Any:
+    """Model mapeado para uma tabela com a estrutura de `books` (índices com nomes próprios)."""
+    model = _staging_models.get(name)
+    if model is None:
+        table = BookModel.__table__.to_metadata(_staging_registry.metadata, name=name)
+        # Nomes de índice são únicos no banco: cada tabela leva o próprio nome nos seus
+        for index in table.indexes:
+            index.name = f"ix_{name}_{'_'.join(column.name for column in index.columns)}"
+        model = type(f"BookTable_{name}", (), {})
+        _staging_registry.map_imperatively(model, table)
+        _staging_models[name] = model
+    return model
+
+
+class DatasetSwap:
+    """Prepara a tabela de staging e a troca pela tabela `books`."""
+
+    def __init__(self, engine: Engine):
+        """Inicializa com o engine do banco."""
+        self.engine = engine
+
+    @contextmanager
+    def _transaction(self) -> Iterator[Connection]:
+        """Transação que inclui DDL (renomeações e criação de tabelas)."""
+        with self.engine.begin() as conn:
+            if conn.dialect.name == "sqlite":
+                # O pysqlite não abre a transação antes de DDL: abre explicitamente para a troca ser atômica
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+            elif conn.dialect.name == "postgresql":
+                # A renomeação espera as leituras em andamento: não deixa novas leituras na fila por muito tempo
+                conn.execute(text(f"SET LOCAL lock_timeout = '{int(settings.DB_SWAP_LOCK_TIMEOUT * 1000)}ms'"))
+            yield conn
+
+    def staging_tables(self) -> List[str]:
+        """Tabelas de staging existentes."""
+        return sorted(name for name in inspect(self.engine).get_table_names() if name.startswith(STAGING_PREFIX))
+
+    def has_staging(self, run_id: str) -> bool:
+        """Indica se a staging da execução existe (uma retomada sem ela precisa recomeçar)."""
+        return inspect(self.engine).has_table(staging_table_name(run_id))
+
+    def prepare(self, run_id: str) -> str:
+        """
+        Retorna a tabela de staging da execução, criando-a como cópia do catálogo
+        atual se ainda não existir (uma execução retomada continua na mesma).
+        A execução deve estar registrada em scrape_runs antes da chamada: as
+        staging que não estão em uso nem aguardam uma retomada são descartadas.
+        """
+        name = staging_table_name(run_id)
+        # Listadas antes das execuções: uma staging criada depois da consulta não é vista
+        existing = self.staging_tables()
+        kept = self._kept_stagings()
+        for stale in existing:
+            if stale != name and stale not in kept:
+                self.discard(stale)
+        if name in existing:
+            logger.info(f"Continuando a ingestão na tabela de staging '{name}'")
+            return name
+
+        table = book_table_model(name).__table__
+        columns = ", ".join(column.name for column in table.columns)
+        with self._transaction() as conn:
+            conn.execute(CreateTable(table))
+            # Cópia feita no próprio banco; os IDs são preservados
+            conn.execute(text(f"INSERT INTO {name} ({columns}) SELECT {columns} FROM {LIVE_TABLE}"))
+            if conn.dialect.name == "postgresql":
+                # A sequência da staging continua de onde a do catálogo parou
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {name}"
+                ))
+            # Índices criados após a cópia (mais rápido que atualizá-los linha a linha)
+            for index in table.indexes:
+                index.create(conn)
+            get_title_search(conn.dialect.name).ensure(conn, name)
+        logger.info(f"Tabela de staging '{name}' criada a partir do catálogo atual")
+        return name
+
+    def _kept_stagings(self) -> Set[str]:
+        """
+        Staging das execuções ativas e das interrompidas que ainda podem ser retomadas:
+        há menos de DB_STAGING_TTL e sem uma execução concluída depois do seu início
+        (a cópia do catálogo na staging voltaria a publicar dados antigos).
+        """
+        if not inspect(self.engine).has_table(ScrapeRunModel.__tablename__):
+            return set()
+        with self.engine.connect() as conn:
+            runs = conn.execute(
+                select(ScrapeRunModel.id, ScrapeRunModel.status, ScrapeRunModel.started_at, ScrapeRunModel.updated_at)
+                .where(ScrapeRunModel.status != "completed")
+            ).all()
+            last_completed = conn.execute(
+                select(func.max(ScrapeRunModel.finished_at)).where(ScrapeRunModel.status == "completed")
+            ).scalar()
+
+        now = datetime.utcnow()
+        kept = set()
+        for run_id, status, started_at, updated_at in runs:
+            idle = (now - (updated_at or started_at or datetime.min)).total_seconds()
+            if status == "running" and idle < settings.SCRAPE_RUN_STALE_AFTER:
+                kept.add(staging_table_name(run_id))
+            elif idle < settings.DB_STAGING_TTL and not (
+                last_completed and started_at and last_completed > started_at
+            ):
+                kept.add(staging_table_name(run_id))
+        return kept
+
+    def swap(self, name: str):
+        """Coloca a staging no lugar de `books`; a versão atual passa a ser a anterior."""
+        with self._transaction() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {PREVIOUS_TABLE}"))
+            conn.execute(text(f"ALTER TABLE {LIVE_TABLE} RENAME TO {PREVIOUS_TABLE}"))
+            conn.execute(text(f"ALTER TABLE {name} RENAME TO {LIVE_TABLE}"))
+            # Índice de busca publicado junto com o catálogo
+            get_title_search(conn.dialect.name).attach(conn)
+        invalidate_book_count()
+        logger.info(f"Catálogo trocado: '{name}' publicada, versão anterior em '{PREVIOUS_TABLE}'")
+
+    def rollback(self) -> bool:
+        """Volta para a versão anterior (a atual passa a ser a anterior, permitindo desfazer)."""
+        if not inspect(self.engine).has_table(PREVIOUS_TABLE):
+            logger.warning("Não há versão anterior do catálogo para restaurar")
+            return False
+        temporary = f"{LIVE_TABLE}_rollback"
+        with self._transaction() as conn:
+            conn.execute(text(f"ALTER TABLE {LIVE_TABLE} RENAME TO {temporary}"))
+            conn.execute(text(f"ALTER TABLE {PREVIOUS_TABLE} RENAME TO {LIVE_TABLE}"))
+            conn.execute(text(f"ALTER TABLE {temporary} RENAME TO {PREVIOUS_TABLE}"))
+            get_title_search(conn.dialect.name).attach(conn)
+        invalidate_book_count()
+        logger.info("Catálogo restaurado para a versão anterior")
+        return True
+
+    def discard(self, name: str):
+        """Remove uma tabela de staging."""
+        with self._transaction() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        logger.info(f"Tabela de staging '{name}' descartada")
+
+    def versions(self) -> Dict[str, Optional[int]]:
+        """Livros da versão atual, da anterior e das staging em andamento."""
+        names = inspect(self.engine).get_table_names()
+        tables = [LIVE_TABLE, PREVIOUS_TABLE, *self.staging_tables()]
+        with self.engine.connect() as conn:
+            return {
+                name: conn.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar() if name in names else None
+                for name in tables
+            }
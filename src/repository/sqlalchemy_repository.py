@@ -2,69 +2,403 @@
 Repositório SQLAlchemy para livros.
 Implementa operações de banco de dados usando SQLAlchemy.
 """
-from typing import List, Optional
+import hashlib
+import io
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import func, insert, text, update
 from sqlalchemy.orm import Session
+from src.core.config import settings
 from src.repository.base import BaseRepository
+from src.repository.book_query import BookQuery, build_book_query, build_categories_query, build_page_query
+from src.repository.title_search import get_title_search
 from src.schemas.responses import BookBase as BookSchema
 from src.models.book import BookModel
 
+# Chave natural de um livro: URL no site fonte ou, na falta dela, título + categoria
+NaturalKey = Tuple[str, ...]
+
+# Tamanho dos lotes de IDs/chaves nas cláusulas IN
+IN_CHUNK_SIZE = 500
+
+# Colunas preenchidas pela página de detalhe (enriquecimento opcional)
+DETAIL_COLUMNS = ["upc", "description", "stock_count", "num_reviews"]
+
+# Colunas gravadas na ingestão (todas exceto o ID, gerado pelo banco)
+WRITE_COLUMNS = [
+    "title", "price", "rating", "availability", "category", "image_url", "image_hash", "source_url",
+    "content_hash", *DETAIL_COLUMNS
+]
+
+# Marcador de NULL no CSV do COPY (um campo vazio entre aspas seria lido como string vazia)
+COPY_NULL = r"\N"
+
+
+@dataclass
+class IngestSummary:
+    """Resumo das alterações de uma ingestão."""
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    def add(self, other: "IngestSummary"):
+        """Acumula os contadores de outro resumo."""
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.deleted += other.deleted
+        self.unchanged += other.unchanged
+
+    def dict(self) -> Dict[str, int]:
+        """Retorna os contadores como dicionário."""
+        return asdict(self)
+
+# Total de livros por (banco, tabela): (momento da leitura, total, estimado)
+_count_cache: Dict[Tuple[str, str], Tuple[float, int, bool]] = {}
+
+
+def invalidate_book_count():
+    """Descarta os totais em cache (após ingestões e trocas do catálogo)."""
+    _count_cache.clear()
+
+
+def natural_key(source_url: Optional[str], title: str, category: str) -> NaturalKey:
+    """Monta a chave natural do livro."""
+    if source_url:
+        return ("url", source_url)
+    return ("title", title, category)
+
+
+def encode_copy_rows(rows: Iterable[Dict[str, Any]]) -> io.StringIO:
+    """Codifica as linhas em CSV para o COPY: strings entre aspas e None como \\N sem aspas (NULL)."""
+    def field(value: Any) -> str:
+        if value is None:
+            return COPY_NULL
+        if isinstance(value, str):
+            return '"' + value.replace('"', '""') + '"'
+        return str(value)
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(field(row[column]) for column in WRITE_COLUMNS) + "\n")
+    buffer.seek(0)
+    return buffer
+
+
+def book_content_hash(book: BookSchema) -> str:
+    """Hash dos dados da listagem, usado para detectar livros alterados."""
+    values = (book.title, book.price, book.rating, book.availability, book.category, book.image_url)
+    return hashlib.sha256(repr(values).encode("utf-8")).hexdigest()
+
+
+def _has_details(book: BookSchema) -> bool:
+    """Indica se o livro passou pelo enriquecimento da página de detalhe."""
+    return book.upc is not None
+
+
+def _chunks(items: List, size: int = IN_CHUNK_SIZE) -> Iterable[List]:
+    """Divide uma lista em lotes."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def book_to_schema(db_book: Any) -> BookSchema:
+    """Converte model para schema."""
+    return BookSchema(
+        id=db_book.id,
+        title=db_book.title,
+        price=db_book.price,
+        rating=db_book.rating,
+        availability=db_book.availability,
+        category=db_book.category,
+        image_url=db_book.image_url,
+        image_hash=db_book.image_hash,
+        source_url=db_book.source_url,
+        upc=db_book.upc,
+        description=db_book.description,
+        stock_count=db_book.stock_count,
+        num_reviews=db_book.num_reviews
+    )
+
+
 class SQLAlchemyBookRepository(BaseRepository[BookSchema]):
     """Repositório de livros usando SQLAlchemy."""
     
-    def __init__(self, db: Session):
-        """Inicializa com uma sessão do banco."""
+    def __init__(self, db: Session, model: Any = BookModel):
+        """
+        Inicializa com uma sessão do banco.
+        `model` permite operar sobre uma tabela de staging (ver src/repository/dataset_swap.py).
+        """
         self.db = db
+        self.model = model
 
     def get_all(self) -> List[BookSchema]:
         """Retorna todos os livros."""
-        db_books = self.db.query(BookModel).all()
+        db_books = self.db.query(self.model).all()
         return [self._to_schema(b) for b in db_books]
 
+    def get_page(self, limit: int, offset: int = 0, after_id: Optional[int] = None) -> List[BookSchema]:
+        """
+        Retorna uma página em ordem de ID, paginada no banco.
+        Com `after_id` (cursor), a página começa após o último ID da anterior:
+        a busca usa a chave primária e custa o mesmo em qualquer profundidade.
+        """
+        statement = build_page_query(self.model, limit, offset, after_id)
+        return [self._to_schema(b) for b in self.db.execute(statement).scalars()]
+
+    def count(self) -> Tuple[int, bool]:
+        """
+        Retorna o total de livros e se ele é uma estimativa. O total fica em cache
+        por BOOKS_COUNT_CACHE_TTL; no PostgreSQL, tabelas com mais de
+        BOOKS_COUNT_ESTIMATE_MIN linhas usam a estimativa das estatísticas (pg_class).
+        """
+        table = self.model.__table__.name
+        key = (str(self.db.get_bind().url), table)
+        cached = _count_cache.get(key)
+        if cached and time.monotonic() - cached[0] < settings.BOOKS_COUNT_CACHE_TTL:
+            return cached[1], cached[2]
+
+        total, estimated = None, False
+        if self.db.get_bind().dialect.name == "postgresql":
+            # reltuples é atualizado pelo ANALYZE/autovacuum (-1 se a tabela nunca foi analisada)
+            reltuples = self.db.execute(
+                text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+            ).scalar()
+            if reltuples is not None and reltuples >= settings.BOOKS_COUNT_ESTIMATE_MIN:
+                total, estimated = int(reltuples), True
+        if total is None:
+            total = self.db.query(func.count(self.model.id)).scalar()
+
+        _count_cache[key] = (time.monotonic(), total, estimated)
+        return total, estimated
+
     def get_by_id(self, id: int) -> Optional[BookSchema]:
         """Busca um livro pelo ID."""
-        db_book = self.db.query(BookModel).filter(BookModel.id == id).first()
+        db_book = self.db.query(self.model).filter(self.model.id == id).first()
         return self._to_schema(db_book) if db_book else None
 
     def find(self, title: Optional[str] = None, category: Optional[str] = None) -> List[BookSchema]:
         """Busca livros por título e/ou categoria."""
-        query = self.db.query(BookModel)
-        if title:
-            query = query.filter(BookModel.title.ilike(f"%{title}%"))
-        if category:
-            query = query.filter(BookModel.category == category)
-        return [self._to_schema(b) for b in query.all()]
+        return self.query(BookQuery(title=title, category=category))
+
+    def query(self, query: BookQuery) -> List[BookSchema]:
+        """Executa uma consulta com filtros combinados, ordenada e limitada no banco."""
+        return [self._to_schema(b) for b in self.db.execute(build_book_query(self.model, query)).scalars()]
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = 50) -> List[BookSchema]:
+        """
+        Busca por título no índice de texto do banco (src/repository/title_search.py):
+        ordenada por relevância, com prefixos e tolerância a erros de digitação.
+        """
+        ids = get_title_search(self.db.get_bind().dialect.name).search_ids(self.db, query, category, limit)
+        if not ids:
+            return []
+        books = {b.id: b for b in self.db.query(self.model).filter(self.model.id.in_(ids))}
+        return [self._to_schema(books[id]) for id in ids if id in books]
 
     def get_categories(self) -> List[str]:
         """Retorna todas as categorias distintas."""
-        categories = self.db.query(BookModel.category).distinct().all()
-        return sorted([c[0] for c in categories])
-
-    def save_all(self, books: List[BookSchema]):
-        """Salva uma lista de livros no banco."""
-        # Limpa registros existentes
-        self.db.query(BookModel).delete()
-        
-        # Insere novos registros
+        return list(self.db.execute(build_categories_query(self.model)).scalars())
+
+    def save_all(self, books: List[BookSchema]) -> IngestSummary:
+        """
+        Sincroniza o catálogo com a lista de livros.
+        Insere os novos, atualiza apenas os alterados e remove os que sumiram,
+        preservando os IDs dos livros que continuam no catálogo.
+        """
+        summary = self.upsert_many(books)
+        seen = {natural_key(b.source_url, b.title, b.category) for b in books}
+        query = self.db.query(self.model.id, self.model.source_url, self.model.title, self.model.category)
+        summary.deleted = self._delete_unseen(query, seen)
+        self.db.commit()
+        invalidate_book_count()
+        return summary
+
+    def upsert_many(self, books: List[BookSchema]) -> IngestSummary:
+        """Insere ou atualiza um lote de livros pela chave natural e confirma a transação."""
+        summary = IngestSummary()
+
+        # Deduplica o lote pela chave natural (a última ocorrência prevalece)
+        incoming: Dict[NaturalKey, BookSchema] = {}
         for book in books:
-            db_book = BookModel(
-                title=book.title,
-                price=book.price,
-                rating=book.rating,
-                availability=book.availability,
-                category=book.category,
-                image_url=book.image_url
+            incoming[natural_key(book.source_url, book.title, book.category)] = book
+
+        existing = self._find_by_keys(incoming)
+        inserts: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+        for key, book in incoming.items():
+            row = self._to_row(book)
+            current = existing.get(key)
+            if current is None:
+                inserts.append(row)
+                continue
+
+            details_changed = _has_details(book) and any(
+                getattr(current, column) != row[column] for column in DETAIL_COLUMNS
             )
-            self.db.add(db_book)
+            image_changed = book.image_hash is not None and current.image_hash != book.image_hash
+            changed = current.content_hash != row["content_hash"] or current.source_url != book.source_url
+            if changed or details_changed or image_changed:
+                if not _has_details(book):
+                    # Livro não enriquecido nesta execução: preserva os detalhes já gravados
+                    row = {column: value for column, value in row.items() if column not in DETAIL_COLUMNS}
+                if book.image_hash is None:
+                    # Capa não baixada nesta execução: preserva a cópia local já registrada
+                    row.pop("image_hash")
+                updates.append({"id": current.id, **row})
+            else:
+                summary.unchanged += 1
+
+        summary.inserted = self._insert_rows(inserts)
+        summary.updated = self._update_rows(updates)
         self.db.commit()
+        invalidate_book_count()
+        return summary
 
-    def _to_schema(self, db_book: BookModel) -> BookSchema:
-        """Converte model para schema."""
-        return BookSchema(
-            id=db_book.id,
-            title=db_book.title,
-            price=db_book.price,
-            rating=db_book.rating,
-            availability=db_book.availability,
-            category=db_book.category,
-            image_url=db_book.image_url
+    def bulk_insert(self, books: List[BookSchema], batch_size: Optional[int] = None) -> int:
+        """
+        Insere livros em massa, sem passar pela unit-of-work do ORM, e confirma a transação.
+        Usa COPY FROM STDIN no PostgreSQL e INSERT em lotes (executemany) nos demais bancos.
+        """
+        inserted = self._insert_rows([self._to_row(book) for book in books], batch_size)
+        self.db.commit()
+        invalidate_book_count()
+        return inserted
+
+    def find_unchanged_details(self, books: List[BookSchema]) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna os detalhes gravados (URL → campos) dos livros já enriquecidos
+        cuja listagem não mudou, dispensando uma nova busca da página de detalhe.
+        """
+        hashes = {book.source_url: book_content_hash(book) for book in books if book.source_url}
+        columns = [getattr(self.model, column) for column in DETAIL_COLUMNS]
+
+        found: Dict[str, Dict[str, Any]] = {}
+        for chunk in _chunks(list(hashes)):
+            query = self.db.query(self.model.source_url, self.model.content_hash, *columns).filter(
+                self.model.source_url.in_(chunk),
+                self.model.upc.isnot(None)
+            )
+            for row in query:
+                if row.content_hash == hashes[row.source_url]:
+                    found[row.source_url] = {column: getattr(row, column) for column in DETAIL_COLUMNS}
+        return found
+
+    def delete_missing(self, category: str, seen_keys: Set[NaturalKey]) -> int:
+        """Remove os livros da categoria que não apareceram na última raspagem."""
+        query = self.db.query(self.model.id, self.model.source_url, self.model.title, self.model.category)
+        deleted = self._delete_unseen(query.filter(self.model.category == category), seen_keys)
+        self.db.commit()
+        invalidate_book_count()
+        return deleted
+
+    def delete_categories_except(self, categories: Set[str]) -> int:
+        """Remove os livros das categorias que não existem mais no site."""
+        stale = [c for c in self.get_categories() if c not in categories]
+        deleted = 0
+        for chunk in _chunks(stale):
+            query = self.db.query(self.model).filter(self.model.category.in_(chunk))
+            deleted += query.delete(synchronize_session=False)
+        self.db.commit()
+        invalidate_book_count()
+        return deleted
+
+    def _find_by_keys(self, incoming: Dict[NaturalKey, BookSchema]) -> Dict[NaturalKey, Any]:
+        """Carrega (id, URL, hash) dos livros existentes para as chaves informadas."""
+        found: Dict[NaturalKey, Any] = {}
+        columns = (
+            self.model.id, self.model.source_url, self.model.title, self.model.category, self.model.content_hash,
+            self.model.image_hash, *(getattr(self.model, column) for column in DETAIL_COLUMNS)
         )
+
+        urls = [key[1] for key in incoming if key[0] == "url"]
+        for chunk in _chunks(urls):
+            for row in self.db.query(*columns).filter(self.model.source_url.in_(chunk)):
+                found[("url", row.source_url)] = row
+
+        # Registros sem URL (legados ou de fontes sem link) são casados por título + categoria;
+        # na atualização adotam a URL, preservando o ID
+        pending = {(book.title, book.category): key for key, book in incoming.items() if key not in found}
+        titles = sorted({title for title, _ in pending})
+        for chunk in _chunks(titles):
+            query = self.db.query(*columns).filter(self.model.source_url.is_(None), self.model.title.in_(chunk))
+            for row in query:
+                key = pending.get((row.title, row.category))
+                if key is not None:
+                    found[key] = row
+        return found
+
+    def _insert_rows(self, rows: List[Dict[str, Any]], batch_size: Optional[int] = None) -> int:
+        """Insere linhas em lotes (sem commit)."""
+        if not rows:
+            return 0
+        if self.db.get_bind().dialect.name == "postgresql":
+            return self._copy_rows(rows)
+
+        batch_size = batch_size or settings.DB_BULK_BATCH_SIZE
+        for chunk in _chunks(rows, batch_size):
+            # Uma instrução com lista de parâmetros: executemany / insertmanyvalues do dialeto
+            self.db.execute(insert(self.model.__table__), chunk)
+        return len(rows)
+
+    def _copy_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """Caminho rápido do PostgreSQL: COPY FROM STDIN em formato CSV (sem commit)."""
+        buffer = encode_copy_rows(rows)
+        table = self.model.__table__.name
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(WRITE_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                buffer
+            )
+        finally:
+            cursor.close()
+        return len(rows)
+
+    def _update_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """Atualiza linhas pela chave primária em lotes (sem commit)."""
+        # Cada executemany exige o mesmo conjunto de colunas: agrupa as linhas por colunas
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(row)
+
+        for group in groups.values():
+            for chunk in _chunks(group, settings.DB_BULK_BATCH_SIZE):
+                # UPDATE em massa por chave primária (executemany)
+                self.db.execute(update(self.model), chunk)
+        return len(rows)
+
+    def _delete_unseen(self, query, seen_keys: Set[NaturalKey]) -> int:
+        """Remove os registros da consulta cuja chave natural não foi vista."""
+        stale_ids = [
+            row.id for row in query
+            if natural_key(row.source_url, row.title, row.category) not in seen_keys
+        ]
+        for chunk in _chunks(stale_ids):
+            self.db.query(self.model).filter(self.model.id.in_(chunk)).delete(synchronize_session=False)
+        return len(stale_ids)
+
+    @staticmethod
+    def _to_row(book: BookSchema) -> Dict[str, Any]:
+        """Converte schema para a linha gravada na tabela."""
+        return {
+            "title": book.title,
+            "price": book.price,
+            "rating": book.rating,
+            "availability": book.availability,
+            "category": book.category,
+            "image_url": book.image_url,
+            "image_hash": book.image_hash,
+            "source_url": book.source_url,
+            "content_hash": book_content_hash(book),
+            "upc": book.upc,
+            "description": book.description,
+            "stock_count": book.stock_count,
+            "num_reviews": book.num_reviews
+        }
+
+    @staticmethod
+    def _to_schema(db_book: BookModel) -> BookSchema:
+        """Converte model para schema."""
+        return book_to_schema(db_book)
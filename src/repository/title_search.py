@@ -0,0 +1,237 @@
+"""
+Busca textual por título.
+Substitui o `ILIKE '%termo%'` (varredura da tabela inteira) por um índice de
+texto com ranking por relevância, correspondência por prefixo e tolerância a
+erros de digitação:
+
+- PostgreSQL: índice GIN sobre `to_tsvector(title)` (ranking com ts_rank) e
+  índice GIN de trigramas (pg_trgm) para a busca aproximada;
+- SQLite: tabela FTS5 `books_fts` (ranking bm25), mantida por triggers na
+  tabela `books`; a busca aproximada corrige os termos pelo vocabulário do
+  índice (fts5vocab).
+
+A busca aproximada só é feita quando a busca exata não preenche o limite.
+"""
+import difflib
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from src.models.book import BookModel
+from src.core.config import settings
+from src.core.logging import logger
+
+LIVE_TABLE = BookModel.__tablename__
+FTS_TABLE = f"{LIVE_TABLE}_fts"
+FTS_VOCAB_TABLE = f"{LIVE_TABLE}_fts_vocab"
+
+# Triggers que mantêm a tabela FTS5 (conteúdo externo) sincronizada com `books`
+SQLITE_TRIGGERS = {
+    f"{FTS_TABLE}_ai": (
+        f"AFTER INSERT ON {LIVE_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, title) VALUES (new.id, new.title); END"
+    ),
+    f"{FTS_TABLE}_ad": (
+        f"AFTER DELETE ON {LIVE_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title) VALUES ('delete', old.id, old.title); END"
+    ),
+    f"{FTS_TABLE}_au": (
+        f"AFTER UPDATE OF title ON {LIVE_TABLE} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title) VALUES ('delete', old.id, old.title); "
+        f"INSERT INTO {FTS_TABLE}(rowid, title) VALUES (new.id, new.title); END"
+    ),
+}
+
+
+def search_terms(query: str) -> List[str]:
+    """Termos da busca, em minúsculas e sem acentos."""
+    normalized = unicodedata.normalize("NFKD", query.lower())
+    return re.findall(r"[^\W_]+", "".join(c for c in normalized if not unicodedata.combining(c)))
+
+
+class TitleSearch(ABC):
+    """Índice de busca por título de um dialeto."""
+
+    @abstractmethod
+    def ensure(self, conn: Connection, table: str = LIVE_TABLE):
+        """Cria as estruturas de busca da tabela, se ainda não existirem."""
+        pass
+
+    def attach(self, conn: Connection):
+        """Reaponta o índice para a tabela `books` após uma troca do catálogo."""
+        pass
+
+    @abstractmethod
+    def search_ids(self, db: Session, query: str, category: Optional[str], limit: int) -> List[int]:
+        """IDs dos livros encontrados, do mais ao menos relevante."""
+        pass
+
+
+class LikeTitleSearch(TitleSearch):
+    """Dialetos sem índice de texto: ILIKE (sem ranking nem tolerância a erros)."""
+
+    def ensure(self, conn: Connection, table: str = LIVE_TABLE):
+        """Nada a criar."""
+        pass
+
+    def search_ids(self, db: Session, query: str, category: Optional[str], limit: int) -> List[int]:
+        """Títulos que contêm o texto, em ordem de ID."""
+        books = db.query(BookModel.id).filter(BookModel.title.ilike(f"%{query}%"))
+        if category:
+            books = books.filter(BookModel.category == category)
+        return [row.id for row in books.order_by(BookModel.id).limit(limit)]
+
+
+class SQLiteTitleSearch(TitleSearch):
+    """FTS5 com conteúdo externo (a própria tabela `books`)."""
+
+    def ensure(self, conn: Connection, table: str = LIVE_TABLE):
+        """Cria a tabela FTS5 e os triggers da tabela `books` (staging não são indexadas)."""
+        if table != LIVE_TABLE:
+            return
+        created = not conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+        if created:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                f"title, content='{LIVE_TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            ))
+            conn.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_VOCAB_TABLE} USING fts5vocab({FTS_TABLE}, 'row')"))
+        triggers = {
+            row.name for row in conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"), {"table": LIVE_TABLE}
+            )
+        }
+        if created or set(SQLITE_TRIGGERS) - triggers:
+            self.attach(conn)
+            logger.info(f"Índice de busca '{FTS_TABLE}' criado")
+
+    def attach(self, conn: Connection):
+        """Recria os triggers na tabela `books` atual e reconstrói o índice a partir dela."""
+        for name, body in SQLITE_TRIGGERS.items():
+            # Após a troca, os triggers antigos seguem a tabela renomeada para books_previous
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+            conn.execute(text(f"CREATE TRIGGER {name} {body}"))
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+    def search_ids(self, db: Session, query: str, category: Optional[str], limit: int) -> List[int]:
+        """Busca por prefixo ordenada por bm25; completa com os termos corrigidos pelo vocabulário."""
+        terms = search_terms(query)
+        if not terms:
+            return []
+        ids = self._match(db, " AND ".join(f'"{term}"*' for term in terms), category, limit)
+        if len(ids) < limit:
+            corrected = " AND ".join(self._alternatives(db, term) for term in terms)
+            ids += [id for id in self._match(db, corrected, category, limit) if id not in ids][:limit - len(ids)]
+        return ids
+
+    def _match(self, db: Session, match: str, category: Optional[str], limit: int) -> List[int]:
+        """Executa a consulta FTS5."""
+        sql = (
+            f"SELECT {LIVE_TABLE}.id FROM {FTS_TABLE} JOIN {LIVE_TABLE} ON {LIVE_TABLE}.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match {'AND category = :category ' if category else ''}"
+            f"ORDER BY {FTS_TABLE}.rank LIMIT :limit"
+        )
+        return [row.id for row in db.execute(text(sql), {"match": match, "category": category, "limit": limit})]
+
+    def _alternatives(self, db: Session, term: str) -> str:
+        """Termo e as palavras do índice parecidas com ele (mesma inicial)."""
+        candidates = [
+            row.term for row in db.execute(
+                text(f"SELECT term FROM {FTS_VOCAB_TABLE} WHERE term >= :low AND term < :high"),
+                {"low": term[0], "high": chr(ord(term[0]) + 1)}
+            )
+            if abs(len(row.term) - len(term)) <= 2
+        ]
+        close = difflib.get_close_matches(term, candidates, n=3, cutoff=settings.SEARCH_FUZZY_MIN_SIMILARITY)
+        return "(" + " OR ".join([f'"{term}"*', *(f'"{word}"' for word in close if word != term)]) + ")"
+
+
+class PostgresTitleSearch(TitleSearch):
+    """tsvector + GIN e trigramas (pg_trgm) + GIN."""
+
+    def __init__(self):
+        """Inicializa sem saber ainda se o pg_trgm está disponível."""
+        self._trigram: Optional[bool] = None
+
+    @property
+    def config(self) -> str:
+        """Configuração de texto do PostgreSQL (SEARCH_TEXT_CONFIG)."""
+        return re.sub(r"[^a-z_]", "", settings.SEARCH_TEXT_CONFIG.lower())
+
+    @property
+    def vector(self) -> str:
+        """Expressão do tsvector (idêntica à do índice, para que ele seja usado)."""
+        return f"to_tsvector('{self.config}', coalesce(title, ''))"
+
+    def ensure(self, conn: Connection, table: str = LIVE_TABLE):
+        """Cria os índices GIN da tabela (a staging recebe os seus antes da troca)."""
+        definitions = [
+            row.indexdef for row in conn.execute(
+                text("SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"),
+                {"table": table}
+            )
+        ]
+        if not any("to_tsvector" in definition for definition in definitions):
+            conn.execute(text(f"CREATE INDEX ix_{table}_title_fts ON {table} USING gin ({self.vector})"))
+            logger.info(f"Índice de busca 'ix_{table}_title_fts' criado")
+
+        if self._has_trigram(conn) and not any("gin_trgm_ops" in definition for definition in definitions):
+            conn.execute(text(f"CREATE INDEX ix_{table}_title_trgm ON {table} USING gin (title gin_trgm_ops)"))
+            logger.info(f"Índice de trigramas 'ix_{table}_title_trgm' criado")
+
+    def _has_trigram(self, conn: Connection) -> bool:
+        """Garante a extensão pg_trgm; sem permissão para criá-la, a busca fica sem tolerância a erros."""
+        if self._trigram is None:
+            try:
+                with conn.begin_nested():
+                    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                self._trigram = True
+            except DBAPIError as e:
+                logger.warning(f"Extensão pg_trgm indisponível; busca sem tolerância a erros: {e}")
+                self._trigram = False
+        return self._trigram
+
+    def search_ids(self, db: Session, query: str, category: Optional[str], limit: int) -> List[int]:
+        """Busca por prefixo ordenada por ts_rank; completa com a similaridade de trigramas."""
+        terms = search_terms(query)
+        if not terms:
+            return []
+        where_category = "AND category = :category " if category else ""
+        params: Dict = {"query": " & ".join(f"{term}:*" for term in terms), "category": category, "limit": limit}
+        tsquery = f"to_tsquery('{self.config}', :query)"
+        sql = (
+            f"SELECT id FROM {LIVE_TABLE} WHERE {self.vector} @@ {tsquery} {where_category}"
+            f"ORDER BY ts_rank({self.vector}, {tsquery}) DESC, id LIMIT :limit"
+        )
+        ids = [row.id for row in db.execute(text(sql), params)]
+
+        if len(ids) < limit and self._has_trigram(db.connection()):
+            # Limite de similaridade usado pelo operador <% (e pelo índice de trigramas)
+            db.execute(
+                text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+                {"threshold": str(settings.SEARCH_FUZZY_MIN_SIMILARITY)}
+            )
+            params["query"] = " ".join(terms)
+            sql = (
+                f"SELECT id FROM {LIVE_TABLE} WHERE :query <% title {where_category}"
+                f"ORDER BY word_similarity(:query, title) DESC, id LIMIT :limit"
+            )
+            ids += [id for id in (row.id for row in db.execute(text(sql), params)) if id not in ids][:limit - len(ids)]
+        return ids
+
+
+_backends: Dict[str, TitleSearch] = {}
+
+
+def get_title_search(dialect: str) -> TitleSearch:
+    """Índice de busca do dialeto (instância única por dialeto)."""
+    if dialect not in _backends:
+        backend = {"postgresql": PostgresTitleSearch, "sqlite": SQLiteTitleSearch}.get(dialect, LikeTitleSearch)
+        _backends[dialect] = backend()
+    return _backends[dialect]
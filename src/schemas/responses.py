@@ -3,6 +3,7 @@ Schemas de resposta da API.
 Define os modelos de dados para respostas.
 """
 from pydantic import BaseModel, validator
+from datetime import datetime
 from typing import List, Optional
 
 class BookBase(BaseModel):
@@ -14,6 +15,12 @@ class BookBase(BaseModel):
     availability: bool             # Disponibilidade
     category: str                  # Categoria
     image_url: str                 # URL da imagem
+    image_hash: Optional[str] = None  # Hash da capa local (servida em /images/{hash})
+    source_url: Optional[str] = None  # URL do livro no site fonte
+    upc: Optional[str] = None      # Código UPC
+    description: Optional[str] = None  # Descrição
+    stock_count: Optional[int] = None  # Exemplares em estoque
+    num_reviews: Optional[int] = None  # Número de avaliações
     
     @validator("rating")
     def validate_rating(cls, v):
@@ -29,8 +36,10 @@ class BookResponse(BookBase):
 class PaginatedBooks(BaseModel):
     """Schema para resposta paginada de livros."""
     total: int                     # Total de livros
-    page: int                      # Página atual
+    total_estimated: bool = False  # Total estimado pelas estatísticas do banco
+    page: Optional[int] = None     # Página atual (None na paginação por cursor)
     limit: int                     # Itens por página
+    next_cursor: Optional[str] = None  # Cursor da próxima página (None na última)
     items: List[BookResponse]      # Lista de livros
 
 class CategoryStats(BaseModel):
@@ -45,3 +54,26 @@ class HealthResponse(BaseModel):
     status: str                    # Status da API
     version: str                   # Versão
     timestamp: str                 # Data/hora da verificação
+
+class ScrapeJobResponse(BaseModel):
+    """Schema para o estado de um job de scraping."""
+    job_id: str                    # ID do job
+    status: str                    # pending, running, completed, failed ou cancelled
+    triggered_by: str              # Usuário que disparou
+    resume: bool                   # Retomada de execução interrompida
+    workers: int = 0               # Processos workers (0 = crawl no próprio processo)
+    run_id: Optional[str] = None   # ID da execução (checkpoint)
+    created_at: datetime           # Criação do job
+    started_at: Optional[datetime] = None   # Início da execução
+    finished_at: Optional[datetime] = None  # Término da execução
+    categories_total: int          # Categorias encontradas no site
+    categories_done: int           # Categorias concluídas
+    pages_fetched: int             # Páginas de listagem processadas
+    pages_estimated: Optional[int] = None   # Estimativa do total de páginas
+    books_parsed: int              # Livros extraídos
+    books_written: int             # Livros gravados no banco
+    pages_per_second: float        # Taxa de páginas
+    books_per_second: float        # Taxa de livros
+    elapsed_seconds: float         # Tempo de execução
+    eta_seconds: Optional[float] = None     # Tempo restante estimado
+    error: Optional[str] = None    # Erro, se o job falhou
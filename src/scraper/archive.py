@@ -0,0 +1,225 @@
+"""
+Arquivo de HTML bruto.
+Guarda as respostas do scraper em blobs comprimidos endereçados pelo conteúdo
+(SHA-256) e mantém um índice URL → hash. Páginas idênticas são armazenadas uma
+única vez. Permite reconstruir o catálogo sem rede (modo --reparse).
+
+Cada entrada do índice pertence ao crawl (execução) que a buscou. O reparse usa
+apenas o último crawl completo: páginas e categorias que sumiram do site não
+voltam ao catálogo. Ao concluir um crawl completo, as entradas dos anteriores
+são removidas (os blobs continuam deduplicados pelo conteúdo).
+"""
+import hashlib
+import sqlite3
+import time
+import uuid
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+from src.core.logging import logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+@dataclass
+class ArchivedPage:
+    """Entrada do índice do arquivo."""
+    url: str                       # URL de origem
+    content_hash: str              # SHA-256 do HTML
+    category: str                  # Categoria da listagem
+    page: int                      # Número da página
+
+
+class RawArchive:
+    """Arquivo de HTML endereçado por conteúdo (blobs zstd + índice SQLite)."""
+
+    def __init__(self, root: Path):
+        """Abre (ou cria) o arquivo no diretório informado."""
+        self.root = Path(root)
+        self.blobs_dir = self.root / "blobs"
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+
+        # zstd é o formato preferido; sem o pacote, usa zlib (extensão .zz)
+        if zstandard is None:
+            logger.warning("Pacote 'zstandard' não instalado. Arquivo de HTML usará zlib.")
+            self._extension = ".zz"
+        else:
+            self._extension = ".zst"
+            self._compressor = zstandard.ZstdCompressor(level=10)
+
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite3"))
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS archive_crawls (
+                crawl_id TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                complete INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS archive_pages (
+                crawl_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                category TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (crawl_id, url)
+            )
+            """
+        )
+        self._migrate_legacy_index()
+        self._conn.commit()
+        self.crawl_id: Optional[str] = None
+        self.stored = 0            # Blobs novos gravados nesta sessão
+        self.deduplicated = 0      # Páginas cujo conteúdo já estava arquivado
+
+    def _migrate_legacy_index(self):
+        """Converte o índice antigo (sem crawl) em um crawl completo, para o reparse continuar funcionando."""
+        legacy = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'archive_index'"
+        ).fetchone()
+        if not legacy:
+            return
+        self._conn.execute(
+            "INSERT OR IGNORE INTO archive_crawls (crawl_id, started_at, finished_at, complete) VALUES ('legacy', 0, 0, 1)"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO archive_pages (crawl_id, url, content_hash, category, page, fetched_at) "
+            "SELECT 'legacy', url, content_hash, category, page, fetched_at FROM archive_index"
+        )
+        self._conn.execute("DROP TABLE archive_index")
+        logger.info("Índice do arquivo de HTML migrado: entradas antigas registradas como um crawl completo")
+
+    def begin_crawl(self, crawl_id: str) -> bool:
+        """
+        Passa a registrar as páginas no crawl informado (o ID da execução: uma
+        retomada e os vários workers compartilham o mesmo). Retorna True se o
+        crawl já existia, com as páginas arquivadas antes da interrupção.
+        """
+        self.crawl_id = crawl_id
+        cursor = self._conn.execute(
+            "INSERT OR IGNORE INTO archive_crawls (crawl_id, started_at) VALUES (?, ?)", (crawl_id, time.time())
+        )
+        self._conn.commit()
+        return cursor.rowcount == 0
+
+    def finish_crawl(self, complete: bool, crawl_id: Optional[str] = None) -> bool:
+        """
+        Encerra o crawl atual (ou o informado). Completo, ele passa a ser a fonte do
+        reparse e as entradas dos crawls iniciados antes dele são removidas. Retorna se
+        o crawl foi registrado como completo (não é, se outro crawl já o removeu do índice).
+        """
+        self.crawl_id = crawl_id or self.crawl_id
+        exists = self._conn.execute(
+            "SELECT started_at FROM archive_crawls WHERE crawl_id = ?", (self.crawl_id,)
+        ).fetchone()
+        if not exists:
+            # Removido por um crawl completo mais novo: as páginas anteriores a isso se perderam
+            logger.warning(f"Crawl {self.crawl_id} removido do arquivo de HTML durante a execução; descartando as suas páginas")
+            self._conn.execute("DELETE FROM archive_pages WHERE crawl_id = ?", (self.crawl_id,))
+            self._conn.commit()
+            return False
+
+        self._conn.execute(
+            "UPDATE archive_crawls SET finished_at = ?, complete = ? WHERE crawl_id = ?",
+            (time.time(), int(complete), self.crawl_id)
+        )
+        if complete:
+            stale = [
+                row[0] for row in self._conn.execute(
+                    "SELECT crawl_id FROM archive_crawls WHERE crawl_id != ? AND started_at <= ?",
+                    (self.crawl_id, exists[0])
+                )
+            ]
+            for crawl_id in stale:
+                self._conn.execute("DELETE FROM archive_pages WHERE crawl_id = ?", (crawl_id,))
+                self._conn.execute("DELETE FROM archive_crawls WHERE crawl_id = ?", (crawl_id,))
+            if stale:
+                logger.info(f"Arquivo de HTML: entradas de {len(stale)} crawls anteriores removidas")
+        self._conn.commit()
+        return complete
+
+    def latest_complete_crawl(self) -> Optional[str]:
+        """ID do último crawl concluído por completo (a fonte do reparse)."""
+        row = self._conn.execute(
+            "SELECT crawl_id FROM archive_crawls WHERE complete = 1 ORDER BY finished_at DESC LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def _blob_path(self, content_hash: str, extension: str) -> Path:
+        """Caminho do blob: blobs/ab/abcdef...ext."""
+        return self.blobs_dir / content_hash[:2] / f"{content_hash}{extension}"
+
+    def store(self, url: str, content: str, category: str, page: int) -> str:
+        """Arquiva o HTML de uma listagem no crawl atual e retorna o hash do conteúdo."""
+        if self.crawl_id is None:
+            self.begin_crawl(uuid.uuid4().hex)
+        data = content.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        if self._find_blob(content_hash):
+            self.deduplicated += 1
+        else:
+            path = self._blob_path(content_hash, self._extension)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            compressed = self._compressor.compress(data) if zstandard else zlib.compress(data, 9)
+            # Grava em arquivo temporário e renomeia, evitando blobs parciais
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_bytes(compressed)
+            tmp_path.replace(path)
+            self.stored += 1
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO archive_pages (crawl_id, url, content_hash, category, page, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (self.crawl_id, url, content_hash, category, page, time.time())
+        )
+        self._conn.commit()
+        return content_hash
+
+    def _find_blob(self, content_hash: str) -> Optional[Path]:
+        """Localiza o blob do hash em qualquer formato de compressão."""
+        for extension in (".zst", ".zz"):
+            path = self._blob_path(content_hash, extension)
+            if path.exists():
+                return path
+        return None
+
+    def load(self, content_hash: str) -> str:
+        """Lê e descomprime o HTML arquivado."""
+        path = self._find_blob(content_hash)
+        if path is None:
+            raise FileNotFoundError(f"Blob {content_hash} não encontrado no arquivo")
+        data = path.read_bytes()
+        if path.suffix == ".zst":
+            if zstandard is None:
+                raise RuntimeError("O pacote 'zstandard' é necessário para ler blobs .zst")
+            return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+        return zlib.decompress(data).decode("utf-8")
+
+    def iter_pages(self) -> Iterator[ArchivedPage]:
+        """Percorre as páginas do último crawl completo em ordem de categoria e página."""
+        crawl_id = self.latest_complete_crawl()
+        if crawl_id is None:
+            logger.warning("O arquivo de HTML não tem nenhum crawl completo")
+            return
+        rows = self._conn.execute(
+            "SELECT url, content_hash, category, page FROM archive_pages WHERE crawl_id = ? ORDER BY category, page",
+            (crawl_id,)
+        )
+        for url, content_hash, category, page in rows:
+            yield ArchivedPage(url, content_hash, category, page)
+
+    def close(self):
+        """Fecha o índice."""
+        self._conn.close()
+        if self.stored or self.deduplicated:
+            logger.info(f"Arquivo de HTML: {self.stored} blobs novos, {self.deduplicated} páginas deduplicadas")
@@ -0,0 +1,223 @@
+"""
+Backends de parsing HTML.
+Permite escolher o motor usado para extrair listagens e categorias:
+- html.parser: BeautifulSoup com o parser puro Python (padrão)
+- lxml: BeautifulSoup com o parser em C do lxml
+- selectolax: extrator por seletores CSS, sem montar a árvore do BeautifulSoup
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup, SoupStrainer
+from src.scraper.parser import BookDetail, BookParser
+from src.schemas.responses import BookBase as Book
+from src.core.logging import logger
+
+
+@dataclass
+class ListingPage:
+    """Resultado do parsing de uma página de listagem."""
+    books: List[Book] = field(default_factory=list)      # Livros da página
+    page_count: Optional[int] = None                    # Total de páginas ("Page 1 of N")
+    next_href: Optional[str] = None                     # Link relativo da próxima página
+
+
+class ParserBackend(ABC):
+    """
+    Interface dos backends de parsing.
+    `base_url` e `rating_map` são os do site raspado (padrão: SCRAPE_URL e BookParser.RATING_MAP).
+    """
+
+    name: str = ""
+    base_url: Optional[str] = None
+    rating_map: Optional[Dict[str, int]] = None
+
+    @abstractmethod
+    def parse_listing(self, content: str, category: str) -> ListingPage:
+        """Extrai livros, paginador e link "next" de uma página de listagem."""
+        pass
+
+    @abstractmethod
+    def parse_categories(self, content: str) -> List[Tuple[str, str]]:
+        """Extrai pares (nome, link relativo) da lista de categorias."""
+        pass
+
+    @abstractmethod
+    def parse_detail(self, content: str) -> BookDetail:
+        """Extrai UPC, descrição, estoque e avaliações da página de detalhe."""
+        pass
+
+
+class SoupBackend(ParserBackend):
+    """
+    Backend BeautifulSoup.
+    Usa parsing parcial: apenas <article> (livros e página de detalhe) e
+    <ul> (paginador e lista de categorias) entram na árvore.
+    """
+
+    STRAINER = SoupStrainer(["article", "ul"])
+
+    def __init__(
+        self,
+        features: str = "html.parser",
+        base_url: Optional[str] = None,
+        rating_map: Optional[Dict[str, int]] = None
+    ):
+        """Inicializa com o parser do BeautifulSoup (html.parser ou lxml)."""
+        self.features = features
+        self.name = features
+        self.base_url = base_url
+        self.rating_map = rating_map
+
+    def _soup(self, content: str) -> BeautifulSoup:
+        """Monta a árvore parcial do documento."""
+        return BeautifulSoup(content, self.features, parse_only=self.STRAINER)
+
+    def parse_listing(self, content: str, category: str) -> ListingPage:
+        """Extrai livros, paginador e link "next" de uma página de listagem."""
+        soup = self._soup(content)
+        items = soup.find_all("article", class_="product_pod")
+        next_button = soup.find("li", class_="next")
+        return ListingPage(
+            books=[
+                BookParser.parse_book_item(item, category, self.base_url, self.rating_map)
+                for item in items
+            ],
+            page_count=BookParser.parse_page_count(soup),
+            next_href=next_button.find("a")["href"] if next_button else None
+        )
+
+    def parse_categories(self, content: str) -> List[Tuple[str, str]]:
+        """Extrai pares (nome, link relativo) da lista de categorias."""
+        soup = self._soup(content)
+        category_list = soup.find("ul", class_="nav-list")
+        if not category_list:
+            return []
+
+        categories = []
+        # Pula o primeiro item (Books - categoria pai)
+        for item in category_list.find_all("li")[1:]:
+            link = item.find("a")
+            if link:
+                categories.append((link.text.strip(), link["href"]))
+        return categories
+
+    def parse_detail(self, content: str) -> BookDetail:
+        """Extrai UPC, descrição, estoque e avaliações da página de detalhe."""
+        article = self._soup(content).find("article", class_="product_page")
+        if not article:
+            return BookDetail()
+
+        info = {
+            row.th.get_text(strip=True): row.td.get_text(strip=True)
+            for row in article.find_all("tr")
+            if row.th and row.td
+        }
+        # A descrição é o parágrafo logo após o cabeçalho "Product Description"
+        header = article.find(id="product_description")
+        paragraph = header.find_next_sibling("p") if header else None
+        return BookParser.build_detail(info, paragraph.get_text(strip=True) if paragraph else None)
+
+
+class SelectolaxBackend(ParserBackend):
+    """Backend selectolax: extrai apenas os nós necessários via seletores CSS."""
+
+    name = "selectolax"
+
+    def __init__(self, base_url: Optional[str] = None, rating_map: Optional[Dict[str, int]] = None):
+        """Carrega o selectolax (dependência opcional) com o motor lexbor."""
+        from selectolax.lexbor import LexborHTMLParser
+        self._html_parser = LexborHTMLParser
+        self.base_url = base_url
+        self.rating_map = rating_map
+
+    def parse_listing(self, content: str, category: str) -> ListingPage:
+        """Extrai livros, paginador e link "next" de uma página de listagem."""
+        tree = self._html_parser(content)
+
+        books = []
+        for pod in tree.css("article.product_pod"):
+            try:
+                books.append(BookParser.build_book(
+                    title=pod.css_first("h3 a").attributes["title"],
+                    price_text=pod.css_first("p.price_color").text(),
+                    rating_class=pod.css_first("p.star-rating").attributes["class"].split()[1],
+                    availability_text=pod.css_first("p.instock.availability").text(),
+                    image_src=pod.css_first("img.thumbnail").attributes["src"],
+                    category=category,
+                    href=pod.css_first("h3 a").attributes.get("href"),
+                    base_url=self.base_url,
+                    rating_map=self.rating_map
+                ))
+            except Exception as e:
+                logger.error(f"Erro ao processar item do livro: {e}")
+                raise
+
+        current = tree.css_first("ul.pager li.current")
+        next_link = tree.css_first("li.next a")
+        return ListingPage(
+            books=books,
+            page_count=BookParser.page_count_from_text(current.text()) if current else None,
+            next_href=next_link.attributes.get("href") if next_link else None
+        )
+
+    def parse_categories(self, content: str) -> List[Tuple[str, str]]:
+        """Extrai pares (nome, link relativo) da lista de categorias."""
+        tree = self._html_parser(content)
+        category_list = tree.css_first("ul.nav-list")
+        if not category_list:
+            return []
+
+        categories = []
+        # Pula o primeiro item (Books - categoria pai)
+        for item in category_list.css("li")[1:]:
+            link = item.css_first("a")
+            if link:
+                categories.append((link.text().strip(), link.attributes["href"]))
+        return categories
+
+    def parse_detail(self, content: str) -> BookDetail:
+        """Extrai UPC, descrição, estoque e avaliações da página de detalhe."""
+        article = self._html_parser(content).css_first("article.product_page")
+        if article is None:
+            return BookDetail()
+
+        info = {}
+        for row in article.css("tr"):
+            th, td = row.css_first("th"), row.css_first("td")
+            if th and td:
+                info[th.text(strip=True)] = td.text(strip=True)
+        # A descrição é o parágrafo logo após o cabeçalho "Product Description"
+        paragraph = article.css_first("#product_description + p")
+        return BookParser.build_detail(info, paragraph.text(strip=True) if paragraph else None)
+
+
+# Backends disponíveis e a dependência opcional de cada um
+PARSER_BACKENDS = {
+    "html.parser": None,
+    "lxml": "lxml",
+    "selectolax": "selectolax",
+}
+
+
+def get_parser_backend(
+    name: str,
+    base_url: Optional[str] = None,
+    rating_map: Optional[Dict[str, int]] = None
+) -> ParserBackend:
+    """
+    Retorna o backend de parsing pelo nome.
+    Se a dependência opcional não estiver instalada, volta para html.parser.
+    """
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Backend de parsing desconhecido: '{name}'. Opções: {', '.join(PARSER_BACKENDS)}")
+
+    try:
+        if name == "selectolax":
+            return SelectolaxBackend(base_url, rating_map)
+        if name == "lxml":
+            import lxml  # noqa: F401
+        return SoupBackend(name, base_url, rating_map)
+    except ImportError:
+        logger.warning(f"Backend '{name}' requer o pacote '{PARSER_BACKENDS[name]}'. Usando html.parser.")
+        return SoupBackend("html.parser", base_url, rating_map)
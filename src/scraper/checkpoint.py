@@ -0,0 +1,239 @@
+"""
+Checkpoint de execuções do scraping.
+Registra no banco, a cada lote gravado, as páginas e categorias concluídas de
+uma execução. Uma execução interrompida pode ser retomada: categorias
+concluídas não são raspadas de novo e as páginas já gravadas são puladas.
+Execuções com vários workers e exportações também são registradas (sem
+checkpoint de páginas): é o registro que protege a staging de cada uma.
+"""
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from sqlalchemy import and_, or_
+from src.core.database import SessionLocal
+from src.models.scrape_run import ScrapeRunCategoryModel, ScrapeRunModel, ScrapeRunPageModel
+from src.repository.sqlalchemy_repository import NaturalKey
+from src.core.config import settings
+from src.core.logging import logger
+
+# Página concluída: (categoria, página, chaves naturais dos livros)
+PageCheckpoint = Tuple[str, int, List[NaturalKey]]
+
+
+class RunCheckpoint:
+    """
+    Estado persistente de uma execução.
+    Os métodos acessam o banco com sessões próprias (o pipeline os chama
+    fora do event loop, via asyncio.to_thread).
+    """
+
+    RUNNING = "running"
+    FAILED = "failed"
+    COMPLETED = "completed"
+
+    # Tipos de execução (apenas as do pipeline são retomadas pelo checkpoint)
+    PIPELINE = "pipeline"
+    SHARDED = "sharded"
+    EXPORT = "export"
+
+    def __init__(self, run_id: str, resumed: bool = False):
+        """Inicializa o checkpoint vazio da execução."""
+        self.run_id = run_id
+        self.resumed = resumed
+        # Páginas já gravadas por categoria
+        self.done_pages: Dict[str, Set[int]] = {}
+        # Categorias concluídas → se foram raspadas por completo
+        self.done_categories: Dict[str, bool] = {}
+        # Chaves vistas nas categorias em andamento (para a remoção de livros ausentes)
+        self.seen_keys: Dict[str, Set[NaturalKey]] = {}
+        # Último heartbeat gravado (monotônico)
+        self._last_beat = 0.0
+
+    @classmethod
+    def open(cls, resume: Union[bool, str] = False) -> "RunCheckpoint":
+        """
+        Cria uma nova execução ou retoma uma anterior.
+        `resume=True` retoma a última execução interrompida; uma string retoma a execução com esse ID.
+        Só são retomadas execuções que falharam ou cujo último checkpoint tem mais de
+        SCRAPE_RUN_STALE_AFTER: uma execução ativa em outro processo nunca é assumida.
+        """
+        db = SessionLocal()
+        try:
+            run = None
+            if resume:
+                stale = datetime.utcnow() - timedelta(seconds=settings.SCRAPE_RUN_STALE_AFTER)
+                resumable = or_(
+                    ScrapeRunModel.status == cls.FAILED,
+                    and_(ScrapeRunModel.status == cls.RUNNING, ScrapeRunModel.updated_at < stale)
+                )
+                query = db.query(ScrapeRunModel).filter(
+                    or_(ScrapeRunModel.kind == cls.PIPELINE, ScrapeRunModel.kind.is_(None))
+                )
+                if isinstance(resume, str):
+                    run = query.filter(ScrapeRunModel.id == resume).first()
+                    if run is not None and run.status == cls.RUNNING and run.updated_at and run.updated_at >= stale:
+                        raise RuntimeError(
+                            f"A execução {resume} está em andamento em outro processo "
+                            f"(último checkpoint em {run.updated_at:%Y-%m-%d %H:%M:%S} UTC)"
+                        )
+                else:
+                    run = query.filter(resumable).order_by(ScrapeRunModel.started_at.desc()).first()
+                # Assume a execução apenas se ninguém a assumiu desde a consulta
+                if run is not None and run.status != cls.COMPLETED:
+                    claimed = db.query(ScrapeRunModel).filter(ScrapeRunModel.id == run.id, resumable).update(
+                        {ScrapeRunModel.status: cls.RUNNING, ScrapeRunModel.updated_at: datetime.utcnow()},
+                        synchronize_session=False
+                    )
+                    db.commit()
+                    if not claimed:
+                        raise RuntimeError(f"A execução {run.id} foi retomada por outro processo")
+                else:
+                    logger.warning(f"Nenhuma execução a retomar ({resume}). Iniciando uma nova.")
+                    run = None
+
+            if run is None:
+                checkpoint = cls(uuid.uuid4().hex)
+                db.add(ScrapeRunModel(id=checkpoint.run_id, status=cls.RUNNING, kind=cls.PIPELINE))
+                db.commit()
+                logger.info(f"Execução de scraping {checkpoint.run_id} iniciada")
+                return checkpoint
+
+            checkpoint = cls(run.id, resumed=True)
+            checkpoint._load(db)
+            logger.info(
+                f"Retomando execução {run.id}: {len(checkpoint.done_categories)} categorias e "
+                f"{sum(len(pages) for pages in checkpoint.done_pages.values())} páginas já concluídas"
+            )
+            return checkpoint
+        finally:
+            db.close()
+
+    @classmethod
+    def register(cls, run_id: str, kind: str) -> "RunCheckpoint":
+        """
+        Registra (ou reativa, em uma retomada) uma execução com ID próprio, como
+        a de vários workers: enquanto ativa, a sua staging não é descartada.
+        """
+        db = SessionLocal()
+        try:
+            run = db.query(ScrapeRunModel).filter(ScrapeRunModel.id == run_id).first()
+            checkpoint = cls(run_id, resumed=run is not None)
+            if run is None:
+                db.add(ScrapeRunModel(id=run_id, status=cls.RUNNING, kind=kind))
+            else:
+                run.status = cls.RUNNING
+                run.updated_at = datetime.utcnow()
+            db.commit()
+            return checkpoint
+        finally:
+            db.close()
+
+    def heartbeat(self):
+        """
+        Renova o horário do último checkpoint, no máximo a cada quarto de
+        SCRAPE_RUN_STALE_AFTER: mantém a execução ativa entre os lotes gravados.
+        """
+        now = time.monotonic()
+        if now - self._last_beat < settings.SCRAPE_RUN_STALE_AFTER / 4:
+            return
+        self._last_beat = now
+        db = SessionLocal()
+        try:
+            self._touch(db)
+            db.commit()
+        finally:
+            db.close()
+
+    def _load(self, db):
+        """Carrega as páginas e categorias concluídas da execução."""
+        categories = db.query(ScrapeRunCategoryModel).filter(ScrapeRunCategoryModel.run_id == self.run_id)
+        for row in categories:
+            self.done_categories[row.category] = row.complete
+
+        pages = db.query(ScrapeRunPageModel).filter(ScrapeRunPageModel.run_id == self.run_id)
+        for row in pages:
+            self.done_pages.setdefault(row.category, set()).add(row.page)
+            if row.category not in self.done_categories:
+                keys = self.seen_keys.setdefault(row.category, set())
+                keys.update(tuple(key) for key in json.loads(row.keys or "[]"))
+
+    def reset(self):
+        """Descarta o progresso registrado: a execução retomada recomeça do início."""
+        db = SessionLocal()
+        try:
+            for model in (ScrapeRunPageModel, ScrapeRunCategoryModel):
+                db.query(model).filter(model.run_id == self.run_id).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        self.done_pages.clear()
+        self.done_categories.clear()
+        self.seen_keys.clear()
+
+    def is_category_done(self, category: str) -> bool:
+        """Indica se a categoria foi concluída nesta execução."""
+        return category in self.done_categories
+
+    def is_page_done(self, category: str, page: int) -> bool:
+        """Indica se a página já foi gravada nesta execução."""
+        return page in self.done_pages.get(category, ())
+
+    def mark_pages(self, pages: List[PageCheckpoint], books: int):
+        """Registra páginas cujos livros já foram gravados."""
+        db = SessionLocal()
+        try:
+            db.bulk_insert_mappings(ScrapeRunPageModel, [
+                {"run_id": self.run_id, "category": category, "page": page, "keys": json.dumps(keys)}
+                for category, page, keys in pages
+            ])
+            self._touch(db, pages=len(pages), books=books)
+            db.commit()
+        finally:
+            db.close()
+        for category, page, _ in pages:
+            self.done_pages.setdefault(category, set()).add(page)
+
+    def mark_category(self, category: str, books: int, complete: bool):
+        """Registra uma categoria concluída."""
+        db = SessionLocal()
+        try:
+            db.add(ScrapeRunCategoryModel(run_id=self.run_id, category=category, books=books, complete=complete))
+            self._touch(db)
+            db.commit()
+        finally:
+            db.close()
+        self.done_categories[category] = complete
+        self.seen_keys.pop(category, None)
+
+    def finish(self, status: str, telemetry: Optional[Dict[str, Any]] = None):
+        """Encerra a execução, gravando a telemetria; concluída, descarta o registro de páginas."""
+        db = SessionLocal()
+        try:
+            run = db.query(ScrapeRunModel).filter(ScrapeRunModel.id == self.run_id).first()
+            run.status = status
+            run.updated_at = datetime.utcnow()
+            if telemetry is not None:
+                run.telemetry = json.dumps(telemetry)
+            if status == self.COMPLETED:
+                run.finished_at = run.updated_at
+                db.query(ScrapeRunPageModel).filter(
+                    ScrapeRunPageModel.run_id == self.run_id
+                ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _touch(self, db, pages: int = 0, books: int = 0):
+        """Atualiza os contadores e o horário do último checkpoint."""
+        db.query(ScrapeRunModel).filter(ScrapeRunModel.id == self.run_id).update({
+            ScrapeRunModel.pages: ScrapeRunModel.pages + pages,
+            ScrapeRunModel.books: ScrapeRunModel.books + books,
+            ScrapeRunModel.updated_at: datetime.utcnow()
+        }, synchronize_session=False)
+
+    @property
+    def all_complete(self) -> bool:
+        """Indica se todas as categorias concluídas foram raspadas por completo."""
+        return all(self.done_categories.values())
@@ -0,0 +1,78 @@
+"""
+Agendador do crawl.
+Compartilhado por todos os sites de uma execução: limita as requisições
+simultâneas de cada site ao seu orçamento (SCRAPE_SITE_CONCURRENCY ou o
+`max_concurrency` do adaptador, dividido entre os workers que raspam o site
+ao mesmo tempo) e deduplica a fronteira de URLs com um filtro
+de Bloom, de memória fixa mesmo com centenas de milhares de URLs.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urldefrag, urlsplit
+from src.scraper.bloom import BloomFilter
+from src.scraper.sites import SiteAdapter
+from src.core.config import settings
+from src.core.logging import logger
+
+
+@dataclass
+class FrontierStats:
+    """Resumo da fronteira de URLs."""
+    admitted: int = 0              # URLs novas aceitas
+    duplicates: int = 0            # URLs descartadas por já terem sido vistas
+
+
+class CrawlScheduler:
+    """Orçamento de concorrência por site e fronteira de URLs deduplicada."""
+
+    def __init__(
+        self,
+        sites: List[SiteAdapter],
+        budget: Optional[int] = None,
+        capacity: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        share: int = 1
+    ):
+        """Cria um semáforo por site (com 1/`share` do orçamento) e o filtro de Bloom da fronteira."""
+        share = max(1, share)
+        self.budget = max(1, (budget or settings.SCRAPE_SITE_CONCURRENCY) // share)
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        for site in sites:
+            limit = site.max_concurrency // share if site.max_concurrency else self.budget
+            self._slots.setdefault(site.host, asyncio.Semaphore(max(1, limit)))
+        self.frontier = BloomFilter(
+            capacity or settings.SCRAPE_FRONTIER_CAPACITY,
+            error_rate or settings.SCRAPE_FRONTIER_ERROR_RATE
+        )
+        self.stats = FrontierStats()
+        self._saturated = False
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Reserva uma das requisições simultâneas do site da URL."""
+        host = urlsplit(url).netloc
+        semaphore = self._slots.get(host)
+        if semaphore is None:
+            # Hosts fora dos sites configurados (ex.: CDN das capas) recebem o orçamento padrão
+            semaphore = self._slots[host] = asyncio.Semaphore(self.budget)
+        async with semaphore:
+            yield
+
+    def admit(self, url: str) -> bool:
+        """
+        Registra a URL na fronteira; retorna False se ela já foi vista na execução.
+        Um falso positivo (taxa SCRAPE_FRONTIER_ERROR_RATE) faz a página ser pulada.
+        """
+        if not self.frontier.add(urldefrag(url).url):
+            self.stats.duplicates += 1
+            return False
+        self.stats.admitted += 1
+        if not self._saturated and self.stats.admitted > self.frontier.capacity:
+            self._saturated = True
+            logger.warning(
+                f"Fronteira acima da capacidade ({self.frontier.capacity} URLs): "
+                "a taxa de falsos positivos aumenta; ajuste SCRAPE_FRONTIER_CAPACITY"
+            )
+        return True
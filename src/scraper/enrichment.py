@@ -0,0 +1,120 @@
+"""
+Enriquecimento pelas páginas de detalhe.
+A listagem não traz UPC, descrição, estoque exato nem número de avaliações.
+Esta etapa busca a página de detalhe de cada livro em paralelo, sob o mesmo
+rate limiter do crawl, sem repetir URLs em andamento (nem as mais recentes,
+guardadas em um LRU limitado por SCRAPE_DETAIL_CACHE_ENTRIES) e sem buscar
+livros cuja listagem não mudou desde a última gravação.
+"""
+import asyncio
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+import httpx
+from src.scraper.parser import BookDetail
+from src.schemas.responses import BookBase as Book
+from src.core.config import settings
+from src.core.logging import logger
+
+if TYPE_CHECKING:
+    from src.scraper.scraper import BookScraper
+
+# Consulta os detalhes já gravados dos livros inalterados: URL → campos de detalhe
+DetailLookup = Callable[[List[Book]], Dict[str, Dict[str, Any]]]
+
+
+@dataclass
+class EnrichmentStats:
+    """Contadores de uma execução do enriquecimento."""
+    fetched: int = 0               # Páginas de detalhe baixadas
+    reused: int = 0                # Livros inalterados com detalhes já gravados
+    deduplicated: int = 0          # URLs repetidas na execução (buscadas uma vez)
+    failed: int = 0                # Páginas de detalhe que falharam
+
+
+class DetailEnricher:
+    """Completa os livros de cada listagem com os dados da página de detalhe."""
+
+    def __init__(
+        self,
+        scraper: "BookScraper",
+        lookup: Optional[DetailLookup] = None,
+        concurrency: Optional[int] = None
+    ):
+        """Inicializa com o scraper (fetch e parsing) e a consulta de detalhes gravados."""
+        self.scraper = scraper
+        self.lookup = lookup
+        self.stats = EnrichmentStats()
+        self._semaphore = asyncio.Semaphore(max(1, concurrency or settings.SCRAPE_DETAIL_CONCURRENCY))
+        # Buscas em andamento: chamadas repetidas aguardam a mesma tarefa
+        self._pending: Dict[str, "asyncio.Future[Optional[BookDetail]]"] = {}
+        # Detalhes já resolvidos, mais recentes (a memória não cresce com o catálogo)
+        self._resolved: "OrderedDict[str, Optional[BookDetail]]" = OrderedDict()
+        self._max_resolved = max(0, settings.SCRAPE_DETAIL_CACHE_ENTRIES)
+
+    async def enrich(self, client: httpx.AsyncClient, books: List[Book]) -> List[Book]:
+        """Retorna os livros com os campos de detalhe preenchidos."""
+        known: Dict[str, Dict[str, Any]] = {}
+        if self.lookup:
+            try:
+                known = await asyncio.to_thread(self.lookup, books)
+            except Exception as e:
+                logger.warning(f"Erro ao consultar detalhes gravados: {e}")
+
+        async def enrich_book(book: Book) -> Book:
+            if not book.source_url:
+                return book
+            stored = known.get(book.source_url)
+            if stored is not None:
+                # Listagem inalterada: reaproveita os detalhes já gravados
+                self.stats.reused += 1
+                return book.model_copy(update=stored)
+            detail = await self._detail(client, book.source_url)
+            return book.model_copy(update=asdict(detail)) if detail else book
+
+        return list(await asyncio.gather(*(enrich_book(book) for book in books)))
+
+    async def _detail(self, client: httpx.AsyncClient, url: str) -> Optional[BookDetail]:
+        """Busca a página de detalhe, reaproveitando a busca em andamento ou recente da mesma URL."""
+        if url in self._resolved:
+            self._resolved.move_to_end(url)
+            self.stats.deduplicated += 1
+            return self._resolved[url]
+        task = self._pending.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_detail(client, url))
+            self._pending[url] = task
+            task.add_done_callback(lambda done: self._resolve(url, done))
+        else:
+            self.stats.deduplicated += 1
+        return await task
+
+    def _resolve(self, url: str, task: "asyncio.Future[Optional[BookDetail]]"):
+        """Move uma busca concluída para o LRU, descartando os detalhes mais antigos."""
+        self._pending.pop(url, None)
+        if task.cancelled() or task.exception() is not None or not self._max_resolved:
+            return
+        self._resolved[url] = task.result()
+        while len(self._resolved) > self._max_resolved:
+            self._resolved.popitem(last=False)
+
+    async def _fetch_detail(self, client: httpx.AsyncClient, url: str) -> Optional[BookDetail]:
+        """Baixa e processa uma página de detalhe; falhas não interrompem o crawl."""
+        async with self._semaphore:
+            try:
+                content = await self.scraper.fetch_page(client, url)
+                detail = await self.scraper.parse_detail(content, self.scraper.site_for(url))
+            except Exception as e:
+                logger.warning(f"Erro ao enriquecer {url}: {e}")
+                self.stats.failed += 1
+                return None
+        self.stats.fetched += 1
+        return detail
+
+    def close(self):
+        """Registra o resumo da execução."""
+        stats = self.stats
+        logger.info(
+            f"Páginas de detalhe: {stats.fetched} baixadas, {stats.reused} reaproveitadas, "
+            f"{stats.deduplicated} repetidas, {stats.failed} com erro"
+        )
@@ -2,29 +2,54 @@
 Exportador de dados.
 Salva os livros extraídos no banco de dados.
 """
-from typing import List
+import time
+import uuid
+from typing import List, Optional
 from src.schemas.responses import BookBase as Book
-from src.core.database import SessionLocal, engine, Base
+from src.scraper.telemetry import ScrapeTelemetry
+from src.scraper.checkpoint import RunCheckpoint
+from src.core.database import SessionLocal, engine
+from src.core.migrations import ensure_schema
 from src.models.book import BookModel
 from src.repository.sqlalchemy_repository import SQLAlchemyBookRepository
+from src.repository.dataset_swap import DatasetSwap, book_table_model
+from src.core.config import settings
 from src.core.logging import logger
 
 class DataExporter:
     """Classe para exportar dados para o banco."""
     
     @staticmethod
-    def export_to_db(books: List[Book]):
-        """Exporta lista de livros para o SQLite."""
+    def export_to_db(books: List[Book], telemetry: Optional[ScrapeTelemetry] = None):
+        """Exporta lista de livros para o SQLite (registrando o tempo de gravação na telemetria)."""
         logger.info(f"Exportando {len(books)} livros para SQLite...")
         
         # Garante que as tabelas existem
-        Base.metadata.create_all(bind=engine)
+        ensure_schema(engine)
         
+        # Com DB_STAGED_SWAP, grava em uma staging publicada de uma vez ao final
+        # (registrada em scrape_runs antes, para não ser descartada por outra execução)
+        swap = DatasetSwap(engine) if settings.DB_STAGED_SWAP else None
+        checkpoint = RunCheckpoint.register(uuid.uuid4().hex, RunCheckpoint.EXPORT) if swap else None
+        table = swap.prepare(checkpoint.run_id) if swap else None
+
         # Salva no banco
         db = SessionLocal()
         try:
-            repo = SQLAlchemyBookRepository(db)
-            repo.save_all(books)
-            logger.info("Exportação para SQLite concluída.")
+            repo = SQLAlchemyBookRepository(db, book_table_model(table)) if table else SQLAlchemyBookRepository(db)
+            started = time.perf_counter()
+            summary = repo.save_all(books)
+            if swap:
+                swap.swap(table)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if telemetry:
+                telemetry.record_db_write(len(books), elapsed_ms)
+            logger.info(f"Exportação concluída em {elapsed_ms:.0f}ms: {summary.dict()}")
+        except BaseException:
+            if checkpoint:
+                checkpoint.finish(RunCheckpoint.FAILED)
+            raise
         finally:
             db.close()
+        if checkpoint:
+            checkpoint.finish(RunCheckpoint.COMPLETED, telemetry.summary() if telemetry else None)
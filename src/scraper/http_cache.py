@@ -0,0 +1,140 @@
+"""
+Cache HTTP em disco para o scraper.
+Guarda, por URL, os validadores (ETag/Last-Modified), o corpo comprimido e a
+listagem já processada. Com eles o scraper envia requisições condicionais:
+um 304 dispensa tanto o download do corpo quanto um novo parsing.
+"""
+import json
+import sqlite3
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+from src.core.logging import logger
+
+
+@dataclass
+class CacheEntry:
+    """Entrada do cache para uma URL."""
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: str
+    parsed: Optional[Any] = None   # Listagem processada (registros leves), se houver
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Cabeçalhos de revalidação para a próxima requisição."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class CacheStats:
+    """Contadores de uso do cache em uma execução."""
+    hits: int = 0                  # Respostas 304 servidas do cache
+    misses: int = 0                # Respostas baixadas por completo
+    evictions: int = 0             # Entradas removidas por limite de tamanho
+
+    @property
+    def hit_ratio(self) -> float:
+        """Proporção de requisições resolvidas pelo cache."""
+        total = self.hits + self.misses
+        return round(self.hits / total, 4) if total else 0.0
+
+
+class HttpCache:
+    """Cache de revalidação persistido em SQLite, com despejo LRU."""
+
+    def __init__(self, path: Path, max_entries: int = 10000, max_bytes: int = 200 * 1024 * 1024):
+        """Abre (ou cria) o cache no caminho informado."""
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                parsed TEXT,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_http_cache_accessed_at ON http_cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Retorna a entrada da URL, se existir."""
+        row = self._conn.execute(
+            "SELECT etag, last_modified, body, parsed FROM http_cache WHERE url = ?", (url,)
+        ).fetchone()
+        if not row:
+            return None
+        etag, last_modified, body, parsed = row
+        return CacheEntry(
+            url=url,
+            etag=etag,
+            last_modified=last_modified,
+            body=zlib.decompress(body).decode("utf-8"),
+            parsed=json.loads(parsed) if parsed else None
+        )
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], body: str):
+        """Armazena a resposta; respostas sem validadores não são cacheadas."""
+        if not etag and not last_modified:
+            return
+        blob = zlib.compress(body.encode("utf-8"))
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO http_cache (url, etag, last_modified, body, parsed, size, accessed_at)
+            VALUES (?, ?, ?, ?, NULL, ?, ?)
+            """,
+            (url, etag, last_modified, blob, len(blob), time.time())
+        )
+        self._conn.commit()
+        self._evict()
+
+    def put_parsed(self, url: str, parsed: Any):
+        """Associa a listagem processada à entrada da URL."""
+        self._conn.execute("UPDATE http_cache SET parsed = ? WHERE url = ?", (json.dumps(parsed), url))
+        self._conn.commit()
+
+    def touch(self, url: str):
+        """Marca a entrada como usada agora (para o despejo LRU)."""
+        self._conn.execute("UPDATE http_cache SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        self._conn.commit()
+
+    def _evict(self):
+        """Remove as entradas menos usadas até respeitar os limites."""
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_cache").fetchone()
+        while count > self.max_entries or total > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT url, size FROM http_cache ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if not row:
+                break
+            self._conn.execute("DELETE FROM http_cache WHERE url = ?", (row[0],))
+            count -= 1
+            total -= row[1]
+            self.stats.evictions += 1
+        self._conn.commit()
+
+    def close(self):
+        """Fecha a conexão com o arquivo do cache."""
+        self._conn.close()
+        logger.info(
+            f"Cache HTTP: {self.stats.hits} hits, {self.stats.misses} misses "
+            f"(hit ratio {self.stats.hit_ratio:.1%}), {self.stats.evictions} despejos"
+        )
@@ -0,0 +1,203 @@
+"""
+Capas dos livros.
+Baixa as imagens de capa em paralelo (sob o rate limiter e o circuit breaker
+do crawl) e as guarda endereçadas pelo conteúdo (SHA-256): capas idênticas
+são armazenadas uma única vez. Um índice URL → hash mantém os validadores
+(ETag/Last-Modified), e as execuções seguintes enviam requisições
+condicionais: um 304 dispensa o download da imagem.
+"""
+import asyncio
+import hashlib
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import httpx
+from src.schemas.responses import BookBase as Book
+from src.core.config import settings
+from src.core.logging import logger
+
+if TYPE_CHECKING:
+    from src.scraper.scraper import BookScraper
+
+# Extensão dos arquivos por tipo de conteúdo (as demais imagens usam .img)
+IMAGE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+# Tipo de conteúdo servido por extensão
+MEDIA_TYPES = {**{extension: media for media, extension in IMAGE_EXTENSIONS.items()}, ".img": "application/octet-stream"}
+
+
+def image_file(root: Path, content_hash: str) -> Optional[Path]:
+    """Localiza o arquivo da imagem (root/ab/abcdef...ext), em qualquer extensão."""
+    for extension in MEDIA_TYPES:
+        path = Path(root) / content_hash[:2] / f"{content_hash}{extension}"
+        if path.exists():
+            return path
+    return None
+
+
+@dataclass
+class StoredImage:
+    """Entrada do índice de imagens."""
+    url: str                       # URL de origem
+    content_hash: str              # SHA-256 da imagem
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Cabeçalhos de revalidação para a próxima requisição."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class ImageStats:
+    """Contadores de uma execução do download de capas."""
+    downloaded: int = 0            # Imagens baixadas
+    not_modified: int = 0          # Revalidadas com 304 (sem download)
+    deduplicated: int = 0          # Baixadas, mas com conteúdo já armazenado
+    failed: int = 0                # Imagens que falharam
+
+
+class ImageStore:
+    """Armazenamento de imagens endereçado pelo conteúdo (arquivos + índice SQLite)."""
+
+    def __init__(self, root: Path):
+        """Abre (ou cria) o armazenamento no diretório informado."""
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite3"))
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS image_index (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[StoredImage]:
+        """Retorna a entrada da URL, se a imagem ainda estiver armazenada."""
+        row = self._conn.execute(
+            "SELECT content_hash, etag, last_modified FROM image_index WHERE url = ?", (url,)
+        ).fetchone()
+        if not row or not image_file(self.root, row[0]):
+            return None
+        return StoredImage(url, *row)
+
+    def put(
+        self,
+        url: str,
+        data: bytes,
+        content_type: Optional[str],
+        etag: Optional[str],
+        last_modified: Optional[str]
+    ) -> Tuple[str, bool]:
+        """Armazena a imagem; retorna o hash e se o conteúdo é novo."""
+        content_hash = hashlib.sha256(data).hexdigest()
+        created = image_file(self.root, content_hash) is None
+        if created:
+            media_type = (content_type or "").split(";")[0].strip().lower()
+            extension = IMAGE_EXTENSIONS.get(media_type, ".img")
+            path = self.root / content_hash[:2] / f"{content_hash}{extension}"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Grava em arquivo temporário e renomeia, evitando arquivos parciais
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO image_index (url, content_hash, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (url, content_hash, etag, last_modified, time.time())
+        )
+        self._conn.commit()
+        return content_hash, created
+
+    def close(self):
+        """Fecha o índice."""
+        self._conn.close()
+
+
+class ImageDownloader:
+    """Baixa as capas de cada listagem e preenche `image_hash` nos livros."""
+
+    def __init__(self, scraper: "BookScraper", store: ImageStore, concurrency: Optional[int] = None):
+        """Inicializa com o scraper (requisições) e o armazenamento."""
+        self.scraper = scraper
+        self.store = store
+        self.stats = ImageStats()
+        self._semaphore = asyncio.Semaphore(max(1, concurrency or settings.SCRAPE_IMAGE_CONCURRENCY))
+        # Uma tarefa por URL na execução: capas repetidas aguardam o mesmo download
+        self._images: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+
+    async def download(self, client: httpx.AsyncClient, books: List[Book]) -> List[Book]:
+        """Retorna os livros com o hash da capa armazenada."""
+
+        async def download_book(book: Book) -> Book:
+            if not book.image_url:
+                return book
+            content_hash = await self._image(client, book.image_url)
+            return book.model_copy(update={"image_hash": content_hash}) if content_hash else book
+
+        return list(await asyncio.gather(*(download_book(book) for book in books)))
+
+    async def _image(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """Baixa a imagem uma única vez por execução."""
+        task = self._images.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_image(client, url))
+            self._images[url] = task
+        return await task
+
+    async def _fetch_image(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """Revalida ou baixa uma imagem; falhas não interrompem o crawl."""
+        stored = self.store.get(url)
+        async with self._semaphore:
+            try:
+                response = await self.scraper.request(client, url, stored.conditional_headers() if stored else None)
+            except Exception as e:
+                logger.warning(f"Erro ao baixar a capa {url}: {e}")
+                self.stats.failed += 1
+                return None
+        if response is None:
+            self.stats.failed += 1
+            return None
+
+        if stored and response.status_code == 304:
+            self.stats.not_modified += 1
+            return stored.content_hash
+
+        content_hash, created = self.store.put(
+            url,
+            response.content,
+            response.headers.get("Content-Type"),
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified")
+        )
+        self.stats.downloaded += 1
+        if not created:
+            self.stats.deduplicated += 1
+        return content_hash
+
+    def close(self):
+        """Fecha o armazenamento e registra o resumo da execução."""
+        self.store.close()
+        stats = self.stats
+        logger.info(
+            f"Capas: {stats.downloaded} baixadas ({stats.deduplicated} já armazenadas), "
+            f"{stats.not_modified} não modificadas, {stats.failed} com erro"
+        )
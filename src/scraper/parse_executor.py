@@ -0,0 +1,109 @@
+"""
+Executor de parsing em processos.
+Tira o parsing HTML (CPU-bound) do event loop do scraper: os workers recebem
+o HTML bruto e devolvem registros leves (dicts), enquanto o event loop segue
+buscando outras páginas.
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+from src.scraper.backends import BookDetail, ListingPage
+from src.scraper.sites import BooksToScrapeSite, SiteAdapter, get_site_adapter
+from src.schemas.responses import BookBase as Book
+
+# Registro leve de uma listagem: (livros como dicts, total de páginas, link "next")
+ListingRecords = Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]
+
+# Site enviado aos workers: (nome do adaptador, URL base); None = site padrão
+SiteKey = Optional[Tuple[str, str]]
+
+# Backend de parsing de cada processo worker (definido uma única vez por processo)
+_worker_backend_name: Optional[str] = None
+
+# Adaptadores criados no worker, por site
+_worker_sites: Dict[SiteKey, SiteAdapter] = {}
+
+
+def available_cores() -> int:
+    """Retorna o número de núcleos disponíveis para o processo."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _init_worker(backend_name: str):
+    """Define o backend de parsing do processo worker."""
+    global _worker_backend_name
+    _worker_backend_name = backend_name
+
+
+def _worker_site(site: SiteKey) -> SiteAdapter:
+    """Adaptador do site no worker (criado no primeiro uso)."""
+    adapter = _worker_sites.get(site)
+    if adapter is None:
+        name, base_url = site or (BooksToScrapeSite.name, None)
+        adapter = _worker_sites[site] = get_site_adapter(name, base_url, _worker_backend_name)
+    return adapter
+
+
+def parse_listing_records(content: str, category: str, site: SiteKey = None) -> ListingRecords:
+    """Faz o parsing de uma listagem no worker e devolve registros leves."""
+    return listing_to_records(_worker_site(site).parse_listing(content, category))
+
+
+def parse_detail_record(content: str, site: SiteKey = None) -> Dict[str, Any]:
+    """Faz o parsing de uma página de detalhe no worker e devolve um dict."""
+    return asdict(_worker_site(site).parse_detail(content))
+
+
+def site_key(site: Optional[SiteAdapter]) -> SiteKey:
+    """Identificação serializável do adaptador, enviada aos workers."""
+    return (site.name, site.base_url) if site else None
+
+
+def listing_to_records(listing: ListingPage) -> ListingRecords:
+    """Converte a ListingPage em registros leves (serializáveis)."""
+    return [book.model_dump() for book in listing.books], listing.page_count, listing.next_href
+
+
+def records_to_listing(records: ListingRecords) -> ListingPage:
+    """Reconstrói a ListingPage a partir dos registros (já validados no worker)."""
+    books, page_count, next_href = records
+    return ListingPage(
+        books=[Book.model_construct(**book) for book in books],
+        page_count=page_count,
+        next_href=next_href
+    )
+
+
+class ParseExecutor:
+    """Pool de processos dedicado ao parsing de listagens."""
+
+    def __init__(self, backend_name: str, workers: int = 0):
+        """Cria o pool; `workers=0` usa um processo por núcleo disponível."""
+        self.workers = workers if workers > 0 else available_cores()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(backend_name,)
+        )
+
+    async def parse_listing(self, content: str, category: str, site: Optional[SiteAdapter] = None) -> ListingPage:
+        """Envia o HTML ao pool e aguarda a listagem sem bloquear o event loop."""
+        loop = asyncio.get_running_loop()
+        records = await loop.run_in_executor(
+            self._pool, parse_listing_records, content, category, site_key(site)
+        )
+        return records_to_listing(records)
+
+    async def parse_detail(self, content: str, site: Optional[SiteAdapter] = None) -> BookDetail:
+        """Envia o HTML de uma página de detalhe ao pool."""
+        loop = asyncio.get_running_loop()
+        record = await loop.run_in_executor(self._pool, parse_detail_record, content, site_key(site))
+        return BookDetail(**record)
+
+    def shutdown(self):
+        """Encerra os processos do pool."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
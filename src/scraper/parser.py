@@ -4,9 +4,21 @@ Extrai dados estruturados do HTML.
 """
 from bs4 import BeautifulSoup
 import re
+from dataclasses import dataclass
+from typing import Dict, Optional
 from src.schemas.responses import BookBase as Book
+from src.core.config import settings
 from src.core.logging import logger
 
+@dataclass
+class BookDetail:
+    """Dados extraídos da página de detalhe de um livro."""
+    upc: Optional[str] = None            # Código UPC
+    description: Optional[str] = None    # Descrição do produto
+    stock_count: Optional[int] = None    # Exemplares em estoque
+    num_reviews: Optional[int] = None    # Número de avaliações
+
+
 class BookParser:
     """Classe para analisar HTML e extrair dados de livros."""
     
@@ -20,36 +32,113 @@ class BookParser:
         "Five": 5
     }
 
+    # Texto do paginador: "Page 1 of 50"
+    PAGER_PATTERN = re.compile(r"Page\s+\d+\s+of\s+(\d+)")
+
+    # Estoque na página de detalhe: "In stock (22 available)"
+    STOCK_PATTERN = re.compile(r"\((\d+)\s+available\)")
+
+    @staticmethod
+    def page_count_from_text(text: str) -> Optional[int]:
+        """Extrai o total de páginas do texto do paginador."""
+        match = BookParser.PAGER_PATTERN.search(text)
+        return int(match.group(1)) if match else None
+
+    @staticmethod
+    def parse_page_count(soup) -> Optional[int]:
+        """Extrai o total de páginas do paginador, ou None se não houver."""
+        current = soup.find("li", class_="current")
+        if not current:
+            return None
+        return BookParser.page_count_from_text(current.text)
+
+    @staticmethod
+    def build_book(
+        title: str,
+        price_text: str,
+        rating_class: str,
+        availability_text: str,
+        image_src: str,
+        category: str,
+        href: Optional[str] = None,
+        base_url: Optional[str] = None,
+        rating_map: Optional[Dict[str, int]] = None
+    ) -> Book:
+        """
+        Monta o Book a partir dos valores brutos extraídos do HTML.
+        Compartilhado por todos os backends de parsing, garantindo saída idêntica.
+        `base_url` e `rating_map` vêm do adaptador do site (padrão: SCRAPE_URL e RATING_MAP).
+        """
+        base_url = base_url or settings.SCRAPE_URL
+        # Normaliza preço
+        price = float(re.sub(r"[^\d.]", "", price_text))
+
+        # Converte avaliação
+        rating = (rating_map or BookParser.RATING_MAP).get(rating_class, 0)
+
+        # Verifica disponibilidade (texto em inglês vem do site fonte)
+        availability = "In stock" in availability_text.strip()
+
+        # Monta URL da imagem
+        image_url = f"{base_url}/{image_src.replace('../', '')}"
+
+        # Monta URL do livro (chave natural): o link é relativo à página de listagem
+        source_url = None
+        if href:
+            path = href.replace("../", "").removeprefix("catalogue/")
+            source_url = f"{base_url}/catalogue/{path}"
+
+        return Book(
+            title=title,
+            price=price,
+            rating=rating,
+            availability=availability,
+            category=category,
+            image_url=image_url,
+            source_url=source_url
+        )
+
+    @staticmethod
+    def build_detail(info: Dict[str, str], description: Optional[str]) -> BookDetail:
+        """
+        Monta o BookDetail a partir da tabela "Product Information" (th → td)
+        e da descrição. Compartilhado por todos os backends de parsing.
+        """
+        # Estoque: quantidade entre parênteses; fora de estoque vira 0
+        availability = info.get("Availability", "")
+        match = BookParser.STOCK_PATTERN.search(availability)
+        if match:
+            stock_count = int(match.group(1))
+        else:
+            stock_count = None if "In stock" in availability else 0
+
+        reviews = info.get("Number of reviews", "")
+        return BookDetail(
+            upc=info.get("UPC") or None,
+            description=description or None,
+            stock_count=stock_count,
+            num_reviews=int(reviews) if reviews.isdigit() else None
+        )
+
     @staticmethod
-    def parse_book_item(html_soup, category: str) -> Book:
+    def parse_book_item(
+        html_soup,
+        category: str,
+        base_url: Optional[str] = None,
+        rating_map: Optional[Dict[str, int]] = None
+    ) -> Book:
         """Extrai dados de um item de livro do HTML."""
         try:
-            # Extrai título
-            title = html_soup.h3.a["title"]
-            
-            # Extrai e normaliza preço
-            price_text = html_soup.find("p", class_="price_color").text
-            price = float(re.sub(r"[^\d.]", "", price_text))
-            
-            # Extrai avaliação
-            rating_class = html_soup.find("p", class_="star-rating")["class"][1]
-            rating = BookParser.RATING_MAP.get(rating_class, 0)
-            
-            # Verifica disponibilidade (texto em inglês vem do site fonte)
-            availability_text = html_soup.find("p", class_="instock availability").text.strip()
-            availability = "In stock" in availability_text
-            
-            # Monta URL da imagem
-            image_src = html_soup.find("img", class_="thumbnail")["src"]
-            image_url = f"http://books.toscrape.com/{image_src.replace('../', '')}"
-            
-            return Book(
-                title=title,
-                price=price,
-                rating=rating,
-                availability=availability,
+            return BookParser.build_book(
+                title=html_soup.h3.a["title"],
+                price_text=html_soup.find("p", class_="price_color").text,
+                rating_class=html_soup.find("p", class_="star-rating")["class"][1],
+                availability_text=html_soup.find("p", class_="instock availability").text,
+                image_src=html_soup.find("img", class_="thumbnail")["src"],
                 category=category,
-                image_url=image_url
+                href=html_soup.h3.a.get("href"),
+                base_url=base_url,
+                rating_map=rating_map
             )
         except Exception as e:
             logger.error(f"Erro ao processar item do livro: {e}")
@@ -0,0 +1,236 @@
+"""
+Pipeline de scraping em streaming.
+Consome as páginas do BookScraper conforme são raspadas e grava os livros no
+banco em lotes, com memória limitada independentemente do tamanho do catálogo.
+A gravação é incremental: novos livros são inseridos, apenas os alterados são
+atualizados e os que sumiram do site são removidos. Cada lote gravado atualiza o
+checkpoint da execução, que pode ser retomada após uma interrupção.
+Com DB_STAGED_SWAP, os lotes vão para uma tabela de staging que substitui o
+catálogo de uma só vez ao final (ver src/repository/dataset_swap.py): a API
+nunca lê um catálogo pela metade.
+"""
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Union
+from src.scraper.scraper import BookScraper, CategoryCompleted, ScrapeEvent, ScrapedPage
+from src.scraper.checkpoint import PageCheckpoint, RunCheckpoint
+from src.schemas.responses import BookBase as Book
+from src.core.database import SessionLocal, engine
+from src.core.migrations import ensure_schema
+from src.repository.dataset_swap import DatasetSwap, book_table_model
+from src.repository.sqlalchemy_repository import (
+    IngestSummary,
+    NaturalKey,
+    SQLAlchemyBookRepository,
+    natural_key,
+)
+from src.core.config import settings
+from src.core.logging import logger
+
+
+@dataclass
+class PipelineResult:
+    """Resumo de uma execução do pipeline."""
+    pages: int = 0                 # Páginas processadas
+    books: int = 0                 # Livros gravados
+    books_parsed: int = 0          # Livros extraídos das páginas recebidas
+    batches: int = 0               # Lotes enviados ao banco
+    cache_hit_ratio: float = 0.0   # Proporção de páginas revalidadas pelo cache HTTP
+    changes: IngestSummary = field(default_factory=IngestSummary)  # Inseridos/atualizados/removidos
+    run_id: Optional[str] = None   # ID da execução (checkpoint)
+    resumed: bool = False          # Execução retomada de um checkpoint
+    swapped: bool = False          # Staging publicada no lugar do catálogo ao final
+
+
+class ScrapePipeline:
+    """
+    Liga o scraper ao repositório.
+    As páginas chegam por uma fila limitada (ver BookScraper.iter_pages): enquanto
+    um lote é gravado, a fila enche e os fetches aguardam, gerando backpressure.
+    """
+
+    def __init__(
+        self,
+        scraper: Optional[BookScraper] = None,
+        batch_size: Optional[int] = None,
+        resume: Union[bool, str] = False,
+        prune_categories: bool = True,
+        staged: Optional[bool] = None,
+        table: Optional[str] = None
+    ):
+        """
+        Inicializa o pipeline com o scraper e o tamanho do lote.
+        `resume` retoma a última execução interrompida (True) ou a execução com o ID informado.
+        `prune_categories=False` mantém as categorias não vistas (worker que raspa só parte do site).
+        `staged` grava em staging e troca o catálogo ao final (padrão: DB_STAGED_SWAP).
+        `table` grava em uma staging já preparada, sem trocar (a troca fica com quem a preparou).
+        """
+        self.scraper = scraper or BookScraper()
+        self.resume = resume
+        self.prune_categories = prune_categories
+        self.staged = settings.DB_STAGED_SWAP if staged is None else staged
+        self.table = table
+        self.checkpoint: Optional[RunCheckpoint] = None
+        # Páginas do lote em andamento, registradas no checkpoint após a gravação
+        self._pending_pages: List[PageCheckpoint] = []
+        # O enriquecimento consulta o banco para não buscar de novo livros inalterados
+        if self.scraper.detail_lookup is None:
+            self.scraper.detail_lookup = self._known_details
+        self.batch_size = max(1, batch_size or settings.SCRAPE_BATCH_SIZE)
+        self.result = PipelineResult()
+        # Categorias concluídas (inclui as concluídas antes de uma retomada)
+        self.completed_categories: Set[str] = set()
+        # Categorias puladas por já estarem concluídas no checkpoint
+        self.skipped_categories: Set[str] = set()
+        self._repo: Optional[SQLAlchemyBookRepository] = None
+        # Chaves vistas por categoria em andamento (liberadas ao fim de cada categoria)
+        self._seen: Dict[str, Set[NaturalKey]] = {}
+
+    async def run(self, pages: Optional[AsyncIterator[ScrapeEvent]] = None) -> PipelineResult:
+        """
+        Executa o crawl gravando os livros em lotes.
+        `pages` permite outra fonte de páginas (ex.: o arquivo de HTML no modo reparse).
+        """
+        # Garante que as tabelas (e colunas novas) existem
+        await asyncio.to_thread(ensure_schema, engine)
+
+        completed = self.completed_categories
+        all_complete = True
+        if pages is None:
+            # O checkpoint vale para o crawl; o reparse do arquivo é sempre completo
+            self.checkpoint = await asyncio.to_thread(RunCheckpoint.open, self.resume)
+            self.scraper.checkpoint = self.checkpoint
+            self.scraper.run_id = self.checkpoint.run_id
+            if self.checkpoint.resumed and self.staged and self.table is None:
+                await self._restart_without_staging()
+            self.result.run_id = self.checkpoint.run_id
+            self.result.resumed = self.checkpoint.resumed
+            # Restaura o estado das categorias concluídas ou em andamento antes da interrupção
+            completed.update(self.checkpoint.done_categories)
+            self.skipped_categories = set(self.checkpoint.done_categories)
+            all_complete = self.checkpoint.all_complete
+            for category, keys in self.checkpoint.seen_keys.items():
+                self._seen[category] = set(keys)
+
+        swap: Optional[DatasetSwap] = None
+        table = self.table
+        if table is None and self.staged:
+            # Uma execução retomada continua na staging da sua execução
+            swap = DatasetSwap(engine)
+            table = await asyncio.to_thread(swap.prepare, self.result.run_id or uuid.uuid4().hex)
+
+        db = SessionLocal()
+        self._repo = SQLAlchemyBookRepository(db, book_table_model(table)) if table else SQLAlchemyBookRepository(db)
+        # Mantém a execução ativa mesmo sem lotes gravados (ex.: esperando a fila de retry)
+        heartbeat = asyncio.create_task(self._heartbeat()) if self.checkpoint else None
+        try:
+            batch: List[Book] = []
+            source = pages if pages is not None else self.scraper.iter_pages()
+            async for event in source:
+                if isinstance(event, ScrapedPage):
+                    self.result.pages += 1
+                    self.result.books_parsed += len(event.books)
+                    batch.extend(event.books)
+                    keys = [natural_key(b.source_url, b.title, b.category) for b in event.books]
+                    self._seen.setdefault(event.category, set()).update(keys)
+                    self._pending_pages.append((event.category, event.page, keys))
+                    if len(batch) >= self.batch_size:
+                        await self._flush(batch)
+                        batch = []
+                elif isinstance(event, CategoryCompleted):
+                    # Grava o que falta antes de remover os livros que sumiram da categoria
+                    if batch or self._pending_pages:
+                        await self._flush(batch)
+                        batch = []
+                    all_complete = all_complete and event.complete
+                    completed.add(event.category)
+                    await self._finish_category(event)
+            if batch or self._pending_pages:
+                await self._flush(batch)
+
+            # Categorias que não existem mais: só são removidas após um crawl completo
+            if completed and all_complete and self.prune_categories:
+                deleted = await asyncio.to_thread(self._repo.delete_categories_except, completed)
+                self.result.changes.deleted += deleted
+
+            if swap:
+                # Publica a nova versão de uma vez (categorias incompletas mantêm os dados anteriores)
+                await asyncio.to_thread(swap.swap, table)
+                self.result.swapped = True
+        except BaseException:
+            # Mantém o checkpoint para que a execução possa ser retomada
+            if self.checkpoint:
+                await asyncio.to_thread(self.checkpoint.finish, RunCheckpoint.FAILED, self.scraper.telemetry.summary())
+            raise
+        finally:
+            if heartbeat:
+                heartbeat.cancel()
+            db.close()
+            self._repo = None
+            self.scraper.checkpoint = None
+
+        if self.checkpoint:
+            await asyncio.to_thread(self.checkpoint.finish, RunCheckpoint.COMPLETED, self.scraper.telemetry.summary())
+
+        self.result.cache_hit_ratio = self.scraper.cache_stats.hit_ratio
+        changes = self.result.changes
+        logger.info(
+            f"Pipeline concluído: {self.result.books} livros em "
+            f"{self.result.batches} lotes ({self.result.pages} páginas, "
+            f"cache hit ratio {self.result.cache_hit_ratio:.1%}). "
+            f"Inseridos: {changes.inserted}, atualizados: {changes.updated}, "
+            f"removidos: {changes.deleted}, inalterados: {changes.unchanged}."
+        )
+        return self.result
+
+    async def _heartbeat(self):
+        """Renova o checkpoint da execução periodicamente: outro processo não a retoma enquanto ela roda."""
+        while True:
+            await asyncio.sleep(settings.SCRAPE_RUN_STALE_AFTER / 4)
+            try:
+                await asyncio.to_thread(self.checkpoint.heartbeat)
+            except Exception as e:
+                logger.warning(f"Erro ao renovar o checkpoint da execução: {e}")
+
+    async def _restart_without_staging(self):
+        """Recomeça a execução retomada se a sua staging foi descartada (as páginas puladas não estariam nela)."""
+        if await asyncio.to_thread(DatasetSwap(engine).has_staging, self.checkpoint.run_id):
+            return
+        logger.warning(f"Staging da execução {self.checkpoint.run_id} não encontrada; recomeçando a execução do início")
+        await asyncio.to_thread(self.checkpoint.reset)
+
+    @staticmethod
+    def _known_details(books: List[Book]) -> Dict[str, Dict[str, Any]]:
+        """Detalhes já gravados dos livros inalterados (sessão própria: roda em outra thread)."""
+        db = SessionLocal()
+        try:
+            return SQLAlchemyBookRepository(db).find_unchanged_details(books)
+        finally:
+            db.close()
+
+    async def _flush(self, batch: List[Book]):
+        """Grava um lote fora do event loop (a sessão do banco é síncrona) e atualiza o checkpoint."""
+        if batch:
+            started = time.perf_counter()
+            summary = await asyncio.to_thread(self._repo.upsert_many, batch)
+            self.scraper.telemetry.record_db_write(len(batch), (time.perf_counter() - started) * 1000)
+            self.result.changes.add(summary)
+            self.result.books += len(batch)
+            self.result.batches += 1
+
+        pending, self._pending_pages = self._pending_pages, []
+        if self.checkpoint and pending:
+            await asyncio.to_thread(self.checkpoint.mark_pages, pending, len(batch))
+
+    async def _finish_category(self, event: CategoryCompleted):
+        """Remove os livros que sumiram de uma categoria raspada por completo."""
+        seen = self._seen.pop(event.category, set())
+        if not event.complete:
+            logger.warning(f"Categoria '{event.category}' incompleta: remoção de livros ausentes ignorada.")
+        else:
+            deleted = await asyncio.to_thread(self._repo.delete_missing, event.category, seen)
+            self.result.changes.deleted += deleted
+        if self.checkpoint:
+            await asyncio.to_thread(self.checkpoint.mark_category, event.category, event.books, event.complete)
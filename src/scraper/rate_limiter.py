@@ -0,0 +1,59 @@
+"""
+Limitador de taxa por host.
+Implementa um token bucket assíncrono para controlar a carga no site fonte.
+"""
+import asyncio
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """Token bucket assíncrono: libera até `rate` requisições por segundo."""
+
+    def __init__(self, rate: float, burst: int):
+        """Inicializa o bucket cheio com capacidade `burst`."""
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        """Repõe os tokens proporcionalmente ao tempo decorrido."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Aguarda até que um token esteja disponível e o consome."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                # Espera exatamente o tempo necessário para gerar o próximo token
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class HostRateLimiter:
+    """Mantém um token bucket independente para cada host."""
+
+    def __init__(self, rate: float, burst: int):
+        """Inicializa o limitador com a taxa e a rajada de cada host."""
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        """Retorna (criando se necessário) o bucket do host da URL."""
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._buckets[host]
+
+    async def acquire(self, url: str):
+        """Aguarda a liberação de uma requisição para o host da URL."""
+        await self.bucket_for(url).acquire()
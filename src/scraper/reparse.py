@@ -0,0 +1,52 @@
+"""
+Reprocessamento offline do arquivo de HTML.
+Reconstrói as páginas do catálogo a partir do arquivo, sem acesso à rede,
+usando todos os núcleos disponíveis para o parsing.
+"""
+import asyncio
+from itertools import islice
+from typing import AsyncIterator, Optional
+from src.scraper.archive import RawArchive
+from src.scraper.parse_executor import ParseExecutor
+from src.scraper.sites import configured_sites, site_for_url
+from src.scraper.scraper import CategoryCompleted, ScrapeEvent, ScrapedPage
+from src.core.logging import logger
+
+
+async def iter_archived_pages(archive: RawArchive, backend_name: str, workers: int = 0) -> AsyncIterator[ScrapeEvent]:
+    """
+    Gera as páginas do arquivo processadas em um pool de processos.
+    Como o índice é percorrido por categoria, emite CategoryCompleted a cada
+    troca de categoria: o último crawl completo do arquivo é tratado como o catálogo.
+    """
+    executor = ParseExecutor(backend_name, workers)
+    # Cada página é processada pelo adaptador do site de onde veio
+    sites = configured_sites(backend_name=backend_name)
+    # Janela de páginas em voo: mantém todos os núcleos ocupados com memória limitada
+    window = executor.workers * 4
+    logger.info(f"Reprocessando arquivo de HTML com {executor.workers} processos...")
+
+    current: Optional[str] = None
+    total = 0
+    try:
+        entries = archive.iter_pages()
+        batch = list(islice(entries, window))
+        while batch:
+            listings = await asyncio.gather(
+                *(
+                    executor.parse_listing(archive.load(entry.content_hash), entry.category, site_for_url(sites, entry.url))
+                    for entry in batch
+                )
+            )
+            for entry, listing in zip(batch, listings):
+                if entry.category != current:
+                    if current is not None:
+                        yield CategoryCompleted(current, total, True)
+                    current, total = entry.category, 0
+                total += len(listing.books)
+                yield ScrapedPage(entry.category, entry.page, entry.url, listing.books)
+            batch = list(islice(entries, window))
+        if current is not None:
+            yield CategoryCompleted(current, total, True)
+    finally:
+        executor.shutdown()
@@ -0,0 +1,173 @@
+"""
+Política de retry do scraper.
+Classifica os erros (timeouts, 5xx e 429 podem ser repetidos; demais 4xx não),
+calcula o backoff exponencial com jitter, respeita o cabeçalho Retry-After e
+mantém um circuit breaker por host para aliviar um site com muitas falhas.
+"""
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Deque, Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+
+
+class CircuitOpenError(Exception):
+    """Requisição recusada sem acessar a rede: o circuito do host está aberto."""
+
+    def __init__(self, host: str, retry_in: float):
+        """Registra o host e o tempo até o circuito aceitar uma nova tentativa."""
+        super().__init__(f"Circuito aberto para {host} (nova tentativa em {retry_in:.1f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def is_retryable(error: Exception) -> bool:
+    """Indica se vale repetir a requisição que falhou com o erro informado."""
+    if isinstance(error, CircuitOpenError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    # Timeouts e falhas de conexão/protocolo
+    return isinstance(error, httpx.TransportError)
+
+
+def retry_after_seconds(response: Optional[httpx.Response]) -> Optional[float]:
+    """Lê o Retry-After (segundos ou data HTTP) de uma resposta 429/503."""
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float, max_delay: float) -> float:
+    """Backoff exponencial com jitter completo: aleatório entre 0 e base * 2^tentativa."""
+    return random.uniform(0, min(max_delay, base * (2 ** attempt)))
+
+
+def retry_delay(error: Exception, attempt: int, base: float, max_delay: float) -> float:
+    """Tempo de espera antes da próxima tentativa (Retry-After tem prioridade)."""
+    response = error.response if isinstance(error, httpx.HTTPStatusError) else None
+    retry_after = retry_after_seconds(response)
+    if retry_after is not None:
+        return min(retry_after, max_delay)
+    return backoff_delay(attempt, base, max_delay)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de um host.
+    Fechado: requisições normais. Aberto (proporção de falhas na janela acima do
+    limite): recusa requisições durante o cooldown. Meio-aberto: libera uma
+    requisição de teste; sucesso fecha o circuito, falha o reabre.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_ratio: float, min_requests: int, window: int, cooldown: float):
+        """Inicializa o circuito fechado; `failure_ratio <= 0` desativa o circuito."""
+        self.failure_ratio = failure_ratio
+        self.min_requests = max(1, min_requests)
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self._results: Deque[bool] = deque(maxlen=max(self.min_requests, window))
+        self._probe_in_flight = False
+
+    def remaining(self) -> float:
+        """Segundos até o circuito aberto aceitar uma requisição de teste."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def before_request(self, host: str):
+        """Libera a requisição ou lança CircuitOpenError."""
+        if self.state == self.OPEN:
+            remaining = self.remaining()
+            if remaining > 0:
+                raise CircuitOpenError(host, remaining)
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpenError(host, self.cooldown)
+            self._probe_in_flight = True
+
+    def record(self, success: bool):
+        """Registra o resultado de uma requisição."""
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+            if success:
+                self.state = self.CLOSED
+                self._results.clear()
+            else:
+                self._open()
+            return
+
+        self._results.append(success)
+        if self.failure_ratio <= 0 or len(self._results) < self.min_requests:
+            return
+        failures = self._results.count(False)
+        if failures / len(self._results) >= self.failure_ratio:
+            self._open()
+
+    def _open(self):
+        """Abre o circuito e reinicia a janela."""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._results.clear()
+
+
+class HostCircuitBreaker:
+    """Mantém um circuit breaker independente para cada host."""
+
+    def __init__(self, failure_ratio: float, min_requests: int, window: int, cooldown: float):
+        """Inicializa com os parâmetros aplicados a cada host."""
+        self.failure_ratio = failure_ratio
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker_for(self, url: str) -> CircuitBreaker:
+        """Retorna (criando se necessário) o circuito do host da URL."""
+        host = urlsplit(url).netloc
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(self.failure_ratio, self.min_requests, self.window, self.cooldown)
+        return self._breakers[host]
+
+    def before_request(self, url: str):
+        """Libera a requisição ou lança CircuitOpenError."""
+        self.breaker_for(url).before_request(urlsplit(url).netloc)
+
+    def record(self, url: str, success: bool):
+        """Registra o resultado de uma requisição ao host da URL."""
+        self.breaker_for(url).record(success)
+
+    def max_remaining(self) -> float:
+        """Maior tempo de espera entre os circuitos abertos."""
+        return max((breaker.remaining() for breaker in self._breakers.values()), default=0.0)
+
+
+@dataclass
+class RetryItem:
+    """Página que falhou no crawl, reexecutada ao fim da execução."""
+    category: str                              # Categoria da página
+    url: str                                   # URL que falhou
+    retry: Callable[[], Awaitable[int]]        # Refaz a página e retorna os livros emitidos
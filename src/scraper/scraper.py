@@ -1,98 +1,510 @@
 """
 Scraper de livros.
-Extrai dados do site books.toscrape.com.
-Navega por todas as categorias para capturar todos os livros.
+Extrai dados dos sites configurados em SCRAPE_SITES (padrão: books.toscrape.com).
+Navega por todas as categorias de cada site para capturar todos os livros.
 """
 import httpx
 import asyncio
-from typing import List, Dict
-from bs4 import BeautifulSoup
-from src.scraper.parser import BookParser
+import time
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Tuple, Union
+from src.scraper.parser import BookDetail, BookParser
+from src.scraper.backends import ListingPage
+from src.scraper.sites import SiteAdapter, configured_sites, site_for_url
+from src.scraper.crawl_scheduler import CrawlScheduler
+from src.scraper.parse_executor import ParseExecutor, listing_to_records, records_to_listing
+from src.scraper.http_cache import CacheEntry, CacheStats, HttpCache
+from src.scraper.archive import RawArchive
+from src.scraper.checkpoint import RunCheckpoint
+from src.scraper.enrichment import DetailEnricher, DetailLookup, EnrichmentStats
+from src.scraper.images import ImageDownloader, ImageStats, ImageStore
+from src.scraper.rate_limiter import HostRateLimiter
+from src.scraper.telemetry import ScrapeTelemetry
+from src.scraper.retry import HostCircuitBreaker, RetryItem, backoff_delay, is_retryable, retry_delay
 from src.schemas.responses import BookBase as Book
 from src.core.config import settings
 from src.core.logging import logger
 
 
+@dataclass
+class ScrapedPage:
+    """Página de listagem já processada, emitida durante o crawl."""
+    category: str                  # Categoria da listagem
+    page: int                      # Número da página (1..N)
+    url: str                       # URL da página
+    books: List[Book]              # Livros extraídos
+
+
+@dataclass
+class CategoryCompleted:
+    """Marca o fim de uma categoria no crawl."""
+    category: str                  # Categoria concluída
+    books: int                     # Livros extraídos da categoria
+    complete: bool                 # True se todas as páginas foram obtidas sem erro
+
+
+# Eventos emitidos durante o crawl
+ScrapeEvent = Union[ScrapedPage, CategoryCompleted]
+
+# Callback que recebe cada evento do crawl
+PageEmitter = Callable[[ScrapeEvent], Awaitable[None]]
+
+# Fonte de categorias: retorna a próxima (nome, URL) a raspar, ou None ao esgotar
+CategorySource = Callable[[], Awaitable[Optional[Tuple[str, str]]]]
+
+
 class BookScraper:
     """Classe para fazer scraping robusto de livros."""
     
-    def __init__(self):
-        """Inicializa o scraper com URL base e parser."""
-        self.base_url = settings.SCRAPE_URL
+    def __init__(self, sites: Optional[List[SiteAdapter]] = None, share: int = 1):
+        """
+        Inicializa o scraper com os sites (padrão: SCRAPE_SITES) e o parser.
+        `share` é o número de workers que raspam os mesmos sites ao mesmo tempo: cada
+        um recebe essa fração da taxa e da concorrência por host.
+        """
+        self.sites = sites or configured_sites()
+        # Site principal: usado no fallback sem categorias e para URLs de nenhum site conhecido
+        self.site = self.sites[0]
+        self.base_url = self.site.base_url
         self.parser = BookParser()
+        self.backend = self.site.backend
+        self.share = max(1, share)
+        # Orçamento de concorrência por site e fronteira de URLs (recriado a cada crawl)
+        self.scheduler = CrawlScheduler(self.sites, share=self.share)
+        # Pool de processos para parsing (criado por scrape_all quando habilitado)
+        self.parse_executor: Optional[ParseExecutor] = None
+        self.rate_limiter = HostRateLimiter(
+            settings.SCRAPE_RATE_LIMIT / self.share, max(1, settings.SCRAPE_RATE_BURST // self.share)
+        )
+        self.circuit_breakers = HostCircuitBreaker(
+            settings.SCRAPE_BREAKER_FAILURE_RATIO,
+            settings.SCRAPE_BREAKER_MIN_REQUESTS,
+            settings.SCRAPE_BREAKER_WINDOW,
+            settings.SCRAPE_BREAKER_COOLDOWN
+        )
+        # Cache HTTP de revalidação (aberto durante o crawl quando habilitado)
+        self.http_cache: Optional[HttpCache] = None
+        self.cache_stats = CacheStats()
+        # Arquivo de HTML bruto (aberto durante o crawl quando habilitado)
+        self.archive: Optional[RawArchive] = None
+        # ID da execução (definido pelo pipeline e pelos workers): identifica o crawl no arquivo de HTML
+        self.run_id: Optional[str] = None
+        # Enriquecimento pelas páginas de detalhe (criado durante o crawl quando habilitado)
+        self.enricher: Optional[DetailEnricher] = None
+        # Consulta dos detalhes já gravados, para pular livros inalterados (definida pelo pipeline)
+        self.detail_lookup: Optional[DetailLookup] = None
+        self.enrichment_stats = EnrichmentStats()
+        # Download das capas (criado durante o crawl quando habilitado)
+        self.image_downloader: Optional[ImageDownloader] = None
+        self.image_stats = ImageStats()
+        # Checkpoint da execução (definido pelo pipeline): categorias e páginas já gravadas são puladas
+        self.checkpoint: Optional[RunCheckpoint] = None
+        # Categorias descobertas no último crawl (na ordem dos sites)
+        self.categories: Dict[str, str] = {}
+        # Páginas que falharam por categoria no crawl atual
+        self.failed_pages: Dict[str, int] = {}
+        # Páginas recusadas pela fronteira por categoria (URL repetida ou falso positivo do filtro de Bloom)
+        self.skipped_pages: Dict[str, int] = {}
+        # Total de páginas de cada categoria (lido do paginador), usado na estimativa de progresso
+        self.page_counts: Dict[str, int] = {}
+        # Páginas que podem ser repetidas ao fim do crawl
+        self.retry_queue: List[RetryItem] = []
+        # Métricas do crawl atual (latência, bytes, retries, parsing, vazão por categoria)
+        self.telemetry = ScrapeTelemetry()
+
+    def build_client(self) -> httpx.AsyncClient:
+        """Cria o cliente HTTP compartilhado, com pool de conexões keep-alive."""
+        http2 = settings.SCRAPE_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("SCRAPE_HTTP2 ativo, mas o pacote 'h2' não está instalado. Usando HTTP/1.1.")
+                http2 = False
+
+        limits = httpx.Limits(
+            max_connections=settings.SCRAPE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SCRAPE_MAX_KEEPALIVE
+        )
+        return httpx.AsyncClient(
+            limits=limits,
+            http2=http2,
+            timeout=settings.SCRAPE_TIMEOUT
+        )
 
     async def fetch_page(self, client: httpx.AsyncClient, url: str) -> str:
         """Busca o conteúdo HTML de uma página com retry."""
+        content, _ = await self._fetch(client, url)
+        return content
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> Tuple[str, Optional[CacheEntry]]:
+        """
+        Busca uma página com retry, revalidando pelo cache HTTP quando ativo.
+        Retorna o HTML e, se o servidor respondeu 304, a entrada do cache usada.
+        """
+        entry = self.http_cache.get(url) if self.http_cache else None
+        response = await self.request(client, url, entry.conditional_headers() if entry else None)
+        if response is None:
+            return "", None
+
+        # Não modificada: reaproveita o corpo já armazenado
+        if entry and response.status_code == 304:
+            self.cache_stats.hits += 1
+            self.http_cache.touch(url)
+            return entry.body, entry
+
+        if self.http_cache:
+            self.cache_stats.misses += 1
+            self.http_cache.put(
+                url,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                response.text
+            )
+        return response.text, None
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Optional[httpx.Response]:
+        """
+        Faz um GET com retry, sob o rate limiter e o circuit breaker do host.
+        Retorna a resposta de sucesso ou 304 (requisição condicional).
+        """
         for attempt in range(settings.MAX_RETRIES):
+            # Circuito aberto: falha imediatamente, sem carregar o host
+            self.circuit_breakers.before_request(url)
+            success = False
             try:
-                response = await client.get(url, timeout=10.0)
+                # Respeita o orçamento de requisições simultâneas do site e a taxa por host
+                async with self.scheduler.slot(url):
+                    await self.rate_limiter.acquire(url)
+                    started = time.perf_counter()
+                    response = await client.get(url, headers=headers or {})
+                self.telemetry.record_fetch(
+                    (time.perf_counter() - started) * 1000, len(response.content), response.status_code
+                )
+                if headers and response.status_code == 304:
+                    success = True
+                    return response
+
                 response.raise_for_status()
-                return response.text
+                success = True
+                return response
             except Exception as e:
-                logger.warning(f"Tentativa {attempt + 1} falhou para {url}: {e}")
-                if attempt == settings.MAX_RETRIES - 1:
+                retryable = is_retryable(e)
+                # Erros definitivos (404, 403...) indicam um host que responde normalmente
+                success = not retryable
+                final = not retryable or attempt == settings.MAX_RETRIES - 1
+                self.telemetry.record_error(retried=not final)
+                if final:
+                    logger.warning(f"Tentativa {attempt + 1} falhou para {url}: {e}")
                     raise
-                await asyncio.sleep(settings.RETRY_DELAY)
-        return ""
+                delay = retry_delay(e, attempt, settings.RETRY_DELAY, settings.RETRY_MAX_DELAY)
+                logger.warning(f"Tentativa {attempt + 1} falhou para {url}: {e}. Nova tentativa em {delay:.2f}s")
+            finally:
+                self.circuit_breakers.record(url, success)
+            await asyncio.sleep(delay)
+        return None
+
+    async def fetch_listing(self, client: httpx.AsyncClient, url: str, category: str, page: int) -> ListingPage:
+        """Busca e processa uma listagem; páginas não modificadas (304) não são reprocessadas."""
+        content, cached = await self._fetch(client, url)
+        if self.archive:
+            self.archive.store(url, content, category, page)
+        if cached and cached.parsed:
+            return records_to_listing(cached.parsed)
+
+        started = time.perf_counter()
+        listing = await self.parse_listing(content, category, self.site_for(url))
+        self.telemetry.record_parse((time.perf_counter() - started) * 1000)
+        if self.http_cache:
+            self.http_cache.put_parsed(url, listing_to_records(listing))
+        return listing
+
+    def site_for(self, url: str) -> SiteAdapter:
+        """Adaptador do site ao qual a URL pertence."""
+        return site_for_url(self.sites, url)
 
     async def get_categories(self, client: httpx.AsyncClient) -> Dict[str, str]:
-        """Extrai todas as categorias disponíveis no site."""
+        """
+        Extrai todas as categorias disponíveis nos sites.
+        Um nome já usado por outro site recebe o host como sufixo ("Fiction (outro.site)"):
+        a categoria é a unidade de remoção dos livros ausentes e não pode misturar sites.
+        """
         categories = {}
-        try:
-            content = await self.fetch_page(client, self.base_url)
-            soup = BeautifulSoup(content, "html.parser")
-            
-            # Encontra a sidebar de categorias
-            category_list = soup.find("ul", class_="nav-list")
-            if category_list:
-                # Pula o primeiro item (Books - categoria pai)
-                cat_items = category_list.find_all("li")[1:]
-                for item in cat_items:
-                    link = item.find("a")
-                    if link:
-                        cat_name = link.text.strip()
-                        cat_url = self.base_url + "/" + link["href"]
-                        categories[cat_name] = cat_url
-                        
-            logger.info(f"Encontradas {len(categories)} categorias")
-        except Exception as e:
-            logger.error(f"Erro ao extrair categorias: {e}")
-        
+        for site in self.sites:
+            try:
+                content = await self.fetch_page(client, site.categories_url())
+
+                found = site.parse_categories(content)
+                for cat_name, url in found:
+                    if cat_name in categories:
+                        cat_name = f"{cat_name} ({site.host})"
+                    categories[cat_name] = url
+
+                logger.info(f"Encontradas {len(found)} categorias em {site.base_url}")
+            except Exception as e:
+                logger.error(f"Erro ao extrair categorias de {site.base_url}: {e}")
+
         return categories
 
     async def scrape_category(self, client: httpx.AsyncClient, category: str, category_url: str) -> List[Book]:
         """Extrai todos os livros de uma categoria específica."""
-        books = []
-        current_url = category_url
-        page = 1
-        
-        while current_url:
+        # Cada chamada é uma navegação independente: começa com a fronteira vazia
+        self.scheduler = CrawlScheduler(self.sites, share=self.share)
+        pages: List[ScrapedPage] = []
+
+        async def collect(page: ScrapedPage):
+            pages.append(page)
+
+        await self._scrape_category_pages(client, category, category_url, collect)
+        await self._drain_retry_queue()
+        return [book for page in sorted(pages, key=lambda p: p.page) for book in page.books]
+
+    async def _scrape_category_pages(
+        self,
+        client: httpx.AsyncClient,
+        category: str,
+        category_url: str,
+        emit: PageEmitter
+    ) -> int:
+        """Emite cada página de uma categoria e retorna o total de livros."""
+        if not self.scheduler.admit(category_url):
+            self._record_skip(category, category_url)
+            return 0
+        site = self.site_for(category_url)
+        return await self._scrape_paginated(
+            client,
+            category,
+            category_url,
+            page_url=lambda page: site.page_url(category_url, page),
+            emit=emit
+        )
+
+    async def parse_listing(self, content: str, category: str, site: Optional[SiteAdapter] = None) -> ListingPage:
+        """Faz o parsing de uma listagem no pool de processos, se houver, ou no próprio loop."""
+        site = site or self.site
+        if self.parse_executor:
+            return await self.parse_executor.parse_listing(content, category, site)
+        return site.parse_listing(content, category)
+
+    async def parse_detail(self, content: str, site: Optional[SiteAdapter] = None) -> BookDetail:
+        """Faz o parsing de uma página de detalhe no pool de processos, se houver, ou no próprio loop."""
+        site = site or self.site
+        if self.parse_executor:
+            return await self.parse_executor.parse_detail(content, site)
+        return site.parse_detail(content)
+
+    async def _emit_page(
+        self,
+        client: httpx.AsyncClient,
+        emit: PageEmitter,
+        category: str,
+        page: int,
+        url: str,
+        books: List[Book]
+    ) -> int:
+        """Enriquece os livros e baixa as capas (se ativos), emite a página e retorna o número de livros."""
+        if self.checkpoint and self.checkpoint.is_page_done(category, page):
+            # Já gravada antes da interrupção: buscada apenas para seguir a navegação
+            return len(books)
+        if self.enricher:
+            books = await self.enricher.enrich(client, books)
+        if self.image_downloader:
+            books = await self.image_downloader.download(client, books)
+        self.telemetry.record_page(category)
+        await emit(ScrapedPage(category, page, url, books))
+        return len(books)
+
+    async def _scrape_paginated(
+        self,
+        client: httpx.AsyncClient,
+        category: str,
+        first_url: str,
+        page_url: Callable[[int], str],
+        emit: PageEmitter,
+        max_pages: Optional[int] = None
+    ) -> int:
+        """
+        Extrai uma listagem paginada, emitindo cada página assim que processada.
+        Lê o paginador "Page 1 of N" da primeira página e busca as demais
+        em paralelo. Sem paginador, segue o link "next" página a página.
+        Retorna o total de livros extraídos.
+        """
+        try:
+            listing = await self.fetch_listing(client, first_url, category, 1)
+        except Exception as e:
+            logger.error(f"Erro ao raspar {category} página 1: {e}")
+            # Sem a primeira página não se sabe o total: a repetição refaz a listagem inteira
+            self._record_failure(category, first_url, e, lambda: self._scrape_paginated(
+                client, category, first_url, page_url, emit, max_pages
+            ))
+            return 0
+
+        total_books = await self._emit_page(client, emit, category, 1, first_url, listing.books)
+
+        total_pages = listing.page_count
+        if total_pages is None:
+            # Sem paginador: mantém a navegação sequencial pelo link "next"
+            return total_books + await self._follow_next_links(client, category, first_url, listing, emit)
+
+        if max_pages is not None:
+            total_pages = min(total_pages, max_pages)
+        self.page_counts[category] = total_pages
+
+        async def scrape_page(page: int) -> int:
+            if self.checkpoint and self.checkpoint.is_page_done(category, page):
+                return 0
+            url = page_url(page)
             try:
-                content = await self.fetch_page(client, current_url)
-                soup = BeautifulSoup(content, "html.parser")
-                
-                # Processa cada livro na página
-                items = soup.find_all("article", class_="product_pod")
-                for item in items:
-                    book = self.parser.parse_book_item(item, category=category)
-                    books.append(book)
-                
-                # Verifica se há próxima página
-                next_button = soup.find("li", class_="next")
-                if next_button:
-                    next_link = next_button.find("a")["href"]
-                    # Constrói URL da próxima página
-                    base_cat_url = current_url.rsplit("/", 1)[0]
-                    current_url = f"{base_cat_url}/{next_link}"
-                    page += 1
-                else:
-                    current_url = None
-                    
+                page_books = (await self.fetch_listing(client, url, category, page)).books
             except Exception as e:
                 logger.error(f"Erro ao raspar {category} página {page}: {e}")
+                self._record_failure(category, url, e, lambda: scrape_page(page))
+                return 0
+            return await self._emit_page(client, emit, category, page, url, page_books)
+
+        # URLs já vistas na execução (ex.: a mesma listagem em duas categorias) não são buscadas de novo
+        pages = []
+        for page in range(2, total_pages + 1):
+            if self.scheduler.admit(page_url(page)):
+                pages.append(page)
+            else:
+                self._record_skip(category, page_url(page))
+        counts = await asyncio.gather(*(scrape_page(page) for page in pages))
+        return total_books + sum(counts)
+
+    async def _follow_next_links(
+        self,
+        client: httpx.AsyncClient,
+        category: str,
+        current_url: str,
+        listing: ListingPage,
+        emit: PageEmitter,
+        page: int = 1
+    ) -> int:
+        """Segue o link "next" a partir de uma página já processada (de número `page`)."""
+        total_books = 0
+        site = self.site_for(current_url)
+        # Páginas desta navegação: distingue um ciclo de uma URL recusada pela fronteira
+        visited = {current_url}
+
+        # Verifica se há próxima página
+        while listing.next_href:
+            # Constrói URL da próxima página; um link já visitado encerra a navegação (evita ciclos)
+            current_url = site.next_url(current_url, listing.next_href)
+            if not self.scheduler.admit(current_url):
+                if current_url not in visited:
+                    self._record_skip(category, current_url)
                 break
-                
-        return books
+            visited.add(current_url)
+            page += 1
+
+            try:
+                listing = await self.fetch_listing(client, current_url, category, page)
+            except Exception as e:
+                logger.error(f"Erro ao raspar {category} página {page}: {e}")
+                failed_url, failed_page = current_url, page
+                self._record_failure(category, failed_url, e, lambda: self._resume_next_links(
+                    client, category, failed_url, failed_page, emit
+                ))
+                break
+            total_books += await self._emit_page(client, emit, category, page, current_url, listing.books)
+
+        return total_books
+
+    async def _resume_next_links(
+        self,
+        client: httpx.AsyncClient,
+        category: str,
+        url: str,
+        page: int,
+        emit: PageEmitter
+    ) -> int:
+        """Retoma a navegação pelo link "next" a partir de uma página que falhou."""
+        try:
+            listing = await self.fetch_listing(client, url, category, page)
+        except Exception as e:
+            logger.error(f"Erro ao raspar {category} página {page}: {e}")
+            self._record_failure(category, url, e, lambda: self._resume_next_links(client, category, url, page, emit))
+            return 0
+        total_books = await self._emit_page(client, emit, category, page, url, listing.books)
+        return total_books + await self._follow_next_links(client, category, url, listing, emit, page)
+
+    def _record_failure(
+        self,
+        category: str,
+        url: str,
+        error: Exception,
+        retry: Callable[[], Awaitable[int]]
+    ):
+        """Registra uma página que não pôde ser raspada; erros transitórios vão para a fila de retry."""
+        self.failed_pages[category] = self.failed_pages.get(category, 0) + 1
+        if is_retryable(error):
+            self.retry_queue.append(RetryItem(category, url, retry))
+
+    def _record_skip(self, category: str, url: str):
+        """
+        Registra uma página recusada pela fronteira. Sem ela não se sabe se os
+        livros da categoria foram todos vistos: a categoria não é concluída
+        como completa e os livros ausentes não são removidos.
+        """
+        logger.warning(f"Página {url} de '{category}' já vista na execução, pulando; a categoria fica incompleta")
+        self.skipped_pages[category] = self.skipped_pages.get(category, 0) + 1
+
+    def _is_complete(self, category: str) -> bool:
+        """Indica se todas as páginas da categoria foram raspadas."""
+        return category not in self.failed_pages and category not in self.skipped_pages
+
+    def _crawl_complete(self) -> bool:
+        """Indica se o crawl raspou todas as categorias por completo (inclui as concluídas antes de uma retomada)."""
+        if self.failed_pages or self.skipped_pages:
+            return False
+        return self.checkpoint.all_complete if self.checkpoint else True
+
+    async def _drain_retry_queue(self) -> Dict[str, int]:
+        """
+        Repete as páginas da fila de retry ao fim do crawl, em até
+        SCRAPE_RETRY_ROUNDS rodadas. Retorna os livros recuperados por categoria.
+        """
+        recovered: Dict[str, int] = {}
+        for round_number in range(settings.SCRAPE_RETRY_ROUNDS):
+            if not self.retry_queue:
+                break
+            items, self.retry_queue = self.retry_queue, []
+
+            # Espera os circuitos abertos liberarem o host (e um backoff entre rodadas)
+            delay = max(
+                self.circuit_breakers.max_remaining(),
+                backoff_delay(round_number, settings.RETRY_DELAY, settings.RETRY_MAX_DELAY)
+            )
+            logger.info(
+                f"Fila de retry: {len(items)} páginas (rodada {round_number + 1}), aguardando {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+            # A página volta a contar como falha apenas se falhar de novo
+            for item in items:
+                self.failed_pages[item.category] -= 1
+                if not self.failed_pages[item.category]:
+                    del self.failed_pages[item.category]
+
+            semaphore = asyncio.Semaphore(max(1, settings.SCRAPE_CONCURRENCY))
+
+            async def retry_bounded(item: RetryItem):
+                async with semaphore:
+                    books = await item.retry()
+                recovered[item.category] = recovered.get(item.category, 0) + books
+
+            await asyncio.gather(*(retry_bounded(item) for item in items))
+
+        if self.retry_queue:
+            logger.error(f"{len(self.retry_queue)} páginas não recuperadas após {settings.SCRAPE_RETRY_ROUNDS} rodadas de retry")
+        return recovered
 
     async def scrape_all(self) -> List[Book]:
         """
@@ -106,58 +518,210 @@ class BookScraper:
         - disponibilidade
         - categoria
         - imagem
+        - UPC, descrição, estoque e avaliações (com SCRAPE_DETAILS_ENABLED)
+        - capa local (com SCRAPE_IMAGES_ENABLED)
         """
-        all_books = []
-        
-        async with httpx.AsyncClient() as client:
-            # Obtém todas as categorias
-            categories = await self.get_categories(client)
-            
-            if not categories:
-                # Fallback: raspa sem categorias
-                logger.warning("Nenhuma categoria encontrada, usando método fallback")
-                return await self._scrape_fallback(client)
-            
-            # Raspa cada categoria
-            for category, url in categories.items():
-                logger.info(f"Raspando categoria: {category}")
-                category_books = await self.scrape_category(client, category, url)
-                all_books.extend(category_books)
-                logger.info(f"  → {len(category_books)} livros extraídos de '{category}'")
-                
-                # Pequeno delay entre categorias para não sobrecarregar o servidor
-                await asyncio.sleep(0.5)
-        
+        pages: List[ScrapedPage] = []
+        async for event in self.iter_pages():
+            if isinstance(event, ScrapedPage):
+                pages.append(event)
+
+        # Reordena por categoria (ordem do site) e página, mantendo a saída determinística
+        category_rank = {category: rank for rank, category in enumerate(self.categories)}
+        pages.sort(key=lambda p: (category_rank.get(p.category, 0), p.page))
+        all_books = [book for page in pages for book in page.books]
+
         logger.info(f"Total de livros extraídos: {len(all_books)}")
         return all_books
 
-    async def _scrape_fallback(self, client: httpx.AsyncClient) -> List[Book]:
-        """Método fallback que raspa todas as páginas sem categoria específica."""
-        all_books = []
-        current_url = self.base_url + "/catalogue/page-1.html"
-        page = 1
-        
-        while current_url:
-            logger.info(f"Raspando página {page}...")
+    async def iter_pages(self, source: Optional[CategorySource] = None) -> AsyncIterator[ScrapeEvent]:
+        """
+        Gera as páginas do catálogo conforme são raspadas, e um
+        CategoryCompleted ao fim de cada categoria.
+        `source` fornece as categorias a raspar (ver src/scraper/sharding.py).
+        As páginas passam por uma fila limitada (SCRAPE_QUEUE_SIZE): se o
+        consumidor atrasar, os fetches ficam bloqueados (backpressure) e a
+        memória não cresce com o tamanho do catálogo.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.SCRAPE_QUEUE_SIZE))
+        done = object()
+
+        async def produce():
             try:
-                content = await self.fetch_page(client, current_url)
-                soup = BeautifulSoup(content, "html.parser")
-                
-                items = soup.find_all("article", class_="product_pod")
-                for item in items:
-                    book = self.parser.parse_book_item(item, category="Geral")
-                    all_books.append(book)
-                
-                next_button = soup.find("li", class_="next")
-                if next_button and page < 50:
-                    page += 1
-                    current_url = self.base_url + f"/catalogue/page-{page}.html"
+                await self._crawl(queue.put, source)
+            finally:
+                await queue.put(done)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+            # Propaga eventuais erros do crawl
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+    async def _crawl(self, emit: PageEmitter, source: Optional[CategorySource] = None):
+        """
+        Executa o crawl completo, emitindo cada página processada.
+        Com `source`, raspa apenas as categorias obtidas dela, em vez das do site.
+        """
+        if settings.SCRAPE_PARSE_IN_PROCESSES:
+            self.parse_executor = ParseExecutor(settings.SCRAPE_PARSER_BACKEND, settings.SCRAPE_PARSE_WORKERS)
+            logger.info(f"Parsing em {self.parse_executor.workers} processos")
+
+        self.cache_stats = CacheStats()
+        self.failed_pages = {}
+        self.skipped_pages = {}
+        self.page_counts = {}
+        self.retry_queue = []
+        self.telemetry = ScrapeTelemetry()
+        self.scheduler = CrawlScheduler(self.sites, share=self.share)
+        if settings.SCRAPE_CACHE_ENABLED:
+            self.http_cache = HttpCache(
+                settings.SCRAPE_CACHE_PATH,
+                max_entries=settings.SCRAPE_CACHE_MAX_ENTRIES,
+                max_bytes=settings.SCRAPE_CACHE_MAX_MB * 1024 * 1024
+            )
+            self.http_cache.stats = self.cache_stats
+        # Sem as páginas arquivadas antes da interrupção, o crawl retomado não é completo no arquivo
+        archive_gap = False
+        if settings.SCRAPE_ARCHIVE_ENABLED:
+            self.archive = RawArchive(settings.SCRAPE_ARCHIVE_PATH)
+            known = self.archive.begin_crawl(self.run_id or uuid.uuid4().hex)
+            archive_gap = bool(self.checkpoint and self.checkpoint.done_categories) and not known
+        if settings.SCRAPE_DETAILS_ENABLED:
+            self.enricher = DetailEnricher(self, lookup=self.detail_lookup)
+            self.enrichment_stats = self.enricher.stats
+        if settings.SCRAPE_IMAGES_ENABLED:
+            self.image_downloader = ImageDownloader(self, ImageStore(settings.SCRAPE_IMAGES_PATH))
+            self.image_stats = self.image_downloader.stats
+
+        try:
+            async with self.build_client() as client:
+                # Obtém todas as categorias
+                if source is None:
+                    self.categories = await self.get_categories(client)
+
+                # Categorias com páginas na fila de retry só são concluídas após a fila ser drenada
+                deferred: Dict[str, int] = {}
+
+                async def scrape_one(category: str, url: str):
+                    logger.info(f"Raspando categoria: {category}")
+                    self.telemetry.category_started(category)
+                    total = await self._scrape_category_pages(client, category, url, emit)
+                    self.telemetry.category_finished(category, total)
+                    logger.info(f"  → {total} livros extraídos de '{category}'")
+                    if category in self.failed_pages:
+                        deferred[category] = total
+                    else:
+                        await emit(CategoryCompleted(category, total, self._is_complete(category)))
+
+                if source is not None:
+                    # Categorias distribuídas por uma fila externa (modo com vários workers):
+                    # cada consumidor pede a próxima categoria ao terminar a anterior
+                    self.categories = {}
+
+                    async def consume():
+                        while True:
+                            claimed = await source()
+                            if claimed is None:
+                                return
+                            category, url = claimed
+                            self.categories[category] = url
+                            if not self._category_done(category):
+                                await scrape_one(category, url)
+
+                    await asyncio.gather(*(consume() for _ in range(max(1, settings.SCRAPE_CONCURRENCY))))
+                elif not self.categories:
+                    # Fallback: raspa sem categorias
+                    logger.warning("Nenhuma categoria encontrada, usando método fallback")
+                    if self._category_done("Geral"):
+                        return
+                    self.telemetry.category_started("Geral")
+                    total = await self._scrape_fallback(client, emit)
+                    self.telemetry.category_finished("Geral", total)
+                    if "Geral" in self.failed_pages:
+                        deferred["Geral"] = total
+                    else:
+                        await emit(CategoryCompleted("Geral", total, self._is_complete("Geral")))
                 else:
-                    current_url = None
-                    
-            except Exception as e:
-                logger.error(f"Falha ao raspar página {page}: {e}")
-                break
-                
-        return all_books
+                    # Raspa as categorias em paralelo, limitadas por SCRAPE_CONCURRENCY.
+                    # A carga no servidor é controlada pelo rate limiter por host.
+                    semaphore = asyncio.Semaphore(max(1, settings.SCRAPE_CONCURRENCY))
+
+                    async def scrape_bounded(category: str, url: str):
+                        if self._category_done(category):
+                            return
+                        async with semaphore:
+                            await scrape_one(category, url)
+
+                    await asyncio.gather(
+                        *(scrape_bounded(category, url) for category, url in self.categories.items())
+                    )
+
+                if deferred:
+                    recovered = await self._drain_retry_queue()
+                    for category, total in deferred.items():
+                        self.telemetry.category(category).books = total + recovered.get(category, 0)
+                        complete = self._is_complete(category)
+                        await emit(CategoryCompleted(category, total + recovered.get(category, 0), complete))
+
+                if self.archive and source is None:
+                    # Com uma fila externa, cada worker vê só parte das categorias: quem conclui o crawl é o coordenador
+                    self.archive.finish_crawl(self._crawl_complete() and not archive_gap)
+        finally:
+            summary = self.telemetry.summary()
+            latency = summary["fetch_latency"]
+            logger.info(
+                f"Telemetria: {summary['fetches']} fetches (p50 {latency['p50_ms']}ms, p95 {latency['p95_ms']}ms), "
+                f"{summary['bytes_downloaded'] / 1024 / 1024:.1f} MB, {summary['retries']} retries, "
+                f"parsing médio {summary['parse_time']['avg_ms']}ms/página, "
+                f"{self.scheduler.stats.duplicates} URLs repetidas descartadas"
+            )
+            if self.parse_executor:
+                self.parse_executor.shutdown()
+                self.parse_executor = None
+            if self.http_cache:
+                self.http_cache.close()
+                self.http_cache = None
+            if self.archive:
+                self.archive.close()
+                self.archive = None
+            if self.enricher:
+                self.enricher.close()
+                self.enricher = None
+            if self.image_downloader:
+                self.image_downloader.close()
+                self.image_downloader = None
+
+    def _category_done(self, category: str) -> bool:
+        """Indica se a categoria já foi concluída na execução retomada."""
+        if self.checkpoint and self.checkpoint.is_category_done(category):
+            logger.info(f"Categoria '{category}' já concluída nesta execução, pulando")
+            return True
+        return False
 
+    async def _scrape_fallback(self, client: httpx.AsyncClient, emit: PageEmitter) -> int:
+        """Método fallback que raspa todas as páginas do site principal sem categoria específica."""
+        first_url = self.site.catalogue_url(1)
+        if first_url is None:
+            logger.warning(f"O site {self.site.name} não tem catálogo completo para o fallback")
+            return 0
+        logger.info("Raspando catálogo completo (até 50 páginas)...")
+        return await self._scrape_paginated(
+            client,
+            "Geral",
+            first_url,
+            page_url=self.site.catalogue_url,
+            emit=emit,
+            max_pages=50
+        )
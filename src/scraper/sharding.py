@@ -0,0 +1,452 @@
+"""
+Scraping com vários workers.
+O coordenador lê o mapa de categorias do site e o publica em uma fila de
+trabalho compartilhada. A fila é um arquivo SQLite: basta que seja acessível
+a todos os workers, sejam processos locais ou outras máquinas com o mesmo
+sistema de arquivos. Cada worker pede a próxima categoria ao terminar a
+anterior, grava os livros com o próprio ScrapePipeline e registra a conclusão
+na fila. O coordenador acompanha o progresso pela fila, junta o estado das
+categorias e, após um crawl completo, remove as categorias que sumiram do site.
+Com DB_STAGED_SWAP, o coordenador prepara a staging da execução, todos os
+workers gravam nela e, ao final, ele a troca pelo catálogo. A execução é
+registrada em scrape_runs e renovada a cada consulta à fila, para que outra
+execução não descarte a staging enquanto os workers gravam nela.
+
+Os workers dividem o orçamento por host: com N workers, cada um usa
+SCRAPE_RATE_LIMIT / N requisições por segundo e SCRAPE_SITE_CONCURRENCY // N
+requisições simultâneas (no mínimo 1), para que a carga total no site não
+cresça com o número de workers.
+"""
+import asyncio
+import multiprocessing
+import socket
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+from sqlalchemy import inspect
+from src.scraper.scraper import BookScraper, CategoryCompleted, ScrapeEvent, ScrapedPage
+from src.scraper.pipeline import PipelineResult, ScrapePipeline
+from src.scraper.checkpoint import RunCheckpoint
+from src.scraper.archive import RawArchive
+from src.core.database import SessionLocal, engine
+from src.core.migrations import ensure_schema
+from src.repository.dataset_swap import DatasetSwap, book_table_model, staging_table_name
+from src.repository.sqlalchemy_repository import SQLAlchemyBookRepository
+from src.core.config import settings
+from src.core.logging import logger
+
+
+@dataclass
+class ShardTask:
+    """Categoria de uma execução na fila de trabalho."""
+    category: str                  # Nome da categoria
+    url: str                       # URL da primeira página
+    status: str                    # pending, claimed ou done
+    worker: Optional[str]          # Worker que pegou a categoria
+    pages: int                     # Páginas gravadas
+    books: int                     # Livros extraídos
+    complete: bool                 # True se todas as páginas foram obtidas sem erro
+    claimed_at: Optional[float]    # Quando a categoria foi pega (epoch)
+    finished_at: Optional[float]   # Quando a categoria foi concluída (epoch)
+
+
+class ShardQueue:
+    """
+    Fila de categorias persistida em SQLite.
+    Cada operação abre a própria conexão: a fila é usada por vários processos
+    e, dentro de um worker, por threads diferentes (asyncio.to_thread).
+    """
+
+    PENDING = "pending"
+    CLAIMED = "claimed"
+    DONE = "done"
+
+    def __init__(self, path: Path):
+        """Abre (ou cria) a fila no arquivo informado."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS shard_tasks (
+                    run_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    category TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    worker TEXT,
+                    pages INTEGER NOT NULL DEFAULT 0,
+                    books INTEGER NOT NULL DEFAULT 0,
+                    complete INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    claimed_at REAL,
+                    finished_at REAL,
+                    PRIMARY KEY (run_id, category)
+                )
+                """
+            )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Conexão em modo autocommit; concorrência resolvida por BEGIN IMMEDIATE."""
+        return sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+
+    def create_run(self, categories: Dict[str, str]) -> str:
+        """Publica as categorias de uma nova execução e retorna o seu ID."""
+        run_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "INSERT INTO shard_tasks (run_id, position, category, url, status, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, position, name, url, self.PENDING, now) for position, (name, url) in enumerate(categories.items())]
+            )
+        finally:
+            conn.close()
+        return run_id
+
+    def latest_run(self) -> Optional[str]:
+        """ID da execução mais recente com categorias não concluídas."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT run_id FROM shard_tasks WHERE status != ? ORDER BY created_at DESC LIMIT 1", (self.DONE,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def claim(self, run_id: str, worker: str) -> Optional[Tuple[str, str]]:
+        """Pega a próxima categoria pendente (atômico entre processos)."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT category, url FROM shard_tasks WHERE run_id = ? AND status = ? ORDER BY position LIMIT 1",
+                (run_id, self.PENDING)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE shard_tasks SET status = ?, worker = ?, claimed_at = ? WHERE run_id = ? AND category = ?",
+                    (self.CLAIMED, worker, time.time(), run_id, row[0])
+                )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return (row[0], row[1]) if row else None
+
+    def complete(self, run_id: str, category: str, pages: int, books: int, complete: bool):
+        """Registra a conclusão de uma categoria."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                UPDATE shard_tasks SET status = ?, pages = ?, books = ?, complete = ?, finished_at = ?
+                WHERE run_id = ? AND category = ?
+                """,
+                (self.DONE, pages, books, int(complete), time.time(), run_id, category)
+            )
+        finally:
+            conn.close()
+
+    def requeue(self, run_id: str, workers: Optional[List[str]] = None) -> int:
+        """Devolve à fila as categorias pegas e não concluídas (de todos ou dos workers informados)."""
+        query = "UPDATE shard_tasks SET status = ?, worker = NULL, claimed_at = NULL WHERE run_id = ? AND status = ?"
+        params: List = [self.PENDING, run_id, self.CLAIMED]
+        if workers is not None:
+            query += f" AND worker IN ({', '.join('?' for _ in workers)})"
+            params.extend(workers)
+        conn = self._connect()
+        try:
+            return conn.execute(query, params).rowcount
+        finally:
+            conn.close()
+
+    def reset(self, run_id: str) -> int:
+        """Devolve todas as categorias da execução à fila, como se ela começasse agora."""
+        conn = self._connect()
+        try:
+            updated = conn.execute(
+                """
+                UPDATE shard_tasks SET status = ?, worker = NULL, claimed_at = NULL, pages = 0, books = 0,
+                    complete = 0, finished_at = NULL
+                WHERE run_id = ?
+                """,
+                (self.PENDING, run_id)
+            ).rowcount
+        finally:
+            conn.close()
+        return updated
+
+    def tasks(self, run_id: str) -> List[ShardTask]:
+        """Categorias da execução, na ordem do site."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                """
+                SELECT category, url, status, worker, pages, books, complete, claimed_at, finished_at
+                FROM shard_tasks WHERE run_id = ? ORDER BY position
+                """,
+                (run_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [ShardTask(*row[:6], bool(row[6]), *row[7:]) for row in rows]
+
+
+async def run_worker(
+    queue: ShardQueue,
+    run_id: str,
+    worker: str,
+    scraper: Optional[BookScraper] = None,
+    share: int = 1
+) -> PipelineResult:
+    """
+    Consome categorias da fila até esgotá-la, gravando os livros no banco.
+    `share` é o total de workers da execução, que dividem a taxa e a concorrência por host.
+    """
+    scraper = scraper or BookScraper(share=share)
+    # Todos os workers arquivam as páginas no crawl da execução
+    scraper.run_id = run_id
+    # Grava na staging preparada pelo coordenador, se houver (a troca fica com ele)
+    table = staging_table_name(run_id)
+    if not await asyncio.to_thread(inspect(engine).has_table, table):
+        table = None
+    # O worker vê só parte do site: a remoção de categorias ausentes fica com o coordenador
+    pipeline = ScrapePipeline(scraper, prune_categories=False, staged=False, table=table)
+
+    async def source() -> Optional[Tuple[str, str]]:
+        return await asyncio.to_thread(queue.claim, run_id, worker)
+
+    async def events() -> AsyncIterator[ScrapeEvent]:
+        pages: Dict[str, int] = {}
+        async for event in scraper.iter_pages(source):
+            yield event
+            # Retomado após o pipeline processar o evento: a categoria já está gravada
+            if isinstance(event, ScrapedPage):
+                pages[event.category] = pages.get(event.category, 0) + 1
+            elif isinstance(event, CategoryCompleted):
+                await asyncio.to_thread(
+                    queue.complete, run_id, event.category, pages.pop(event.category, 0), event.books, event.complete
+                )
+
+    logger.info(f"Worker {worker} consumindo a execução {run_id}")
+    result = await pipeline.run(events())
+    logger.info(f"Worker {worker} concluído: {result.pages} páginas, {result.books} livros")
+    return result
+
+
+def worker_process(queue_path: str, run_id: str, worker: str, share: int = 1):
+    """Ponto de entrada de um processo worker."""
+    asyncio.run(run_worker(ShardQueue(Path(queue_path)), run_id, worker, share=share))
+
+
+class ShardCoordinator:
+    """
+    Distribui as categorias entre processos workers e junta o resultado.
+    Expõe `result`, `scraper`, `completed_categories` e `skipped_categories`
+    como o ScrapePipeline, para o acompanhamento pelo serviço de jobs.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        resume: Union[bool, str] = False,
+        queue_path: Optional[Path] = None,
+        poll_interval: float = 1.0
+    ):
+        """
+        Inicializa o coordenador com o número de processos workers locais.
+        `resume` retoma a última execução da fila com categorias pendentes (True) ou a execução informada.
+        """
+        self.workers = max(1, workers)
+        self.resume = resume
+        self.queue = ShardQueue(queue_path or settings.SCRAPE_SHARD_QUEUE_PATH)
+        self.poll_interval = poll_interval
+        # Usado apenas para ler o mapa de categorias; guarda o progresso por categoria
+        self.scraper = BookScraper()
+        self.result = PipelineResult()
+        self.completed_categories: Set[str] = set()
+        self.skipped_categories: Set[str] = set()
+        self.tasks: List[ShardTask] = []
+        # Staging da execução (com DB_STAGED_SWAP), compartilhada pelos workers
+        self.table: Optional[str] = None
+
+    async def run(self) -> PipelineResult:
+        """Executa o crawl com os workers e retorna o resultado agregado."""
+        await asyncio.to_thread(ensure_schema, engine)
+        run_id = await self._open_run()
+        self.result.run_id = run_id
+        # Registrada antes da staging: a partir daqui ela não é descartada por outra execução
+        checkpoint = await asyncio.to_thread(RunCheckpoint.register, run_id, RunCheckpoint.SHARDED)
+        try:
+            await self._run(run_id, checkpoint)
+        except BaseException:
+            await asyncio.to_thread(checkpoint.finish, RunCheckpoint.FAILED)
+            raise
+        await asyncio.to_thread(checkpoint.finish, RunCheckpoint.COMPLETED)
+        return self.result
+
+    async def _run(self, run_id: str, checkpoint: RunCheckpoint):
+        """Prepara a staging, executa os workers e publica o resultado."""
+        swap = DatasetSwap(engine) if settings.DB_STAGED_SWAP else None
+        if swap and self.result.resumed and not await asyncio.to_thread(swap.has_staging, run_id):
+            # As categorias concluídas foram gravadas na staging descartada: a execução recomeça
+            reset = await asyncio.to_thread(self.queue.reset, run_id)
+            logger.warning(f"Staging da execução {run_id} não encontrada; {reset} categorias devolvidas à fila")
+        self._refresh()
+        self.skipped_categories = set(self.completed_categories)
+        if swap:
+            self.table = await asyncio.to_thread(swap.prepare, run_id)
+        # Os workers arquivam as páginas no crawl da execução; o coordenador o conclui ao final
+        archive_gap = None
+        if settings.SCRAPE_ARCHIVE_ENABLED:
+            archive_gap = await asyncio.to_thread(self._begin_archive, run_id)
+
+        prefix = f"{socket.gethostname()}-{run_id[:8]}"
+        names = [f"{prefix}-{index}" for index in range(self.workers)]
+        # Spawn: processos limpos (sem o event loop e as conexões do coordenador)
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(
+                target=worker_process, args=(str(self.queue.path), run_id, name, self.workers), name=name
+            )
+            for name in names
+        ]
+        started = time.monotonic()
+        for process in processes:
+            process.start()
+        logger.info(
+            f"Execução {run_id}: {len(self.tasks)} categorias distribuídas entre {self.workers} workers "
+            f"({settings.SCRAPE_RATE_LIMIT / self.workers:g} req/s e "
+            f"{max(1, settings.SCRAPE_SITE_CONCURRENCY // self.workers)} requisições simultâneas por host em cada um)"
+        )
+
+        try:
+            while any(process.is_alive() for process in processes):
+                await asyncio.sleep(self.poll_interval)
+                self._refresh()
+                await asyncio.to_thread(checkpoint.heartbeat)
+
+            # Categorias presas a workers locais que morreram não serão concluídas
+            lost = await asyncio.to_thread(self.queue.requeue, run_id, names)
+            if lost:
+                logger.error(f"{lost} categorias não concluídas por workers encerrados com erro")
+            # Workers de outras máquinas (--join) podem ainda estar processando categorias
+            self._refresh()
+            while any(task.status == ShardQueue.CLAIMED for task in self.tasks):
+                await asyncio.sleep(self.poll_interval)
+                self._refresh()
+                await asyncio.to_thread(checkpoint.heartbeat)
+        except BaseException:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            raise
+        finally:
+            for process in processes:
+                process.join()
+
+        elapsed = time.monotonic() - started
+        self._refresh()
+        if archive_gap is not None:
+            await asyncio.to_thread(self._finish_archive, run_id, archive_gap)
+        await self._prune()
+        if swap:
+            await asyncio.to_thread(swap.swap, self.table)
+            self.result.swapped = True
+        self._report(elapsed)
+
+    async def _open_run(self) -> str:
+        """Publica as categorias do site em uma nova execução ou retoma uma existente."""
+        if self.resume:
+            run_id = self.resume if isinstance(self.resume, str) else await asyncio.to_thread(self.queue.latest_run)
+            if run_id and await asyncio.to_thread(self.queue.tasks, run_id):
+                # Categorias pegas por workers que não terminaram voltam para a fila
+                requeued = await asyncio.to_thread(self.queue.requeue, run_id)
+                self.result.resumed = True
+                logger.info(f"Retomando a execução {run_id} ({requeued} categorias devolvidas à fila)")
+                return run_id
+            logger.warning(f"Nenhuma execução a retomar ({self.resume}). Iniciando uma nova.")
+
+        async with self.scraper.build_client() as client:
+            categories = await self.scraper.get_categories(client)
+        if not categories:
+            raise RuntimeError("Nenhuma categoria encontrada para distribuir entre os workers")
+        return await asyncio.to_thread(self.queue.create_run, categories)
+
+    def _refresh(self):
+        """Atualiza o progresso agregado a partir da fila."""
+        self.tasks = self.queue.tasks(self.result.run_id)
+        done = [task for task in self.tasks if task.status == ShardQueue.DONE]
+        self.scraper.categories = {task.category: task.url for task in self.tasks}
+        self.scraper.page_counts = {task.category: task.pages for task in done}
+        self.completed_categories = {task.category for task in done}
+        self.result.pages = sum(task.pages for task in done)
+        self.result.books = self.result.books_parsed = sum(task.books for task in done)
+
+    def _begin_archive(self, run_id: str) -> bool:
+        """Registra o crawl da execução no arquivo de HTML; retorna se faltam as páginas de antes da interrupção."""
+        archive = RawArchive(settings.SCRAPE_ARCHIVE_PATH)
+        try:
+            return bool(self.completed_categories) and not archive.begin_crawl(run_id)
+        finally:
+            archive.close()
+
+    def _finish_archive(self, run_id: str, gap: bool):
+        """Conclui o crawl da execução no arquivo de HTML (completo apenas se todas as categorias foram)."""
+        archive = RawArchive(settings.SCRAPE_ARCHIVE_PATH)
+        try:
+            archive.finish_crawl(self._crawl_complete() and not gap, run_id)
+        finally:
+            archive.close()
+
+    def _crawl_complete(self) -> bool:
+        """Indica se todas as categorias da execução foram concluídas por completo."""
+        return bool(self.tasks) and all(task.status == ShardQueue.DONE and task.complete for task in self.tasks)
+
+    async def _prune(self):
+        """Após um crawl completo, remove os livros das categorias que não existem mais."""
+        if not self._crawl_complete():
+            logger.warning("Crawl incompleto: remoção de categorias ausentes ignorada.")
+            return
+
+        def prune() -> int:
+            db = SessionLocal()
+            try:
+                repo = SQLAlchemyBookRepository(db, book_table_model(self.table)) if self.table else SQLAlchemyBookRepository(db)
+                return repo.delete_categories_except(self.completed_categories)
+            finally:
+                db.close()
+
+        self.result.changes.deleted += await asyncio.to_thread(prune)
+
+    def worker_summary(self) -> Dict[str, Dict[str, int]]:
+        """Categorias, páginas e livros concluídos por worker."""
+        summary: Dict[str, Dict[str, int]] = {}
+        for task in self.tasks:
+            if task.status == ShardQueue.DONE:
+                stats = summary.setdefault(task.worker, {"categories": 0, "pages": 0, "books": 0})
+                stats["categories"] += 1
+                stats["pages"] += task.pages
+                stats["books"] += task.books
+        return summary
+
+    def _report(self, elapsed: float):
+        """Registra a vazão agregada e a de cada worker."""
+        result = self.result
+        elapsed = max(elapsed, 1e-9)
+        logger.info(
+            f"Execução {result.run_id} com {self.workers} workers: {len(self.completed_categories)}/{len(self.tasks)} "
+            f"categorias, {result.pages} páginas e {result.books} livros em {elapsed:.1f}s "
+            f"({result.pages / elapsed:.1f} páginas/s, {result.books / elapsed:.1f} livros/s)"
+        )
+        for worker, stats in sorted(self.worker_summary().items()):
+            logger.info(
+                f"  {worker}: {stats['categories']} categorias, {stats['pages']} páginas, {stats['books']} livros"
+            )
@@ -0,0 +1,139 @@
+"""
+Adaptadores de sites de catálogo.
+Cada site raspado é descrito por um adaptador: onde ficam as categorias, como
+extrair uma listagem e como paginar. O BookScraper percorre os sites
+configurados em SCRAPE_SITES e grava todos na mesma tabela `books`.
+
+Para suportar um novo site, implemente SiteAdapter e registre a classe em
+SITE_ADAPTERS (o construtor recebe a URL base e o nome do backend de parsing).
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple, Type
+from urllib.parse import urljoin, urlsplit
+from src.scraper.backends import ListingPage, ParserBackend, get_parser_backend
+from src.scraper.parser import BookDetail, BookParser
+from src.core.config import settings
+
+
+class SiteAdapter(ABC):
+    """Interface de um site de catálogo."""
+
+    name: str = ""
+    # Requisições simultâneas ao site (None = SCRAPE_SITE_CONCURRENCY)
+    max_concurrency: Optional[int] = None
+    # Backend de parsing, quando o adaptador usa os de src/scraper/backends.py
+    backend: Optional[ParserBackend] = None
+
+    def __init__(self, base_url: str):
+        """Inicializa com a URL raiz do site."""
+        self.base_url = base_url.rstrip("/")
+
+    @property
+    def host(self) -> str:
+        """Host do site (chave do orçamento de concorrência)."""
+        return urlsplit(self.base_url).netloc
+
+    def owns(self, url: str) -> bool:
+        """Indica se a URL pertence ao site."""
+        return url == self.base_url or url.startswith(self.base_url + "/")
+
+    def categories_url(self) -> str:
+        """Página com a lista de categorias."""
+        return self.base_url
+
+    @abstractmethod
+    def parse_categories(self, content: str) -> List[Tuple[str, str]]:
+        """Extrai pares (nome, URL absoluta da primeira página) das categorias."""
+        pass
+
+    @abstractmethod
+    def parse_listing(self, content: str, category: str) -> ListingPage:
+        """Extrai livros, total de páginas e link "next" de uma listagem."""
+        pass
+
+    @abstractmethod
+    def page_url(self, category_url: str, page: int) -> str:
+        """URL da página `page` de uma categoria."""
+        pass
+
+    def next_url(self, current_url: str, href: str) -> str:
+        """Resolve o link "next" relativo à página atual."""
+        return urljoin(current_url, href)
+
+    def parse_detail(self, content: str) -> BookDetail:
+        """Extrai os dados da página de detalhe (sites sem detalhe retornam vazio)."""
+        return BookDetail()
+
+    def catalogue_url(self, page: int) -> Optional[str]:
+        """Página do catálogo completo, usada quando não há categorias (None = sem fallback)."""
+        return None
+
+
+class BooksToScrapeSite(SiteAdapter):
+    """books.toscrape.com (e o espelho offline, que reproduz o mesmo HTML)."""
+
+    name = "books.toscrape"
+
+    # Avaliação por extenso na classe "star-rating"
+    RATING_MAP = BookParser.RATING_MAP
+
+    def __init__(self, base_url: Optional[str] = None, backend_name: Optional[str] = None):
+        """Inicializa com a URL do site (padrão: SCRAPE_URL) e o backend de parsing."""
+        super().__init__(base_url or settings.SCRAPE_URL)
+        self.backend: ParserBackend = get_parser_backend(
+            backend_name or settings.SCRAPE_PARSER_BACKEND, self.base_url, self.RATING_MAP
+        )
+
+    def parse_categories(self, content: str) -> List[Tuple[str, str]]:
+        """Extrai as categorias da barra lateral."""
+        return [(name, f"{self.base_url}/{href}") for name, href in self.backend.parse_categories(content)]
+
+    def parse_listing(self, content: str, category: str) -> ListingPage:
+        """Extrai a listagem com o backend configurado."""
+        return self.backend.parse_listing(content, category)
+
+    def page_url(self, category_url: str, page: int) -> str:
+        """As páginas ficam ao lado do index.html: .../page-N.html."""
+        return f"{category_url.rsplit('/', 1)[0]}/page-{page}.html"
+
+    def parse_detail(self, content: str) -> BookDetail:
+        """Extrai UPC, descrição, estoque e avaliações."""
+        return self.backend.parse_detail(content)
+
+    def catalogue_url(self, page: int) -> Optional[str]:
+        """Catálogo completo paginado em /catalogue/page-N.html."""
+        return f"{self.base_url}/catalogue/page-{page}.html"
+
+
+# Adaptadores disponíveis, pelo nome usado em SCRAPE_SITES
+SITE_ADAPTERS: Dict[str, Type[SiteAdapter]] = {
+    BooksToScrapeSite.name: BooksToScrapeSite,
+}
+
+
+def get_site_adapter(name: str, base_url: Optional[str] = None, backend_name: Optional[str] = None) -> SiteAdapter:
+    """Cria o adaptador pelo nome; `base_url` permite apontar para outra instância do site."""
+    if name not in SITE_ADAPTERS:
+        raise ValueError(f"Site desconhecido: '{name}'. Opções: {', '.join(SITE_ADAPTERS)}")
+    return SITE_ADAPTERS[name](base_url, backend_name)
+
+
+def configured_sites(spec: Optional[str] = None, backend_name: Optional[str] = None) -> List[SiteAdapter]:
+    """
+    Cria os adaptadores de SCRAPE_SITES: nomes separados por vírgula,
+    cada um opcionalmente com a URL ("books.toscrape=http://espelho:8080").
+    """
+    sites = []
+    for item in (spec if spec is not None else settings.SCRAPE_SITES).split(","):
+        name, _, base_url = item.strip().partition("=")
+        if name:
+            sites.append(get_site_adapter(name, base_url.strip() or None, backend_name))
+    if not sites:
+        raise ValueError("SCRAPE_SITES não define nenhum site")
+    return sites
+
+
+def site_for_url(sites: List[SiteAdapter], url: str) -> SiteAdapter:
+    """Adaptador dono da URL (o primeiro site quando nenhum a reconhece)."""
+    owners = [site for site in sites if site.owns(url)]
+    return max(owners, key=lambda site: len(site.base_url)) if owners else sites[0]
@@ -0,0 +1,110 @@
+"""
+Telemetria das execuções de scraping.
+Coleta, durante o crawl, a latência de cada fetch (histograma), bytes
+baixados, retries, tempo de parsing por página, vazão por categoria e tempo
+de gravação no banco. O resumo é gravado com a execução (scrape_runs) e
+exposto em /metrics/scraping, permitindo comparar execuções.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from src.core.histogram import Histogram
+
+
+@dataclass
+class CategoryTelemetry:
+    """Vazão de uma categoria."""
+    pages: int = 0                 # Páginas processadas
+    books: int = 0                 # Livros extraídos
+    started: Optional[float] = None   # Início (monotonic)
+    elapsed: float = 0.0           # Duração (s)
+
+    def summary(self) -> Dict[str, Any]:
+        """Páginas, livros, duração e livros/s."""
+        return {
+            "pages": self.pages,
+            "books": self.books,
+            "seconds": round(self.elapsed, 3),
+            "books_per_second": round(self.books / self.elapsed, 2) if self.elapsed > 0 else None
+        }
+
+
+@dataclass
+class ScrapeTelemetry:
+    """Métricas de uma execução do scraper."""
+    fetches: int = 0               # Requisições concluídas (inclui 304)
+    errors: int = 0                # Requisições com erro (antes dos retries)
+    retries: int = 0               # Novas tentativas agendadas
+    not_modified: int = 0          # Respostas 304
+    bytes_downloaded: int = 0      # Bytes dos corpos recebidos
+    db_writes: int = 0             # Lotes gravados no banco
+    db_rows: int = 0               # Livros gravados no banco
+    fetch_latency: Histogram = field(default_factory=Histogram)
+    parse_time: Histogram = field(default_factory=Histogram)
+    db_write_time: Histogram = field(default_factory=Histogram)
+    categories: Dict[str, CategoryTelemetry] = field(default_factory=dict)
+    started: float = field(default_factory=time.monotonic)
+
+    def record_fetch(self, elapsed_ms: float, size: int, status_code: int):
+        """Registra uma resposta recebida."""
+        self.fetches += 1
+        self.bytes_downloaded += size
+        self.fetch_latency.observe(elapsed_ms)
+        if status_code == 304:
+            self.not_modified += 1
+
+    def record_error(self, retried: bool):
+        """Registra uma requisição com erro e se ela será repetida."""
+        self.errors += 1
+        if retried:
+            self.retries += 1
+
+    def record_parse(self, elapsed_ms: float):
+        """Registra o parsing de uma página."""
+        self.parse_time.observe(elapsed_ms)
+
+    def record_db_write(self, rows: int, elapsed_ms: float):
+        """Registra a gravação de um lote."""
+        self.db_writes += 1
+        self.db_rows += rows
+        self.db_write_time.observe(elapsed_ms)
+
+    def category(self, name: str) -> CategoryTelemetry:
+        """Métricas da categoria (criadas no primeiro uso)."""
+        return self.categories.setdefault(name, CategoryTelemetry())
+
+    def category_started(self, name: str):
+        """Marca o início da raspagem de uma categoria."""
+        self.category(name).started = time.monotonic()
+
+    def category_finished(self, name: str, books: int):
+        """Marca o fim da raspagem de uma categoria."""
+        category = self.category(name)
+        category.books = books
+        if category.started is not None:
+            category.elapsed = time.monotonic() - category.started
+
+    def record_page(self, name: str):
+        """Conta uma página processada da categoria."""
+        self.category(name).pages += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Resumo serializável (JSON) da execução."""
+        elapsed = time.monotonic() - self.started
+        pages = sum(category.pages for category in self.categories.values())
+        books = sum(category.books for category in self.categories.values())
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "fetches": self.fetches,
+            "errors": self.errors,
+            "retries": self.retries,
+            "not_modified": self.not_modified,
+            "bytes_downloaded": self.bytes_downloaded,
+            "pages": pages,
+            "books": books,
+            "books_per_second": round(books / elapsed, 2) if elapsed > 0 else None,
+            "fetch_latency": self.fetch_latency.summary(),
+            "parse_time": self.parse_time.summary(),
+            "db_write": {**self.db_write_time.summary(), "batches": self.db_writes, "rows": self.db_rows},
+            "categories": {name: category.summary() for name, category in self.categories.items()}
+        }
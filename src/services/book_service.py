@@ -2,10 +2,59 @@
 Serviço de livros.
 Contém a lógica de negócio para operações com livros.
 """
+import base64
+import binascii
+import json
+from dataclasses import dataclass
 from typing import List, Optional, Tuple
 from src.repository.base import BaseRepository
+from src.repository.book_query import BookQuery
 from src.schemas.responses import BookBase as Book
 
+# Resultados da busca por título quando o limite não é informado
+TITLE_SEARCH_LIMIT = 50
+
+
+@dataclass
+class BookPage:
+    """Página de livros com o total e o cursor da próxima página."""
+    items: List[Book]
+    total: int
+    total_estimated: bool          # Total obtido das estatísticas do banco
+    next_cursor: Optional[str]     # None na última página
+
+
+def encode_cursor(last_id: int) -> str:
+    """Cursor opaco apontando para depois do livro `last_id`."""
+    payload = json.dumps({"after": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Extrai o último ID do cursor; ValueError se o cursor for inválido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded.encode()))["after"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(after, int) or isinstance(after, bool):
+        raise ValueError("Cursor inválido")
+    return after
+
+
+def page_position(page: int, limit: int, cursor: Optional[str]) -> Tuple[int, Optional[int]]:
+    """Offset e último ID da página pedida (por cursor ou por número)."""
+    if cursor:
+        return 0, decode_cursor(cursor)
+    return (page - 1) * limit, None
+
+
+def build_page(books: List[Book], limit: int, total: int, estimated: bool) -> BookPage:
+    """Monta a página a partir de `limit` + 1 livros (o excedente indica que há próxima)."""
+    next_cursor = encode_cursor(books[limit - 1].id) if len(books) > limit else None
+    return BookPage(books[:limit], total, estimated, next_cursor)
+
+
 class BookService:
     """Serviço para operações com livros."""
     
@@ -13,33 +62,87 @@ class BookService:
         """Inicializa o serviço com um repositório."""
         self.repository = repository
 
-    def get_books_paginated(self, page: int, limit: int) -> Tuple[List[Book], int]:
-        """Retorna livros paginados e o total de livros."""
-        all_books = self.repository.get_all()
-        start = (page - 1) * limit
-        end = start + limit
-        return all_books[start:end], len(all_books)
+    def get_books_paginated(self, page: int, limit: int, cursor: Optional[str] = None) -> BookPage:
+        """
+        Retorna uma página de livros, paginada no banco. Com `cursor`, continua
+        após a página anterior (keyset); sem ele, usa o número da página.
+        """
+        offset, after_id = page_position(page, limit, cursor)
+        # Um livro a mais indica se existe próxima página
+        books = self.repository.get_page(limit + 1, offset, after_id)
+        return build_page(books, limit, *self.repository.count())
 
     def get_book_by_id(self, id: int) -> Optional[Book]:
         """Busca um livro pelo ID."""
         return self.repository.get_by_id(id)
 
-    def search_books(self, title: Optional[str] = None, category: Optional[str] = None) -> List[Book]:
-        """Busca livros por título e/ou categoria."""
-        return self.repository.find(title=title, category=category)
+    def search_books(
+        self, title: Optional[str] = None, category: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Book]:
+        """Busca livros por título (ordenados por relevância) e/ou categoria; sem título, a categoria inteira."""
+        if title:
+            return self.repository.search(title, category, limit or TITLE_SEARCH_LIMIT)
+        return self.repository.query(BookQuery(category=category, limit=limit))
+
+    def query_books(self, query: BookQuery) -> List[Book]:
+        """Consulta livros com filtros combinados, ordenação e limite."""
+        return self.repository.query(query)
 
     def get_top_rated(self, limit: int = 10) -> List[Book]:
-        """Retorna os livros mais bem avaliados."""
-        all_books = self.repository.get_all()
-        # Ordena por avaliação decrescente, depois preço crescente
-        sorted_books = sorted(all_books, key=lambda x: (-x.rating, x.price))
-        return sorted_books[:limit]
-
-    def get_by_price_range(self, min_price: float, max_price: float) -> List[Book]:
-        """Retorna livros dentro de uma faixa de preço."""
-        all_books = self.repository.get_all()
-        return [b for b in all_books if min_price <= b.price <= max_price]
+        """Retorna os livros mais bem avaliados (avaliação decrescente, depois preço crescente)."""
+        return self.query_books(BookQuery(sort="-rating", limit=limit))
+
+    def get_by_price_range(self, min_price: float, max_price: float, limit: int = 50, offset: int = 0) -> List[Book]:
+        """Retorna uma página dos livros dentro de uma faixa de preço, em ordem de preço (índice `price`)."""
+        return self.query_books(
+            BookQuery(min_price=min_price, max_price=max_price, sort="price", limit=limit, offset=offset)
+        )
         
     def get_all_categories(self) -> List[str]:
         """Retorna todas as categorias disponíveis."""
         return self.repository.get_categories()
+
+
+
+class AsyncBookService:
+    """Serviço para operações com livros sobre o repositório assíncrono (DB_ASYNC)."""
+
+    def __init__(self, repository):
+        """Inicializa o serviço com um AsyncSQLAlchemyBookRepository."""
+        self.repository = repository
+
+    async def get_books_paginated(self, page: int, limit: int, cursor: Optional[str] = None) -> BookPage:
+        """Retorna uma página de livros, paginada no banco (ver BookService.get_books_paginated)."""
+        offset, after_id = page_position(page, limit, cursor)
+        books = await self.repository.get_page(limit + 1, offset, after_id)
+        return build_page(books, limit, *await self.repository.count())
+
+    async def get_book_by_id(self, id: int) -> Optional[Book]:
+        """Busca um livro pelo ID."""
+        return await self.repository.get_by_id(id)
+
+    async def search_books(
+        self, title: Optional[str] = None, category: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Book]:
+        """Busca livros por título (ordenados por relevância) e/ou categoria; sem título, a categoria inteira."""
+        if title:
+            return await self.repository.search(title, category, limit or TITLE_SEARCH_LIMIT)
+        return await self.repository.query(BookQuery(category=category, limit=limit))
+
+    async def query_books(self, query: BookQuery) -> List[Book]:
+        """Consulta livros com filtros combinados, ordenação e limite."""
+        return await self.repository.query(query)
+
+    async def get_top_rated(self, limit: int = 10) -> List[Book]:
+        """Retorna os livros mais bem avaliados."""
+        return await self.query_books(BookQuery(sort="-rating", limit=limit))
+
+    async def get_by_price_range(self, min_price: float, max_price: float, limit: int = 50, offset: int = 0) -> List[Book]:
+        """Retorna uma página dos livros dentro de uma faixa de preço (ver BookService.get_by_price_range)."""
+        return await self.query_books(
+            BookQuery(min_price=min_price, max_price=max_price, sort="price", limit=limit, offset=offset)
+        )
+
+    async def get_all_categories(self) -> List[str]:
+        """Retorna todas as categorias disponíveis."""
+        return await self.repository.get_categories()
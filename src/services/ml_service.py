@@ -4,6 +4,7 @@ Prepara features dos livros para treinamento de modelos.
 """
 import pandas as pd
 from typing import List, Dict, Any, Optional
+from starlette.concurrency import run_in_threadpool
 from src.repository.base import BaseRepository
 from src.schemas.responses import BookBase as Book
 
@@ -16,7 +17,11 @@ class MLService:
 
     def get_features(self) -> List[Dict[str, Any]]:
         """Retorna features prontas para treinamento de modelos."""
-        books = self.repository.get_all()
+        return self.features(self.repository.get_all())
+
+    @staticmethod
+    def features(books: List[Book]) -> List[Dict[str, Any]]:
+        """Calcula as features de uma lista de livros."""
         if not books:
             return []
         
@@ -47,7 +52,11 @@ class MLService:
         Returns:
             Dicionário com train/test splits e metadados
         """
-        books = self.repository.get_all()
+        return self.training_data(self.repository.get_all(), test_size)
+
+    @staticmethod
+    def training_data(books: List[Book], test_size: float = 0.2) -> Dict[str, Any]:
+        """Monta o dataset de treinamento de uma lista de livros."""
         if not books:
             return {"error": "Nenhum dado disponível", "total_samples": 0}
         
@@ -98,7 +107,8 @@ class MLService:
             }
         }
 
-    def save_prediction(self, predictions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @staticmethod
+    def save_prediction(predictions: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Processa e armazena predições recebidas de modelos ML.
         
@@ -142,3 +152,22 @@ class MLService:
             "errors": invalid_predictions if invalid_predictions else None
         }
 
+
+class AsyncMLService:
+    """Serviço de ML sobre o repositório assíncrono (DB_ASYNC)."""
+
+    def __init__(self, repository):
+        """Inicializa o serviço com um AsyncSQLAlchemyBookRepository."""
+        self.repository = repository
+
+    async def get_features(self) -> List[Dict[str, Any]]:
+        """Retorna features prontas para treinamento (cálculo com pandas fora do event loop)."""
+        return await run_in_threadpool(MLService.features, await self.repository.get_all())
+
+    async def get_training_data(self, test_size: float = 0.2) -> Dict[str, Any]:
+        """Retorna dataset completo para treinamento de modelos ML."""
+        return await run_in_threadpool(MLService.training_data, await self.repository.get_all(), test_size)
+
+    async def save_prediction(self, predictions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Processa predições recebidas de modelos ML (sem acesso ao banco)."""
+        return MLService.save_prediction(predictions)
@@ -0,0 +1,249 @@
+"""
+Serviço de jobs de scraping.
+Executa o pipeline em um event loop dedicado (thread própria), fora do
+threadpool de requisições da API. Semântica single-flight: um disparo
+enquanto há um job ativo retorna o job em andamento em vez de iniciar outro.
+"""
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from src.scraper.pipeline import ScrapePipeline
+from src.scraper.sharding import ShardCoordinator
+from src.core.logging import logger
+
+# Cria o pipeline de um job a partir da opção de retomada
+PipelineFactory = Callable[[Union[bool, str]], ScrapePipeline]
+
+# Cria o coordenador de um job com vários workers (opção de retomada, número de workers)
+CoordinatorFactory = Callable[[Union[bool, str], int], ShardCoordinator]
+
+
+class ScrapeJob:
+    """Job de scraping e seu progresso."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, triggered_by: str, resume: Union[bool, str] = False, workers: int = 0):
+        """Cria o job pendente (`workers` > 1 distribui as categorias entre processos)."""
+        self.id = uuid.uuid4().hex
+        self.status = self.PENDING
+        self.triggered_by = triggered_by
+        self.resume = resume
+        self.workers = workers
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.pipeline: Optional[Union[ScrapePipeline, ShardCoordinator]] = None
+        self.future: Optional[Future] = None
+        self._started: Optional[float] = None
+        self._elapsed: Optional[float] = None
+        self._done = threading.Event()
+
+    @property
+    def is_active(self) -> bool:
+        """Indica se o job ainda não terminou."""
+        return self.status in (self.PENDING, self.RUNNING)
+
+    def elapsed(self) -> float:
+        """Segundos de execução (até agora ou até o término)."""
+        if self._started is None:
+            return 0.0
+        if self._elapsed is not None:
+            return self._elapsed
+        return time.monotonic() - self._started
+
+    def mark_started(self):
+        """Registra o início da execução."""
+        self.status = self.RUNNING
+        self.started_at = datetime.utcnow()
+        self._started = time.monotonic()
+
+    def mark_finished(self, status: str, error: Optional[str] = None):
+        """Registra o término da execução."""
+        self.status = status
+        self.error = error
+        self.finished_at = datetime.utcnow()
+        if self._started is not None:
+            self._elapsed = time.monotonic() - self._started
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda o término do job; retorna False se o tempo esgotar."""
+        return self._done.wait(timeout)
+
+    def estimated_pages(self) -> Optional[int]:
+        """
+        Estima o total de páginas do crawl: soma os paginadores já lidos e usa
+        a média deles para as categorias ainda não iniciadas.
+        """
+        if not self.pipeline:
+            return None
+        scraper = self.pipeline.scraper
+        pending = [c for c in scraper.categories if c not in self.pipeline.skipped_categories]
+        counts = [scraper.page_counts[c] for c in pending if c in scraper.page_counts]
+        if not pending or not counts:
+            return None
+        average = sum(counts) / len(counts)
+        return round(sum(counts) + average * (len(pending) - len(counts)))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retorna o estado e o progresso do job."""
+        result = self.pipeline.result if self.pipeline else None
+        pages = result.pages if result else 0
+        books_parsed = result.books_parsed if result else 0
+        elapsed = self.elapsed()
+
+        pages_per_second = pages / elapsed if elapsed > 0 else 0.0
+        books_per_second = books_parsed / elapsed if elapsed > 0 else 0.0
+        estimated = self.estimated_pages()
+        eta = None
+        if self.status == self.RUNNING and estimated is not None and pages_per_second > 0:
+            eta = max(0, estimated - pages) / pages_per_second
+
+        scraper = self.pipeline.scraper if self.pipeline else None
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "triggered_by": self.triggered_by,
+            "resume": bool(self.resume),
+            "workers": self.workers,
+            "run_id": result.run_id if result else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "categories_total": len(scraper.categories) if scraper else 0,
+            "categories_done": len(self.pipeline.completed_categories) if self.pipeline else 0,
+            "pages_fetched": pages,
+            "pages_estimated": estimated,
+            "books_parsed": books_parsed,
+            "books_written": result.books if result else 0,
+            "pages_per_second": round(pages_per_second, 2),
+            "books_per_second": round(books_per_second, 2),
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "error": self.error
+        }
+
+
+class ScrapeJobManager:
+    """Gerencia os jobs de scraping em um event loop dedicado."""
+
+    def __init__(
+        self,
+        pipeline_factory: PipelineFactory = None,
+        max_history: int = 20,
+        coordinator_factory: CoordinatorFactory = None
+    ):
+        """Inicializa o gerenciador (o event loop é criado no primeiro job)."""
+        self.pipeline_factory = pipeline_factory or (lambda resume: ScrapePipeline(resume=resume))
+        self.coordinator_factory = coordinator_factory or (
+            lambda resume, workers: ShardCoordinator(workers, resume=resume)
+        )
+        self.max_history = max_history
+        self._jobs: "OrderedDict[str, ScrapeJob]" = OrderedDict()
+        self._active: Optional[ScrapeJob] = None
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Inicia a thread do event loop dos jobs, se necessário."""
+        if self._loop is None or not self._thread.is_alive():
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="scrape-jobs", daemon=True)
+            self._thread.start()
+        return self._loop
+
+    def trigger(
+        self,
+        triggered_by: str,
+        resume: Union[bool, str] = False,
+        workers: int = 0
+    ) -> Tuple[ScrapeJob, bool]:
+        """
+        Inicia um job ou retorna o job ativo (single-flight).
+        Retorna o job e se ele foi criado por esta chamada.
+        """
+        with self._lock:
+            if self._active and self._active.is_active:
+                logger.info(f"Scraping já em andamento (job {self._active.id}); disparo de {triggered_by} ignorado")
+                return self._active, False
+
+            job = ScrapeJob(triggered_by, resume, workers)
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_history:
+                self._jobs.popitem(last=False)
+            self._active = job
+
+            job.future = asyncio.run_coroutine_threadsafe(self._run(job), self._ensure_loop())
+            job.future.add_done_callback(lambda future: self._on_done(job, future))
+            logger.info(f"Job de scraping {job.id} iniciado por {triggered_by}")
+            return job, True
+
+    async def _run(self, job: ScrapeJob):
+        """Executa o pipeline do job no event loop dedicado."""
+        job.mark_started()
+        try:
+            if job.workers > 1:
+                job.pipeline = self.coordinator_factory(job.resume, job.workers)
+            else:
+                job.pipeline = self.pipeline_factory(job.resume)
+            await job.pipeline.run()
+        except asyncio.CancelledError:
+            job.mark_finished(ScrapeJob.CANCELLED)
+            logger.warning(f"Job de scraping {job.id} cancelado")
+            return
+        except Exception as e:
+            job.mark_finished(ScrapeJob.FAILED, str(e))
+            logger.error(f"Job de scraping {job.id} falhou: {e}")
+            return
+        job.mark_finished(ScrapeJob.COMPLETED)
+        logger.info(f"Job de scraping {job.id} concluído: {job.pipeline.result.books} livros")
+
+    @staticmethod
+    def _on_done(job: ScrapeJob, future: Future):
+        """Job cancelado antes de começar não passa pelo _run: ajusta o estado."""
+        if future.cancelled() and job.status == ScrapeJob.PENDING:
+            job.mark_finished(ScrapeJob.CANCELLED)
+
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        """Busca um job pelo ID."""
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[ScrapeJob]:
+        """Retorna os jobs recentes, do mais novo ao mais antigo."""
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[ScrapeJob]:
+        """
+        Solicita o cancelamento do job; o checkpoint permite retomá-lo depois.
+        O job continua ativo até o pipeline encerrar (ver ScrapeJob.wait).
+        """
+        job = self.get(job_id)
+        if job and job.is_active and job.future:
+            job.future.cancel()
+        return job
+
+    def shutdown(self):
+        """Cancela o job ativo e encerra o event loop."""
+        if self._active and self._active.is_active:
+            self.cancel(self._active.id)
+            self._active.wait(timeout=10)
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+
+
+# Instância única usada pela API
+job_manager = ScrapeJobManager()
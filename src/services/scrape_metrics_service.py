@@ -0,0 +1,75 @@
+"""
+Serviço de métricas do scraping.
+Junta a telemetria do job em andamento com a das execuções gravadas em
+scrape_runs, para identificar categorias lentas e regressões entre execuções.
+"""
+import json
+from typing import Any, Dict, List, Optional
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from src.models.scrape_run import ScrapeRunModel
+from src.services.scrape_job_service import job_manager
+
+# Categorias mais lentas destacadas em cada execução
+SLOWEST_CATEGORIES = 5
+
+
+def slowest_categories(telemetry: Dict[str, Any], limit: int = SLOWEST_CATEGORIES) -> List[Dict[str, Any]]:
+    """Categorias com menor vazão (livros/s) da execução."""
+    categories = [
+        {"category": name, **stats}
+        for name, stats in telemetry.get("categories", {}).items()
+        if stats.get("books_per_second") is not None
+    ]
+    return sorted(categories, key=lambda c: c["books_per_second"])[:limit]
+
+
+class ScrapeMetricsService:
+    """Serviço para as métricas das execuções de scraping."""
+
+    def __init__(self, db: Session):
+        """Inicializa o serviço com uma sessão do banco."""
+        self.db = db
+
+    def get_metrics(self, limit: int = 10) -> Dict[str, Any]:
+        """Retorna a telemetria do job ativo e das últimas execuções."""
+        if not inspect(self.db.get_bind()).has_table(ScrapeRunModel.__tablename__):
+            # Banco sem o schema do scraping (nenhuma execução ainda): nada a listar
+            return {"active": self._active(), "runs": []}
+        runs = (
+            self.db.query(ScrapeRunModel)
+            .order_by(ScrapeRunModel.started_at.desc())
+            .limit(limit)
+            .all()
+        )
+        return {"active": self._active(), "runs": [self._run(run) for run in runs]}
+
+    @staticmethod
+    def _active() -> Optional[Dict[str, Any]]:
+        """Telemetria ao vivo do job em andamento, se houver."""
+        for job in job_manager.list():
+            if job.is_active and job.pipeline:
+                telemetry = job.pipeline.scraper.telemetry.summary()
+                return {
+                    "job_id": job.id,
+                    "run_id": job.pipeline.result.run_id,
+                    "telemetry": telemetry,
+                    "slowest_categories": slowest_categories(telemetry)
+                }
+        return None
+
+    @staticmethod
+    def _run(run: ScrapeRunModel) -> Dict[str, Any]:
+        """Resumo de uma execução gravada."""
+        telemetry = json.loads(run.telemetry) if run.telemetry else None
+        return {
+            "run_id": run.id,
+            "status": run.status,
+            "kind": run.kind,
+            "started_at": run.started_at,
+            "finished_at": run.finished_at,
+            "pages": run.pages,
+            "books": run.books,
+            "telemetry": telemetry,
+            "slowest_categories": slowest_categories(telemetry) if telemetry else []
+        }
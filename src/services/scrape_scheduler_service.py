@@ -0,0 +1,294 @@
+"""
+Scraping agendado.
+Cada instância da API roda o agendador, mas apenas uma executa o crawl de
+cada janela (SCRAPE_SCHEDULE_INTERVAL): a instância precisa obter a concessão
+(lease) gravada no banco. A concessão é renovada enquanto o job roda; se a
+instância cair, ela expira (SCRAPE_LEASE_TTL) e outra instância assume a
+janela, retomando a execução pelo checkpoint.
+
+No PostgreSQL a disputa pela concessão é serializada por um advisory lock
+transacional; no SQLite, pelo lock de escrita do próprio banco. Em ambos a
+concessão é obtida por um UPDATE condicional, atômico.
+"""
+import os
+import random
+import socket
+import threading
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+from sqlalchemy import and_, or_, text, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+from src.core.database import SessionLocal
+from src.models.scrape_run import ScrapeLeaseModel
+from src.services.scrape_job_service import ScrapeJob, ScrapeJobManager, job_manager
+from src.core.config import settings
+from src.core.logging import logger
+
+
+@dataclass
+class LeaseGrant:
+    """Concessão obtida para uma janela."""
+    slot: int                      # Janela concedida
+    expires_at: datetime           # Expiração (renovada enquanto o job roda)
+    takeover: bool                 # A instância anterior não concluiu o crawl (retomar pelo checkpoint)
+
+
+def default_holder() -> str:
+    """Identificação desta instância: host, processo e um sufixo aleatório."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class ScrapeLease:
+    """Concessão do scraping agendado gravada na tabela scrape_leases."""
+
+    def __init__(
+        self,
+        name: str = "scrape",
+        ttl: Optional[float] = None,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        """Inicializa a concessão `name` com a validade informada (padrão: SCRAPE_LEASE_TTL)."""
+        self.name = name
+        self.ttl = timedelta(seconds=ttl or settings.SCRAPE_LEASE_TTL)
+        self.session_factory = session_factory
+        # Chave do advisory lock do PostgreSQL (inteiro derivado do nome)
+        self.lock_key = zlib.crc32(f"scrape-lease:{name}".encode())
+
+    def acquire(self, holder: str, slot: int, now: Optional[datetime] = None) -> Optional[LeaseGrant]:
+        """
+        Tenta obter a concessão da janela `slot`. Ela está livre se a janela
+        anterior foi concluída ou se o detentor atual deixou a concessão expirar.
+        Retorna None se outra instância a detém ou já concluiu a janela.
+        """
+        now = now or datetime.utcnow()
+        db = self.session_factory()
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                # Outra instância está disputando a concessão neste momento
+                if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": self.lock_key}).scalar():
+                    return None
+
+            lease = db.get(ScrapeLeaseModel, self.name)
+            if lease is None:
+                lease = ScrapeLeaseModel(name=self.name, slot=-1, completed_at=now)
+                db.add(lease)
+                db.flush()
+            takeover = lease.holder is not None and lease.completed_at is None
+
+            model = ScrapeLeaseModel
+            expires_at = now + self.ttl
+            result = db.execute(
+                update(model)
+                .where(
+                    model.name == self.name,
+                    or_(
+                        and_(model.completed_at.isnot(None), model.slot < slot),
+                        and_(model.completed_at.is_(None), model.expires_at < now, model.slot <= slot)
+                    )
+                )
+                .values(slot=slot, holder=holder, acquired_at=now, expires_at=expires_at, completed_at=None, status=None)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                db.rollback()
+                return None
+            db.commit()
+        except (IntegrityError, OperationalError) as e:
+            # Disputa simultânea (linha criada por outra instância ou banco ocupado): fica para a próxima rodada
+            db.rollback()
+            logger.debug(f"Concessão '{self.name}' não obtida: {e}")
+            return None
+        finally:
+            db.close()
+
+        return LeaseGrant(slot, expires_at, takeover)
+
+    def renew(self, holder: str, now: Optional[datetime] = None) -> bool:
+        """Estende a validade; retorna False se a concessão passou para outra instância."""
+        now = now or datetime.utcnow()
+        return self._update(holder, expires_at=now + self.ttl)
+
+    def release(self, holder: str, status: Optional[str], now: Optional[datetime] = None):
+        """
+        Libera a concessão ao fim do job. Um job concluído (ou que falhou) encerra
+        a janela; sem `status` (ex.: instância encerrando) a concessão expira na
+        hora e outra instância retoma o crawl da janela.
+        """
+        now = now or datetime.utcnow()
+        if status is None:
+            self._update(holder, expires_at=now)
+        else:
+            self._update(holder, completed_at=now, status=status)
+
+    def _update(self, holder: str, **values) -> bool:
+        """Atualiza a concessão ativa de `holder`."""
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(ScrapeLeaseModel)
+                .where(
+                    ScrapeLeaseModel.name == self.name,
+                    ScrapeLeaseModel.holder == holder,
+                    ScrapeLeaseModel.completed_at.is_(None)
+                )
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+    def state(self) -> Optional[Dict[str, Any]]:
+        """Estado atual da concessão."""
+        db = self.session_factory()
+        try:
+            lease = db.get(ScrapeLeaseModel, self.name)
+            if lease is None:
+                return None
+            return {
+                "slot": lease.slot,
+                "holder": lease.holder,
+                "acquired_at": lease.acquired_at,
+                "expires_at": lease.expires_at,
+                "completed_at": lease.completed_at,
+                "status": lease.status
+            }
+        finally:
+            db.close()
+
+
+class ScrapeScheduler:
+    """
+    Dispara o scraping uma vez por janela, em uma thread própria.
+    Cada instância espera um atraso aleatório (até SCRAPE_SCHEDULE_JITTER) após
+    o início da janela antes de disputar a concessão, espalhando as tentativas.
+    """
+
+    def __init__(
+        self,
+        manager: Optional[ScrapeJobManager] = None,
+        lease: Optional[ScrapeLease] = None,
+        interval: Optional[float] = None,
+        jitter: Optional[float] = None,
+        workers: Optional[int] = None,
+        holder: Optional[str] = None
+    ):
+        """Inicializa com o gerenciador de jobs, a concessão e a cadência (padrões em Settings)."""
+        self.manager = manager or job_manager
+        self.lease = lease or ScrapeLease()
+        self.interval = max(1.0, interval or settings.SCRAPE_SCHEDULE_INTERVAL)
+        self.jitter = min(max(0.0, settings.SCRAPE_SCHEDULE_JITTER if jitter is None else jitter), self.interval)
+        self.workers = settings.SCRAPE_SCHEDULE_WORKERS if workers is None else workers
+        self.holder = holder or default_holder()
+        # Job da janela em andamento nesta instância
+        self.job: Optional[ScrapeJob] = None
+        # Janela atual e o horário em que esta instância tenta obter a concessão
+        self._attempt: Optional[Tuple[int, datetime]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def slot(self, now: datetime) -> int:
+        """Número da janela que contém `now`."""
+        return int(now.replace(tzinfo=timezone.utc).timestamp() // self.interval)
+
+    def next_attempt(self, now: datetime) -> datetime:
+        """Horário da tentativa desta instância na janela atual (início da janela + jitter)."""
+        slot = self.slot(now)
+        if not self._attempt or self._attempt[0] != slot:
+            start = datetime.fromtimestamp(slot * self.interval, tz=timezone.utc).replace(tzinfo=None)
+            self._attempt = (slot, start + timedelta(seconds=random.uniform(0, self.jitter)))
+        return self._attempt[1]
+
+    def tick(self, now: Optional[datetime] = None) -> Optional[ScrapeJob]:
+        """
+        Uma rodada do agendador: renova a concessão do job em andamento (ou a
+        libera quando ele termina) ou tenta iniciar o crawl da janela atual.
+        Retorna o job iniciado nesta rodada.
+        """
+        now = now or datetime.utcnow()
+        if self.job:
+            if self.job.is_active:
+                if not self.lease.renew(self.holder, now):
+                    # Outra instância assumiu a janela: evita dois crawls simultâneos
+                    logger.warning(f"Concessão do scraping perdida; cancelando o job {self.job.id}")
+                    self.manager.cancel(self.job.id)
+                    self.job = None
+                return None
+            status = None if self.job.status == ScrapeJob.CANCELLED else self.job.status
+            self.lease.release(self.holder, status, now)
+            logger.info(f"Scraping agendado da janela encerrado ({self.job.status})")
+            self.job = None
+
+        if now < self.next_attempt(now):
+            return None
+
+        grant = self.lease.acquire(self.holder, self.slot(now), now)
+        if grant is None:
+            return None
+
+        job, created = self.manager.trigger("scheduler", grant.takeover, self.workers)
+        self.job = job
+        logger.info(
+            f"Scraping agendado da janela {grant.slot} {'iniciado' if created else 'associado ao job ativo'}"
+            f"{' (retomando a execução de outra instância)' if grant.takeover else ''}: job {job.id}"
+        )
+        return job if created else None
+
+    def start(self):
+        """Inicia a thread do agendador."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scrape-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Agendador de scraping ativo em {self.holder}: a cada {self.interval:.0f}s "
+            f"(jitter até {self.jitter:.0f}s)"
+        )
+
+    def _run(self):
+        """Laço do agendador: acorda a tempo de renovar a concessão e de tentar a próxima janela."""
+        renew_every = self.lease.ttl.total_seconds() / 3
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Erro no agendador de scraping: {e}")
+            wait = renew_every
+            if not self.job:
+                until_attempt = (self.next_attempt(datetime.utcnow()) - datetime.utcnow()).total_seconds()
+                wait = min(wait, max(1.0, until_attempt))
+            self._stop.wait(wait)
+
+    def stop(self):
+        """Encerra o agendador; a concessão de um job em andamento é liberada para outra instância."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.job and self.job.is_active:
+            self.lease.release(self.holder, None)
+            self.job = None
+
+    def status(self) -> Dict[str, Any]:
+        """Configuração, próxima tentativa desta instância e estado da concessão."""
+        now = datetime.utcnow()
+        return {
+            "enabled": bool(self._thread and self._thread.is_alive()),
+            "holder": self.holder,
+            "interval_seconds": self.interval,
+            "jitter_seconds": self.jitter,
+            "current_slot": self.slot(now),
+            "next_attempt": self.next_attempt(now),
+            "job_id": self.job.id if self.job else None,
+            "lease": self.lease.state()
+        }
+
+
+# Instância única usada pela API (iniciada no startup com SCRAPE_SCHEDULE_ENABLED)
+scrape_scheduler = ScrapeScheduler()
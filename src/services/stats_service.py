@@ -4,6 +4,7 @@ Fornece análises e métricas sobre os livros.
 """
 import pandas as pd
 from typing import Dict, Any, List
+from starlette.concurrency import run_in_threadpool
 from src.repository.base import BaseRepository
 from src.schemas.responses import BookBase as Book
 from src.schemas.responses import CategoryStats
@@ -17,7 +18,11 @@ class StatsService:
 
     def get_overview(self) -> Dict[str, Any]:
         """Retorna estatísticas gerais dos livros."""
-        books = self.repository.get_all()
+        return self.overview(self.repository.get_all())
+
+    @staticmethod
+    def overview(books: List[Book]) -> Dict[str, Any]:
+        """Calcula as estatísticas gerais de uma lista de livros."""
         if not books:
             return {}
         
@@ -35,7 +40,11 @@ class StatsService:
 
     def get_category_stats(self) -> List[CategoryStats]:
         """Retorna estatísticas por categoria."""
-        books = self.repository.get_all()
+        return self.category_stats(self.repository.get_all())
+
+    @staticmethod
+    def category_stats(books: List[Book]) -> List[CategoryStats]:
+        """Calcula as estatísticas por categoria de uma lista de livros."""
         if not books:
             return []
         
@@ -55,3 +64,19 @@ class StatsService:
                 avg_rating=float(row['rating'])
             ) for _, row in stats.iterrows()
         ]
+
+
+class AsyncStatsService:
+    """Serviço de estatísticas sobre o repositório assíncrono (DB_ASYNC)."""
+
+    def __init__(self, repository):
+        """Inicializa o serviço com um AsyncSQLAlchemyBookRepository."""
+        self.repository = repository
+
+    async def get_overview(self) -> Dict[str, Any]:
+        """Retorna estatísticas gerais dos livros (cálculo com pandas fora do event loop)."""
+        return await run_in_threadpool(StatsService.overview, await self.repository.get_all())
+
+    async def get_category_stats(self) -> List[CategoryStats]:
+        """Retorna estatísticas por categoria."""
+        return await run_in_threadpool(StatsService.category_stats, await self.repository.get_all())
@@ -0,0 +1,54 @@
+import importlib
+import pytest
+
+# Módulos que importam o engine e a fábrica de sessões do banco da aplicação
+DATABASE_MODULES = [
+    "src.core.database",
+    "src.main",
+    "src.api.deps",
+    "src.api.v1.endpoints.scraping",
+    "src.scraper.checkpoint",
+    "src.scraper.exporter",
+    "src.scraper.pipeline",
+    "src.scraper.sharding",
+]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def app_database():
+    """Schema e usuário admin no banco do DATABASE_URL, como no startup da API (o TestClient não o executa)."""
+    from src.core.database import SessionLocal, engine
+    from src.core.migrations import ensure_schema
+    from src.services.auth_service import ensure_admin_user
+
+    ensure_schema(engine)
+    db = SessionLocal()
+    try:
+        ensure_admin_user(db)
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def isolated_db(tmp_path, monkeypatch):
+    """Banco SQLite temporário no lugar do DATABASE_URL: pipelines e trocas do catálogo não tocam o banco real."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.core.database import engine_options
+    from src.core.migrations import ensure_schema
+    from src.repository.sqlalchemy_repository import invalidate_book_count
+
+    url = f"sqlite:///{tmp_path / 'books.sqlite3'}"
+    engine = create_engine(url, **engine_options(url))
+    ensure_schema(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    for name in DATABASE_MODULES:
+        module = importlib.import_module(name)
+        for attribute, value in (("engine", engine), ("SessionLocal", session_factory)):
+            if hasattr(module, attribute):
+                monkeypatch.setattr(module, attribute, value)
+
+    invalidate_book_count()
+    yield session_factory
+    invalidate_book_count()
+    engine.dispose()
@@ -25,3 +25,230 @@ def test_login_admin():
     token_data = response.json()
     assert "access_token" in token_data
     assert token_data["token_type"] == "bearer"
+
+def test_imagem_local_com_cache(tmp_path, monkeypatch):
+    """Testa a rota das capas locais e os cabeçalhos de cache."""
+    from src.core.config import settings
+    from src.scraper.images import ImageStore
+
+    monkeypatch.setattr(settings, "SCRAPE_IMAGES_PATH", tmp_path)
+    store = ImageStore(tmp_path)
+    image_hash, _ = store.put("http://fake/cover.jpg", b"\xff\xd8capa\xff\xd9", "image/jpeg", None, None)
+    store.close()
+
+    response = client.get(f"/api/v1/images/{image_hash}")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert "immutable" in response.headers["cache-control"]
+
+    cached = client.get(f"/api/v1/images/{image_hash}", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert client.get(f"/api/v1/images/{'0' * 64}").status_code == 404
+
+def test_metricas_de_scraping(isolated_db):
+    """Testa o endpoint de telemetria das execuções de scraping, inclusive sem a tabela scrape_runs."""
+    from src.models.scrape_run import ScrapeRunModel
+    from src.scraper.checkpoint import RunCheckpoint
+
+    run_id = RunCheckpoint.open().run_id
+    response = client.get("/api/v1/metrics/scraping?limit=5")
+    assert response.status_code == 200
+    data = response.json()
+    assert "active" in data
+    assert [run["run_id"] for run in data["runs"]] == [run_id]
+
+    # Banco em que o schema do scraping ainda não foi criado
+    ScrapeRunModel.__table__.drop(isolated_db.kw["bind"])
+    response = client.get("/api/v1/metrics/scraping?limit=5")
+    assert response.status_code == 200
+    assert response.json()["runs"] == []
+
+def test_paginacao_por_cursor(isolated_db):
+    """Testa que o cursor percorre o catálogo na mesma ordem da paginação por página."""
+    from src.repository.sqlalchemy_repository import SQLAlchemyBookRepository
+    from src.schemas.responses import BookBase
+
+    db = isolated_db()
+    try:
+        SQLAlchemyBookRepository(db).bulk_insert([
+            BookBase(title=f"Cursor {i}", price=10.0 + i, rating=3, availability=True, category="Cursor",
+                     image_url="http://fake/capa.jpg", source_url=f"http://fake/cursor-{i}")
+            for i in range(7)
+        ])
+    finally:
+        db.close()
+
+    first = client.get("/api/v1/books/?limit=3").json()
+    total = first["total"]
+    assert total == 7 and not first["total_estimated"]
+
+    by_page, page = [], 1
+    while True:
+        items = client.get(f"/api/v1/books/?limit=3&page={page}").json()["items"]
+        if not items:
+            break
+        by_page += [book["id"] for book in items]
+        page += 1
+
+    by_cursor, data = [], first
+    while True:
+        by_cursor += [book["id"] for book in data["items"]]
+        if not data["next_cursor"]:
+            break
+        data = client.get(f"/api/v1/books/?limit=3&cursor={data['next_cursor']}").json()
+        assert data["page"] is None
+
+    assert by_cursor == by_page == sorted(by_page)
+    assert len(by_cursor) == total
+    assert client.get("/api/v1/books/?cursor=invalido").status_code == 400
+
+def test_consulta_com_filtros_combinados(isolated_db):
+    """Testa a consulta de livros com filtros e ordenação executados no banco."""
+    from src.repository.sqlalchemy_repository import SQLAlchemyBookRepository
+    from src.schemas.responses import BookBase
+
+    db = isolated_db()
+    try:
+        SQLAlchemyBookRepository(db).bulk_insert([
+            BookBase(title=f"Consulta {i}", price=float(10 + i), rating=1 + i % 5, availability=i % 2 == 0,
+                     category="Consulta", image_url="http://fake/capa.jpg", source_url=f"http://fake/consulta-{i}")
+            for i in range(10)
+        ])
+    finally:
+        db.close()
+
+    books = client.get(
+        "/api/v1/books/query?category=Consulta&min_price=11&max_price=18&min_rating=2&available=true&sort=-price"
+    ).json()
+    assert [b["price"] for b in books] == [18.0, 16.0, 14.0, 12.0]
+    assert all(b["rating"] >= 2 and b["availability"] for b in books)
+
+    top = client.get("/api/v1/books/query?category=Consulta&sort=-rating&limit=3").json()
+    assert [(b["rating"], b["price"]) for b in top] == [(5, 14.0), (5, 19.0), (4, 13.0)]
+
+    # As rotas antigas usam a mesma consulta
+    top_rated = client.get("/api/v1/books/top-rated?limit=5").json()
+    assert [(-b["rating"], b["price"]) for b in top_rated] == sorted((-b["rating"], b["price"]) for b in top_rated)
+    in_range = client.get("/api/v1/books/price-range?min_price=12&max_price=13").json()
+    assert {"Consulta 2", "Consulta 3"} <= {b["title"] for b in in_range}
+    assert all(12 <= b["price"] <= 13 for b in in_range)
+    # A faixa padrão (0-1000) não devolve o catálogo inteiro: é paginada por limit/offset
+    assert len(client.get("/api/v1/books/price-range").json()) == 10
+    pages = [client.get(f"/api/v1/books/price-range?limit=4&offset={offset}").json() for offset in (0, 4, 8)]
+    assert [len(page) for page in pages] == [4, 4, 2]
+    assert [b["price"] for page in pages for b in page] == [float(10 + i) for i in range(10)]
+    assert client.get("/api/v1/books/price-range?limit=101").status_code == 422
+
+    assert client.get("/api/v1/books/query?sort=rating").status_code == 400
+
+def test_busca_por_titulo_com_prefixo_e_erros(isolated_db):
+    """Testa a busca textual: prefixos, tolerância a erros de digitação e filtro por categoria."""
+    from src.repository.sqlalchemy_repository import SQLAlchemyBookRepository
+    from src.schemas.responses import BookBase
+
+    titles = ["Quasar Primer for Beginners", "Quasar Horticulture", "Horticulture Basics"]
+    db = isolated_db()
+    try:
+        SQLAlchemyBookRepository(db).bulk_insert([
+            BookBase(title=title, price=20.0, rating=4, availability=True, category="Busca" if i else "Outra",
+                     image_url="http://fake/capa.jpg", source_url=f"http://fake/busca-{i}")
+            for i, title in enumerate(titles)
+        ])
+    finally:
+        db.close()
+
+    def search(query):
+        return [b["title"] for b in client.get(f"/api/v1/books/search?{query}").json()]
+
+    assert set(search("title=quas")) == {"Quasar Primer for Beginners", "Quasar Horticulture"}
+    assert search("title=quasar horticulture")[0] == "Quasar Horticulture"
+    # Erro de digitação corrigido pelo índice
+    assert search("title=quasr horticulture")[0] == "Quasar Horticulture"
+    assert set(search("title=horticulture&category=Busca")) == {"Quasar Horticulture", "Horticulture Basics"}
+    assert search("title=quasar&category=Busca&limit=5") == ["Quasar Horticulture"]
+
+    # Sem título, a busca retorna a categoria inteira (sem o limite da busca textual)
+    db = isolated_db()
+    try:
+        SQLAlchemyBookRepository(db).bulk_insert([
+            BookBase(title=f"Volume {i}", price=20.0, rating=4, availability=True, category="Coleção",
+                     image_url="http://fake/capa.jpg", source_url=f"http://fake/colecao-{i}")
+            for i in range(60)
+        ])
+    finally:
+        db.close()
+    assert len(search("category=Coleção")) == 60
+    assert len(search("category=Coleção&limit=10")) == 10
+
+def test_rotas_do_catalogo_com_banco_assincrono(isolated_db, monkeypatch):
+    """Testa que as rotas do catálogo respondem igual com DB_ASYNC (extra `async`: aiosqlite e greenlet)."""
+    import pytest
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("greenlet")
+    from src.core.config import settings
+    from src.repository.sqlalchemy_repository import SQLAlchemyBookRepository
+    from src.schemas.responses import BookBase
+
+    db = isolated_db()
+    try:
+        SQLAlchemyBookRepository(db).bulk_insert([
+            BookBase(title=f"Quasar Volume {i}", price=10.0 + i, rating=1 + i % 5, availability=i % 3 > 0,
+                     category=f"Assíncrona {i % 3}", image_url="http://fake/capa.jpg",
+                     source_url=f"http://fake/assincrona-{i}")
+            for i in range(12)
+        ])
+    finally:
+        db.close()
+    database_path = db.get_bind().url.database
+
+    urls = [
+        "/api/v1/books/?limit=3",
+        "/api/v1/books/?limit=3&page=2",
+        "/api/v1/books/query?sort=-rating&limit=5",
+        "/api/v1/books/search?title=quasar",
+        "/api/v1/books/search?category=Assíncrona 1",
+        "/api/v1/books/1",
+        "/api/v1/categories/",
+        "/api/v1/stats/overview",
+    ]
+    expected = [client.get(url).json() for url in urls]
+    assert expected[0]["total"] == 12
+
+    monkeypatch.setattr(settings, "DB_ASYNC", True)
+    monkeypatch.setattr(settings, "DB_ASYNC_URL", f"sqlite+aiosqlite:///{database_path}")
+    # Um único event loop para o engine assíncrono; o shutdown fecha suas conexões
+    with TestClient(app) as async_client:
+        assert [async_client.get(url).json() for url in urls] == expected
+        assert async_client.get("/api/v1/metrics/db-pool").json()["async"]["checkouts"] > 0
+
+def test_metricas_do_pool_de_conexoes(tmp_path, monkeypatch):
+    """Testa a configuração do pool e as métricas de checkout, timeout e ocupação."""
+    import pytest
+    from sqlalchemy import create_engine
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+    from src.core.config import settings
+    from src.core.database import engine_options
+    from src.core.pool_metrics import pool_status
+
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.05)
+    url = f"sqlite:///{tmp_path / 'pool.sqlite3'}"
+    pool_engine = create_engine(url, **engine_options(url))
+
+    with pool_engine.connect():
+        busy = pool_status(pool_engine)
+        assert (busy["size"], busy["in_use"], busy["saturation"]) == (1, 1, 1.0)
+        with pytest.raises(PoolTimeoutError):
+            pool_engine.connect()
+
+    status = pool_status(pool_engine)
+    assert (status["in_use"], status["idle"], status["overflow"]) == (0, 1, 0)
+    assert (status["checkouts"], status["timeouts"], status["pre_ping"]) == (1, 1, True)
+    assert status["wait"]["count"] == 1
+    pool_engine.dispose()
+
+    response = client.get("/api/v1/metrics/db-pool")
+    assert response.status_code == 200
+    assert response.json()["sync"]["monitored"] is True
+    assert "db_pool" in client.get("/api/v1/metrics/").json()
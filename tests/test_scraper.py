@@ -0,0 +1,1052 @@
+import asyncio
+import time
+from src.scraper.rate_limiter import HostRateLimiter, TokenBucket
+
+
+def test_token_bucket_limita_taxa():
+    """Testa que o token bucket respeita a taxa após esgotar a rajada."""
+    async def run():
+        bucket = TokenBucket(rate=20, burst=2)
+        start = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # 2 tokens imediatos + 4 a 20/s => ~0.2s
+    elapsed = asyncio.run(run())
+    assert elapsed >= 0.18
+
+
+def test_rate_limiter_separa_hosts():
+    """Testa que cada host recebe um bucket independente."""
+    limiter = HostRateLimiter(rate=1, burst=1)
+    a = limiter.bucket_for("http://a.com/x")
+    b = limiter.bucket_for("http://b.com/x")
+    assert a is not b
+    assert limiter.bucket_for("http://a.com/y") is a
+
+
+# --- Site falso para testes de scraping ---
+
+POD = (
+    '<article class="product_pod"><div class="image_container">'
+    '<a href="../../../{slug}/index.html"><img src="../../../../media/cache/{slug}.jpg" class="thumbnail"></a></div>'
+    '<p class="star-rating Three"></p><h3><a href="../../../{slug}/index.html" title="{title}">{title}</a></h3>'
+    '<div class="product_price"><p class="price_color">£{price}</p>'
+    '<p class="instock availability"><i class="icon-ok"></i> In stock</p></div></article>'
+)
+
+
+def fake_listing(prefix: str, page: int, total: int, pager: bool = True) -> str:
+    """Gera uma página de listagem no formato do books.toscrape.com."""
+    pods = "".join(
+        POD.format(slug=f"{prefix}-{page}-{i}", title=f"{prefix} {page:02d} {i}", price=f"{10 + i}.50")
+        for i in range(3)
+    )
+    current = f'<li class="current">Page {page} of {total}</li>' if pager else ""
+    nxt = f'<li class="next"><a href="page-{page + 1}.html">next</a></li>' if page < total else ""
+    return f'<html><body><ul class="pager">{current}{nxt}</ul><ol class="row">{pods}</ol></body></html>'
+
+
+def make_scraper(handler):
+    """Cria um BookScraper que usa um transporte HTTP simulado."""
+    import httpx
+    from src.scraper.scraper import BookScraper
+
+    scraper = BookScraper()
+    scraper.rate_limiter = HostRateLimiter(rate=0, burst=1)
+    scraper.build_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return scraper
+
+
+def listing_handler(total: int, pager: bool = True):
+    """Retorna um handler que serve uma categoria com `total` páginas."""
+    import httpx
+
+    async def handler(request):
+        name = request.url.path.rsplit("/", 1)[-1]
+        page = 1 if name == "index.html" else int(name[len("page-"):-len(".html")])
+        # Páginas iniciais respondem mais devagar para embaralhar a conclusão
+        await asyncio.sleep(0.01 * (total - page))
+        return httpx.Response(200, text=fake_listing("cat", page, total, pager))
+
+    return handler
+
+
+def scrape_fake_category(total: int, pager: bool = True):
+    """Raspa uma categoria falsa e retorna os livros."""
+    scraper = make_scraper(listing_handler(total, pager))
+
+    async def run():
+        async with scraper.build_client() as client:
+            return await scraper.scrape_category(client, "Teste", "http://fake/catalogue/category/books/x_1/index.html")
+
+    return asyncio.run(run())
+
+
+def test_scrape_category_paginador_preserva_ordem():
+    """Testa o fan-out pelas páginas do paginador em ordem determinística."""
+    books = scrape_fake_category(total=5)
+    assert len(books) == 15
+    assert [b.title for b in books] == sorted(b.title for b in books)
+
+
+def test_scrape_category_sem_paginador_segue_next():
+    """Testa o fallback pelo link "next" quando não há paginador."""
+    books = scrape_fake_category(total=4, pager=False)
+    assert len(books) == 12
+    assert [b.title for b in books] == sorted(b.title for b in books)
+
+
+def test_backends_produzem_saida_identica():
+    """Testa que todos os backends instalados extraem os mesmos dados das fixtures."""
+    from pathlib import Path
+    from src.scraper.backends import PARSER_BACKENDS, get_parser_backend
+
+    fixtures = sorted((Path(__file__).parent / "fixtures").glob("*.html"))
+    reference = get_parser_backend("html.parser")
+
+    for name in PARSER_BACKENDS:
+        backend = get_parser_backend(name)
+        for path in fixtures:
+            html = path.read_text(encoding="utf-8")
+            expected = reference.parse_listing(html, "Teste")
+            listing = backend.parse_listing(html, "Teste")
+            assert listing == expected, f"{name} divergiu em {path.name}"
+            assert backend.parse_categories(html) == reference.parse_categories(html)
+            assert backend.parse_detail(html) == reference.parse_detail(html)
+
+    index_html = (Path(__file__).parent / "fixtures" / "index.html").read_text(encoding="utf-8")
+    index = reference.parse_listing(index_html, "Teste")
+    assert len(index.books) == 20
+    assert index.page_count == 50
+    assert len(reference.parse_categories(index_html)) == 50
+
+    detail = reference.parse_detail((Path(__file__).parent / "fixtures" / "book_detail.html").read_text(encoding="utf-8"))
+    assert (detail.upc, detail.stock_count, detail.num_reviews) == ("a897fe39b1053632", 22, 0)
+    assert detail.description.startswith("It's hard to imagine")
+
+
+def test_parse_executor_equivale_ao_parsing_inline():
+    """Testa que o pool de processos devolve a mesma listagem do parsing no loop."""
+    from pathlib import Path
+    from src.scraper.backends import get_parser_backend
+    from src.scraper.parse_executor import ParseExecutor
+
+    html = (Path(__file__).parent / "fixtures" / "category_page.html").read_text(encoding="utf-8")
+    executor = ParseExecutor("html.parser", workers=2)
+    try:
+        listing = asyncio.run(executor.parse_listing(html, "Fiction"))
+    finally:
+        executor.shutdown()
+
+    assert listing == get_parser_backend("html.parser").parse_listing(html, "Fiction")
+
+
+def site_handler(categories: int, total: int):
+    """Retorna um handler que serve a home e `categories` categorias com `total` páginas."""
+    import httpx
+
+    nav = "".join(
+        f'<li><a href="catalogue/category/books/cat{i}_{i + 2}/index.html">Cat {i}</a></li>'
+        for i in range(categories)
+    )
+    home = (
+        '<html><body><ul class="nav nav-list"><li><a href="catalogue/category/books_1/index.html">Books</a>'
+        f'<ul>{nav}</ul></li></ul></body></html>'
+    )
+
+    async def handler(request):
+        parts = request.url.path.strip("/").split("/")
+        if len(parts) < 3:
+            return httpx.Response(200, text=home)
+        name = parts[-1]
+        page = 1 if name == "index.html" else int(name[len("page-"):-len(".html")])
+        return httpx.Response(200, text=fake_listing(parts[-2], page, total))
+
+    return handler
+
+
+def test_pipeline_grava_em_lotes(isolated_db):
+    """Testa o pipeline em streaming gravando o catálogo em lotes no banco."""
+    from src.scraper.pipeline import ScrapePipeline
+    from src.core.database import SessionLocal
+    from src.models.book import BookModel
+
+    scraper = make_scraper(site_handler(categories=3, total=2))
+    result = asyncio.run(ScrapePipeline(scraper, batch_size=4).run())
+
+    assert result.pages == 6
+    assert result.books == 18
+    assert result.batches == 3
+
+    db = SessionLocal()
+    try:
+        assert db.query(BookModel).count() == 18
+        ids = {b.source_url: b.id for b in db.query(BookModel)}
+    finally:
+        db.close()
+
+    # Segunda execução: uma categoria a menos e uma página a menos por categoria
+    scraper = make_scraper(site_handler(categories=2, total=1))
+    result = asyncio.run(ScrapePipeline(scraper, batch_size=4).run())
+    assert result.changes.dict() == {"inserted": 0, "updated": 0, "deleted": 12, "unchanged": 6}
+
+    db = SessionLocal()
+    try:
+        # Os livros que continuam no catálogo preservam o ID
+        assert {b.source_url: b.id for b in db.query(BookModel)}.items() <= ids.items()
+        assert db.query(BookModel).count() == 6
+    finally:
+        db.close()
+
+
+def detail_site_handler(categories: int, total: int, requests: list):
+    """Site falso com páginas de detalhe; registra as URLs de detalhe pedidas."""
+    import httpx
+
+    serve = site_handler(categories, total)
+
+    async def handler(request):
+        if "/category/" not in request.url.path and request.url.path.startswith("/catalogue/"):
+            requests.append(str(request.url))
+            slug = request.url.path.split("/")[2]
+            return httpx.Response(200, text=(
+                '<article class="product_page"><div id="product_description"><h2>Product Description</h2></div>'
+                f'<p>Sobre {slug}</p><table><tr><th>UPC</th><td>upc-{slug}</td></tr>'
+                '<tr><th>Availability</th><td>In stock (7 available)</td></tr>'
+                '<tr><th>Number of reviews</th><td>2</td></tr></table></article>'
+            ))
+        return await serve(request)
+
+    return handler
+
+
+def test_enriquecimento_busca_detalhes_uma_vez(isolated_db, monkeypatch):
+    """Testa o enriquecimento: detalhes gravados e livros inalterados não buscados de novo."""
+    from src.core.config import settings
+    from src.scraper.pipeline import ScrapePipeline
+    from src.core.database import SessionLocal
+    from src.models.book import BookModel
+
+    monkeypatch.setattr(settings, "SCRAPE_DETAILS_ENABLED", True)
+    requests = []
+    result = asyncio.run(ScrapePipeline(make_scraper(detail_site_handler(2, 2, requests))).run())
+    assert len(requests) == len(set(requests)) == result.books == 12
+
+    db = SessionLocal()
+    try:
+        book = db.query(BookModel).filter(BookModel.source_url.like("%cat0_2-2-1%")).one()
+        assert (book.upc, book.description, book.stock_count, book.num_reviews) == (
+            "upc-cat0_2-2-1", "Sobre cat0_2-2-1", 7, 2
+        )
+    finally:
+        db.close()
+
+    # Segunda execução: listagens inalteradas reaproveitam os detalhes gravados
+    requests.clear()
+    scraper = make_scraper(detail_site_handler(2, 2, requests))
+    result = asyncio.run(ScrapePipeline(scraper).run())
+    assert requests == []
+    assert scraper.enrichment_stats.reused == 12
+    assert result.changes.unchanged == 12
+
+
+def test_enriquecimento_deduplica_urls(monkeypatch):
+    """Testa que a mesma URL é buscada uma vez e que só os detalhes mais recentes ficam em memória."""
+    import httpx
+    from src.core.config import settings
+    from src.scraper.enrichment import DetailEnricher
+
+    monkeypatch.setattr(settings, "SCRAPE_DETAIL_CACHE_ENTRIES", 2)
+    requests = []
+    scraper = make_scraper(detail_site_handler(1, 1, requests))
+    books = asyncio.run(scraper.scrape_all())
+
+    async def run():
+        enricher = DetailEnricher(scraper, concurrency=2)
+        async with scraper.build_client() as client:
+            enriched = await enricher.enrich(client, books + books)
+            # Um dos três detalhes saiu do LRU: só ele é buscado de novo
+            again = await enricher.enrich(client, books)
+        return enricher, enriched + again
+
+    enricher, enriched = asyncio.run(run())
+    assert len(requests) == 4
+    assert enricher.stats.deduplicated == 5
+    assert all(book.upc for book in enriched)
+    assert not enricher._pending and len(enricher._resolved) == 2
+
+
+def test_classificacao_de_erros_e_retry_after():
+    """Testa quais erros são repetidos e o cálculo da espera."""
+    import httpx
+    from src.scraper.retry import backoff_delay, is_retryable, retry_delay
+
+    def status_error(status, headers=None):
+        request = httpx.Request("GET", "http://fake/x")
+        response = httpx.Response(status, headers=headers, request=request)
+        return httpx.HTTPStatusError("erro", request=request, response=response)
+
+    assert is_retryable(status_error(503))
+    assert is_retryable(status_error(429))
+    assert not is_retryable(status_error(404))
+    assert is_retryable(httpx.ReadTimeout("timeout"))
+    assert not is_retryable(ValueError("parse"))
+
+    assert retry_delay(status_error(429, {"Retry-After": "7"}), 0, 0.5, 30) == 7
+    assert retry_delay(status_error(429, {"Retry-After": "120"}), 0, 0.5, 30) == 30
+    assert all(0 <= backoff_delay(attempt, 0.5, 3) <= min(3, 0.5 * 2 ** attempt) for attempt in range(6))
+
+
+def test_circuit_breaker_abre_e_fecha():
+    """Testa a abertura do circuito com muitas falhas e o fechamento após o teste."""
+    import pytest
+    from src.scraper.retry import CircuitBreaker, CircuitOpenError
+
+    breaker = CircuitBreaker(failure_ratio=0.5, min_requests=4, window=10, cooldown=0.05)
+    for success in (True, False, False, True):
+        breaker.before_request("fake")
+        breaker.record(success)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("fake")
+
+    time.sleep(0.06)
+    breaker.before_request("fake")
+    # Apenas uma requisição de teste no estado meio-aberto
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("fake")
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_paginas_com_falha_sao_repetidas_ao_fim(monkeypatch):
+    """Testa que falhas transitórias vão para a fila de retry e 404 não é repetido."""
+    import httpx
+    from src.core.config import settings
+    from src.scraper.scraper import CategoryCompleted, ScrapedPage
+
+    monkeypatch.setattr(settings, "RETRY_DELAY", 0.001)
+    serve = site_handler(categories=2, total=3)
+    attempts = {}
+
+    async def handler(request):
+        path = request.url.path
+        attempts[path] = attempts.get(path, 0) + 1
+        # Falha persistente durante o crawl; recupera na fila de retry
+        if path.endswith("cat0_2/page-2.html") and attempts[path] <= settings.MAX_RETRIES:
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        if path.endswith("cat1_3/page-3.html"):
+            return httpx.Response(404)
+        return await serve(request)
+
+    scraper = make_scraper(handler)
+
+    async def run():
+        return [event async for event in scraper.iter_pages()]
+
+    events = asyncio.run(run())
+    pages = {(e.category, e.page) for e in events if isinstance(e, ScrapedPage)}
+    completed = {e.category: e for e in events if isinstance(e, CategoryCompleted)}
+
+    assert ("Cat 0", 2) in pages
+    assert completed["Cat 0"].complete and completed["Cat 0"].books == 9
+    assert attempts["/catalogue/category/books/cat1_3/page-3.html"] == 1
+    assert not completed["Cat 1"].complete
+    assert scraper.retry_queue == []
+
+
+def test_scrape_all_no_espelho_com_erros(monkeypatch):
+    """Testa o crawl completo contra o espelho offline com injeção de erros."""
+    import httpx
+    from src.core.config import settings
+    from scripts.mirror import MirrorConfig, create_mirror_app, mirror_totals
+
+    config = MirrorConfig(books=300, categories=7, error_rate=0.05, seed=42)
+    monkeypatch.setattr(settings, "SCRAPE_URL", "http://mirror")
+    monkeypatch.setattr(settings, "RETRY_DELAY", 0.001)
+    app = create_mirror_app(config)
+
+    scraper = make_scraper(None)
+    scraper.build_client = lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://mirror")
+
+    books = asyncio.run(scraper.scrape_all())
+    pages, total = mirror_totals(config)
+
+    assert len(books) == total
+    assert len({b.source_url for b in books}) == total
+    assert all(b.source_url.startswith("http://mirror/catalogue/") for b in books)
+    assert app.state.requests > pages + 1
+
+
+def test_capas_deduplicadas_e_revalidadas(tmp_path, monkeypatch):
+    """Testa o download das capas: conteúdo repetido gravado uma vez e 304 na execução seguinte."""
+    import httpx
+    from src.core.config import settings
+    from scripts.mirror import COVER_VARIANTS, MirrorConfig, create_mirror_app
+
+    monkeypatch.setattr(settings, "SCRAPE_URL", "http://mirror")
+    monkeypatch.setattr(settings, "SCRAPE_IMAGES_ENABLED", True)
+    monkeypatch.setattr(settings, "SCRAPE_IMAGES_PATH", tmp_path)
+    app = create_mirror_app(MirrorConfig(books=120, categories=3))
+
+    def scrape():
+        scraper = make_scraper(None)
+        scraper.build_client = lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+        return scraper, asyncio.run(scraper.scrape_all())
+
+    scraper, books = scrape()
+    assert all(b.image_hash for b in books)
+    assert scraper.image_stats.downloaded == 120
+    stored = list(tmp_path.glob("*/*.jpg"))
+    assert len(stored) == len({b.image_hash for b in books}) <= COVER_VARIANTS
+
+    scraper, again = scrape()
+    assert scraper.image_stats.downloaded == 0
+    assert scraper.image_stats.not_modified == 120
+    assert [b.image_hash for b in again] == [b.image_hash for b in books]
+
+
+def test_workers_dividem_categorias_pela_fila(isolated_db, tmp_path, monkeypatch):
+    """Testa dois workers consumindo a mesma fila de categorias sem repetir nenhuma."""
+    import httpx
+    from src.core.config import settings
+    from src.core.database import SessionLocal
+    from src.models.book import BookModel
+    from scripts.mirror import MirrorConfig, create_mirror_app, mirror_totals
+    from src.scraper.sharding import ShardQueue, run_worker
+
+    config = MirrorConfig(books=200, categories=6)
+    monkeypatch.setattr(settings, "SCRAPE_URL", "http://mirror")
+    monkeypatch.setattr(settings, "SCRAPE_CONCURRENCY", 2)
+    app = create_mirror_app(config)
+
+    def mirror_scraper():
+        scraper = make_scraper(None)
+        scraper.build_client = lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://mirror")
+        return scraper
+
+    async def run():
+        scraper = mirror_scraper()
+        async with scraper.build_client() as client:
+            categories = await scraper.get_categories(client)
+        queue = ShardQueue(tmp_path / "shards.sqlite3")
+        run_id = queue.create_run(categories)
+        await asyncio.gather(*(run_worker(queue, run_id, f"w{i}", mirror_scraper()) for i in range(2)))
+        return queue.tasks(run_id)
+
+    tasks = asyncio.run(run())
+    assert all(task.status == ShardQueue.DONE and task.complete for task in tasks)
+    assert {task.worker for task in tasks} == {"w0", "w1"}
+    pages, total = mirror_totals(config)
+    assert sum(task.pages for task in tasks) == pages
+    assert sum(task.books for task in tasks) == total
+
+    db = SessionLocal()
+    try:
+        assert db.query(BookModel).filter(BookModel.source_url.like("http://mirror/%")).count() == total
+    finally:
+        db.close()
+
+
+def test_telemetria_gravada_com_a_execucao(isolated_db, monkeypatch):
+    """Testa a telemetria do crawl (fetches, retries, parsing, gravação) salva na execução."""
+    import httpx
+    from src.core.config import settings
+    from src.core.database import SessionLocal
+    from scripts.mirror import MirrorConfig, create_mirror_app, mirror_totals
+    from src.scraper.pipeline import ScrapePipeline
+    from src.services.scrape_metrics_service import ScrapeMetricsService
+
+    config = MirrorConfig(books=150, categories=4, error_rate=0.1, seed=7)
+    monkeypatch.setattr(settings, "SCRAPE_URL", "http://mirror")
+    monkeypatch.setattr(settings, "RETRY_DELAY", 0.001)
+    scraper = make_scraper(None)
+    app = create_mirror_app(config)
+    scraper.build_client = lambda: httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+
+    result = asyncio.run(ScrapePipeline(scraper, batch_size=50).run())
+    pages, total = mirror_totals(config)
+
+    db = SessionLocal()
+    try:
+        run = ScrapeMetricsService(db).get_metrics(limit=1)["runs"][0]
+    finally:
+        db.close()
+    telemetry = run["telemetry"]
+    assert run["run_id"] == result.run_id
+    assert telemetry["fetches"] == app.state.requests
+    assert telemetry["retries"] > 0 and telemetry["bytes_downloaded"] > 0
+    assert telemetry["fetch_latency"]["count"] == telemetry["fetches"]
+    assert telemetry["parse_time"]["count"] == pages
+    assert telemetry["pages"] == pages and telemetry["books"] == total
+    assert telemetry["db_write"]["rows"] == total
+    assert len(telemetry["categories"]) == 4
+    assert len(run["slowest_categories"]) == 4
+
+
+def test_varios_sites_com_orcamento_por_site(monkeypatch):
+    """Testa o crawl de dois sites na mesma execução, respeitando o orçamento de concorrência de cada um."""
+    import httpx
+    from src.core.config import settings
+    from scripts.mirror import MirrorConfig, create_mirror_app, mirror_totals
+
+    first, second = MirrorConfig(books=120, categories=3), MirrorConfig(books=90, categories=4, latency_ms=5)
+    first_app, second_app = create_mirror_app(first), create_mirror_app(second)
+    in_flight = {"now": 0, "max": 0}
+
+    async def counted(scope, receive, send):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            await second_app(scope, receive, send)
+        finally:
+            in_flight["now"] -= 1
+
+    monkeypatch.setattr(settings, "SCRAPE_SITES", "books.toscrape=http://site-a, books.toscrape=http://site-b")
+    scraper = make_scraper(None)
+    scraper.sites[1].max_concurrency = 2
+    scraper.build_client = lambda: httpx.AsyncClient(mounts={
+        "http://site-a": httpx.ASGITransport(app=first_app),
+        "http://site-b": httpx.ASGITransport(app=counted),
+    })
+
+    books = asyncio.run(scraper.scrape_all())
+
+    assert len(books) == mirror_totals(first)[1] + mirror_totals(second)[1]
+    assert len({b.source_url for b in books}) == len(books)
+    from_second = [b for b in books if b.source_url.startswith("http://site-b/")]
+    assert len(from_second) == 90
+    assert all(b.image_url.startswith("http://site-b/") for b in from_second)
+    # Nomes repetidos no segundo site recebem o host: a remoção por categoria não mistura sites
+    assert len(scraper.categories) == 7
+    assert {b.category for b in from_second} >= {f"{name} (site-b)" for name in list(scraper.categories)[:3]}
+    assert 1 < in_flight["max"] <= 2
+    assert scraper.scheduler.stats.duplicates == 0
+
+
+def test_fronteira_descarta_urls_repetidas():
+    """Testa o filtro de Bloom da fronteira e a navegação que volta a uma página já visitada."""
+    import httpx
+    from src.scraper.bloom import BloomFilter
+
+    bloom = BloomFilter(capacity=10000, error_rate=1e-4)
+    urls = [f"http://site/catalogue/page-{i}.html" for i in range(10000)]
+    assert all(bloom.add(url) for url in urls)
+    assert not any(bloom.add(url) for url in urls)
+    assert all(url in bloom for url in urls) and len(bloom) == 10000
+    assert sum(f"http://outro/{i}" in bloom for i in range(10000)) < 10
+    assert bloom.nbytes < 30 * 1024
+
+    async def handler(request):
+        # A página 2 aponta de volta para a primeira: o crawl não pode entrar em ciclo
+        name = request.url.path.rsplit("/", 1)[-1]
+        page = 1 if name == "index.html" else 2
+        nxt = "page-2.html" if page == 1 else "index.html"
+        listing = fake_listing("ciclo", page, 2, pager=False).replace("</ul>", f'<li class="next"><a href="{nxt}">next</a></li></ul>', 1)
+        return httpx.Response(200, text=listing)
+
+    scraper = make_scraper(handler)
+
+    async def run():
+        async with scraper.build_client() as client:
+            return await scraper.scrape_category(client, "Ciclo", "http://fake/catalogue/category/books/ciclo_2/index.html")
+
+    books = asyncio.run(run())
+    assert len(books) == 6
+    assert scraper.scheduler.stats.duplicates == 1
+
+
+def test_pagina_recusada_pela_fronteira_nao_remove_livros(isolated_db, monkeypatch):
+    """Testa que uma categoria com listagem já vista na execução não é tratada como completa."""
+    import httpx
+    from src.core.config import settings
+    from src.scraper.pipeline import ScrapePipeline
+    from src.scraper.scraper import CategoryCompleted
+    from src.core.database import SessionLocal
+    from src.models.book import BookModel
+
+    monkeypatch.setattr(settings, "SCRAPE_CONCURRENCY", 1)
+    asyncio.run(ScrapePipeline(make_scraper(site_handler(categories=2, total=2)), staged=False).run())
+
+    # A Cat 1 passa a apontar para a listagem da Cat 0: a fronteira recusa a URL repetida
+    serve = site_handler(categories=2, total=2)
+
+    async def handler(request):
+        response = await serve(request)
+        if request.url.path.count("/") < 3:
+            return httpx.Response(200, text=response.text.replace("cat1_3", "cat0_2"))
+        return response
+
+    scraper = make_scraper(handler)
+    events = []
+
+    async def record(pages):
+        async for event in pages:
+            events.append(event)
+            yield event
+
+    result = asyncio.run(ScrapePipeline(scraper, staged=False).run(record(scraper.iter_pages())))
+    completed = {e.category: e for e in events if isinstance(e, CategoryCompleted)}
+
+    assert completed["Cat 0"].complete and not completed["Cat 1"].complete
+    assert scraper.skipped_pages == {"Cat 1": 1}
+    assert result.changes.deleted == 0
+    db = SessionLocal()
+    try:
+        assert db.query(BookModel).filter(BookModel.category == "Cat 1").count() == 6
+    finally:
+        db.close()
+
+
+def test_execucao_interrompida_e_retomada(isolated_db, monkeypatch):
+    """Testa que uma execução interrompida retoma sem raspar de novo o que já foi gravado."""
+    import pytest
+    from src.scraper.pipeline import ScrapePipeline
+    from src.scraper.checkpoint import RunCheckpoint
+    from src.core.database import SessionLocal
+    from src.models.book import BookModel
+    from src.models.scrape_run import ScrapeRunModel
+
+    serve = site_handler(categories=3, total=2)
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url.path)
+        return await serve(request)
+
+    # Simula a queda do processo logo após a primeira categoria concluída
+    original = ScrapePipeline._finish_category
+
+    async def crash(self, event):
+        await original(self, event)
+        raise RuntimeError("instância reciclada")
+
+    monkeypatch.setattr(ScrapePipeline, "_finish_category", crash)
+    pipeline = ScrapePipeline(make_scraper(handler), batch_size=1)
+    with pytest.raises(RuntimeError):
+        asyncio.run(pipeline.run())
+    run_id = pipeline.checkpoint.run_id
+    done = set(pipeline.checkpoint.done_categories)
+    assert len(done) == 1
+    monkeypatch.setattr(ScrapePipeline, "_finish_category", original)
+
+    requests.clear()
+    result = asyncio.run(ScrapePipeline(make_scraper(handler), batch_size=1, resume=True).run())
+    assert result.run_id == run_id and result.resumed
+
+    # A categoria concluída não é buscada de novo
+    slug = {"Cat 0": "cat0_2", "Cat 1": "cat1_3", "Cat 2": "cat2_4"}[done.pop()]
+    assert not [path for path in requests if slug in path]
+
+    db = SessionLocal()
+    try:
+        assert db.query(BookModel).count() == 18
+        assert db.query(ScrapeRunModel).filter(ScrapeRunModel.id == run_id).one().status == RunCheckpoint.COMPLETED
+    finally:
+        db.close()
+
+
+def test_retomada_ignora_execucao_ativa(isolated_db):
+    """Testa que --resume não assume uma execução ativa em outro processo, apenas as falhas ou abandonadas."""
+    import pytest
+    from datetime import datetime, timedelta
+    from src.models.scrape_run import ScrapeRunModel
+    from src.scraper.checkpoint import RunCheckpoint
+
+    active = RunCheckpoint.open().run_id
+    assert not RunCheckpoint.open(resume=True).resumed
+    with pytest.raises(RuntimeError):
+        RunCheckpoint.open(resume=active)
+
+    # Sem checkpoint há mais de SCRAPE_RUN_STALE_AFTER: o processo que a executava caiu
+    db = isolated_db()
+    try:
+        db.query(ScrapeRunModel).filter(ScrapeRunModel.id == active).update(
+            {"updated_at": datetime.utcnow() - timedelta(hours=1)}
+        )
+        db.commit()
+    finally:
+        db.close()
+    checkpoint = RunCheckpoint.open(resume=active)
+    assert checkpoint.resumed and checkpoint.run_id == active
+
+    # Execução que falhou é retomada pela busca da última interrompida
+    checkpoint.finish(RunCheckpoint.FAILED)
+    checkpoint = RunCheckpoint.open(resume=True)
+    assert checkpoint.resumed and checkpoint.run_id == active
+
+
+def test_troca_atomica_do_catalogo_e_rollback(isolated_db, monkeypatch):
+    """Testa que a API lê a versão anterior até a troca e que o rollback a restaura."""
+    from src.scraper.pipeline import ScrapePipeline
+    from src.repository.dataset_swap import DatasetSwap, PREVIOUS_TABLE, LIVE_TABLE
+    from src.repository.sqlalchemy_repository import SQLAlchemyBookRepository
+    from src.core.database import SessionLocal, engine
+    from src.models.book import BookModel
+
+    monkeypatch.setattr("src.core.config.settings.DB_STAGED_SWAP", True)
+    result = asyncio.run(ScrapePipeline(make_scraper(site_handler(categories=3, total=2)), batch_size=4).run())
+    assert result.swapped
+
+    db = SessionLocal()
+    try:
+        ids = {b.source_url: b.id for b in db.query(BookModel)}
+    finally:
+        db.close()
+    assert len(ids) == 18
+
+    # Durante a ingestão, as leituras continuam vendo o catálogo completo anterior
+    seen = []
+    original = ScrapePipeline._finish_category
+
+    async def observe(self, event):
+        await original(self, event)
+        db = SessionLocal()
+        try:
+            seen.append(db.query(BookModel).count())
+        finally:
+            db.close()
+
+    monkeypatch.setattr(ScrapePipeline, "_finish_category", observe)
+    result = asyncio.run(ScrapePipeline(make_scraper(site_handler(categories=2, total=1)), batch_size=4).run())
+    assert seen and set(seen) == {18}
+    assert result.swapped
+
+    swap = DatasetSwap(engine)
+    db = SessionLocal()
+    try:
+        assert {b.source_url: b.id for b in db.query(BookModel)}.items() <= ids.items()
+    finally:
+        db.close()
+    assert swap.versions() == {LIVE_TABLE: 6, PREVIOUS_TABLE: 18}
+
+    def top_hit(title):
+        db = SessionLocal()
+        try:
+            books = SQLAlchemyBookRepository(db).search(title, limit=1)
+            return books[0].title if books else None
+        finally:
+            db.close()
+
+    # Rollback restaura a versão anterior (e o índice de busca); repetir desfaz o rollback
+    assert top_hit("cat2_4 02 1") != "cat2_4 02 1"
+    assert swap.rollback()
+    assert swap.versions() == {LIVE_TABLE: 18, PREVIOUS_TABLE: 6}
+    assert top_hit("cat2_4 02 1") == "cat2_4 02 1"
+    assert swap.rollback()
+    assert swap.versions()[LIVE_TABLE] == 6
+    assert top_hit("cat0_2 01 2") == "cat0_2 01 2"
+
+
+def test_staging_de_execucao_interrompida_e_mantida(isolated_db, monkeypatch):
+    """Testa que outra execução preserva a staging de uma interrompida e que, sem ela, a retomada recomeça."""
+    import pytest
+    from src.core.database import engine
+    from src.models.book import BookModel
+    from src.repository.dataset_swap import DatasetSwap, staging_table_name
+    from src.scraper.pipeline import ScrapePipeline
+
+    serve = site_handler(categories=3, total=2)
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url.path)
+        return await serve(request)
+
+    original = ScrapePipeline._finish_category
+
+    async def crash(self, event):
+        await original(self, event)
+        raise RuntimeError("instância reciclada")
+
+    monkeypatch.setattr(ScrapePipeline, "_finish_category", crash)
+    interrupted = ScrapePipeline(make_scraper(handler), batch_size=1)
+    with pytest.raises(RuntimeError):
+        asyncio.run(interrupted.run())
+    run_id = interrupted.checkpoint.run_id
+    monkeypatch.setattr(ScrapePipeline, "_finish_category", original)
+
+    # Uma nova execução completa no meio não descarta a staging da interrompida
+    assert asyncio.run(ScrapePipeline(make_scraper(serve), batch_size=4).run()).swapped
+    swap = DatasetSwap(engine)
+    assert swap.staging_tables() == [staging_table_name(run_id)]
+
+    # Sem a staging, a retomada recomeça: nenhuma categoria é pulada
+    swap.discard(staging_table_name(run_id))
+    requests.clear()
+    result = asyncio.run(ScrapePipeline(make_scraper(handler), batch_size=1, resume=run_id).run())
+    assert result.run_id == run_id and result.resumed and result.swapped
+    assert {path.split("/")[-2] for path in requests if "/category/" in path} == {"cat0_2", "cat1_3", "cat2_4"}
+    db = isolated_db()
+    try:
+        assert db.query(BookModel).count() == 18
+    finally:
+        db.close()
+
+
+def test_staging_abandonada_e_descartada(isolated_db, monkeypatch):
+    """Testa que prepare descarta staging sem dono, superadas ou expiradas e preserva as das execuções ativas."""
+    from datetime import datetime, timedelta
+    from src.core.config import settings
+    from src.core.database import engine
+    from src.models.scrape_run import ScrapeRunModel
+    from src.repository.dataset_swap import DatasetSwap, book_table_model, staging_table_name
+    from src.scraper.checkpoint import RunCheckpoint
+
+    monkeypatch.setattr(settings, "DB_STAGING_TTL", 600.0)
+    swap = DatasetSwap(engine)
+    runs = ["ativa", "interrompida", "superada", "expirada"]
+    for run_id in runs:
+        swap.prepare(RunCheckpoint.register(run_id, RunCheckpoint.SHARDED).run_id)
+    # Staging sem execução registrada (ex.: de uma versão anterior)
+    book_table_model(staging_table_name("semdono")).__table__.create(engine)
+
+    now = datetime.utcnow()
+    states = {
+        "ativa": ("running", now - timedelta(hours=2), now),
+        "interrompida": ("failed", now - timedelta(minutes=30), now - timedelta(minutes=5)),
+        "superada": ("failed", now - timedelta(hours=2), now - timedelta(minutes=90)),
+        "expirada": ("failed", now - timedelta(minutes=50), now - timedelta(minutes=40)),
+    }
+    db = isolated_db()
+    try:
+        for run_id, (status, started_at, updated_at) in states.items():
+            db.query(ScrapeRunModel).filter(ScrapeRunModel.id == run_id).update(
+                {"status": status, "started_at": started_at, "updated_at": updated_at}
+            )
+        db.add(ScrapeRunModel(id="concluida", status="completed", finished_at=now - timedelta(hours=1)))
+        db.commit()
+    finally:
+        db.close()
+
+    RunCheckpoint.register("nova", RunCheckpoint.EXPORT)
+    swap.prepare("nova")
+    assert swap.staging_tables() == sorted(staging_table_name(run_id) for run_id in ("ativa", "interrompida", "nova"))
+
+
+def test_job_manager_single_flight_e_cancelamento(isolated_db):
+    """Testa que disparos concorrentes reaproveitam o job ativo e que o cancelamento o encerra."""
+    from src.scraper.pipeline import ScrapePipeline
+    from src.services.scrape_job_service import ScrapeJob, ScrapeJobManager
+
+    serve = site_handler(categories=3, total=4)
+
+    async def slow(request):
+        await asyncio.sleep(0.05)
+        return await serve(request)
+
+    manager = ScrapeJobManager(lambda resume: ScrapePipeline(make_scraper(slow), resume=resume))
+    try:
+        job, created = manager.trigger("admin")
+        again, created_again = manager.trigger("outro-admin")
+        assert created and not created_again
+        assert again is job
+
+        # Aguarda algum progresso antes de cancelar
+        for _ in range(100):
+            if job.snapshot()["pages_fetched"]:
+                break
+            time.sleep(0.02)
+        snapshot = job.snapshot()
+        assert snapshot["status"] == ScrapeJob.RUNNING
+        assert snapshot["categories_total"] == 3
+        assert snapshot["pages_estimated"] == 12
+
+        manager.cancel(job.id)
+        assert job.wait(timeout=5)
+        assert job.status == ScrapeJob.CANCELLED
+
+        # Com o job anterior encerrado, um novo disparo cria outro job e conclui
+        second, created = manager.trigger("admin", resume=True)
+        assert created and second is not job
+        assert second.wait(timeout=10)
+        assert second.status == ScrapeJob.COMPLETED
+        assert second.snapshot()["run_id"] == snapshot["run_id"]
+    finally:
+        manager.shutdown()
+
+
+def test_agendador_executa_uma_vez_por_janela(isolated_db):
+    """Testa a concessão do scraping agendado: uma instância por janela e retomada após a queda do detentor."""
+    from datetime import datetime, timedelta
+    from src.scraper.pipeline import ScrapePipeline
+    from src.services.scrape_job_service import ScrapeJob, ScrapeJobManager
+    from src.services.scrape_scheduler_service import ScrapeLease, ScrapeScheduler
+
+    lease = ScrapeLease(name="teste", ttl=60, session_factory=isolated_db)
+    managers = [
+        ScrapeJobManager(lambda resume: ScrapePipeline(make_scraper(site_handler(categories=2, total=1)), resume=resume))
+        for _ in range(2)
+    ]
+    first, second = (
+        ScrapeScheduler(manager, lease, interval=3600, jitter=0, workers=0, holder=f"instancia-{i}")
+        for i, manager in enumerate(managers)
+    )
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    try:
+        # Mesma janela: só uma instância inicia o crawl
+        job = first.tick(start)
+        assert job is not None and not job.resume
+        assert second.tick(start + timedelta(seconds=1)) is None
+        assert job.wait(timeout=10) and job.status == ScrapeJob.COMPLETED
+        assert first.tick(start + timedelta(seconds=2)) is None
+        assert lease.state()["status"] == ScrapeJob.COMPLETED
+        assert second.tick(start + timedelta(seconds=3)) is None
+
+        # Próxima janela: o detentor cai sem concluir; a outra instância assume após a expiração
+        window = start + timedelta(hours=1)
+        assert lease.acquire("instancia-caida", first.slot(window), window) is not None
+        assert second.tick(window + timedelta(seconds=30)) is None
+        job = second.tick(window + timedelta(seconds=61))
+        assert job is not None and job.resume is True
+        assert not lease.renew("instancia-caida", window + timedelta(seconds=62))
+        assert lease.state()["holder"] == "instancia-1"
+        assert job.wait(timeout=10) and job.status == ScrapeJob.COMPLETED
+    finally:
+        for manager in managers:
+            manager.shutdown()
+
+
+def test_cache_http_revalida_com_304(tmp_path, monkeypatch):
+    """Testa que páginas não modificadas (304) não são baixadas nem reprocessadas."""
+    import httpx
+    from src.core.config import settings
+
+    monkeypatch.setattr(settings, "SCRAPE_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "SCRAPE_CACHE_PATH", tmp_path / "cache.sqlite3")
+    serve = site_handler(categories=2, total=3)
+
+    async def handler(request):
+        etag = f'"{request.url.path}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        response = await serve(request)
+        response.headers["ETag"] = etag
+        return response
+
+    first = make_scraper(handler)
+    books = asyncio.run(first.scrape_all())
+    assert first.cache_stats.hit_ratio == 0.0
+
+    second = make_scraper(handler)
+    parsed = []
+    original = second.backend.parse_listing
+    second.backend.parse_listing = lambda *args: parsed.append(args) or original(*args)
+    assert asyncio.run(second.scrape_all()) == books
+    assert second.cache_stats.hit_ratio == 1.0
+    assert parsed == []
+
+
+def test_arquivo_html_e_reparse(tmp_path, monkeypatch):
+    """Testa o arquivo de HTML (com deduplicação) e a reconstrução offline."""
+    from src.core.config import settings
+    from src.scraper.archive import RawArchive
+    from src.scraper.reparse import iter_archived_pages
+
+    monkeypatch.setattr(settings, "SCRAPE_ARCHIVE_ENABLED", True)
+    monkeypatch.setattr(settings, "SCRAPE_ARCHIVE_PATH", tmp_path / "archive")
+
+    books = asyncio.run(make_scraper(site_handler(categories=2, total=3)).scrape_all())
+
+    archive = RawArchive(tmp_path / "archive")
+    try:
+        # Conteúdo idêntico em outra URL não gera novo blob
+        entry = next(archive.iter_pages())
+        archive.store("http://fake/copia.html", archive.load(entry.content_hash), "Copia", 1)
+        assert archive.deduplicated == 1
+        assert len(list((tmp_path / "archive" / "blobs").rglob("*.*"))) == 6
+
+        async def reparse():
+            return [page async for page in iter_archived_pages(archive, "html.parser", workers=2)]
+
+        from src.scraper.scraper import ScrapedPage
+        pages = [
+            page for page in asyncio.run(reparse())
+            if isinstance(page, ScrapedPage) and page.category != "Copia"
+        ]
+    finally:
+        archive.close()
+
+    assert [book for page in pages for book in page.books] == books
+
+
+def test_reparse_usa_o_ultimo_crawl_completo(tmp_path, monkeypatch):
+    """Testa que o reparse ignora crawls incompletos e não traz de volta páginas que sumiram do site."""
+    import httpx
+    from src.core.config import settings
+    from src.scraper.archive import RawArchive
+    from src.scraper.reparse import iter_archived_pages
+    from src.scraper.scraper import ScrapedPage
+
+    monkeypatch.setattr(settings, "SCRAPE_ARCHIVE_ENABLED", True)
+    monkeypatch.setattr(settings, "SCRAPE_ARCHIVE_PATH", tmp_path / "archive")
+
+    def archived_pages():
+        archive = RawArchive(tmp_path / "archive")
+        try:
+            async def reparse():
+                return [event async for event in iter_archived_pages(archive, "html.parser", workers=1)]
+
+            return sorted((e.category, e.page) for e in asyncio.run(reparse()) if isinstance(e, ScrapedPage))
+        finally:
+            archive.close()
+
+    asyncio.run(make_scraper(site_handler(categories=3, total=2)).scrape_all())
+    full = [(f"Cat {i}", page) for i in range(3) for page in (1, 2)]
+    assert archived_pages() == full
+
+    # Crawl com uma página perdida: o reparse continua no último crawl completo
+    serve = site_handler(categories=2, total=2)
+
+    async def broken(request):
+        if request.url.path.endswith("cat1_3/page-2.html"):
+            return httpx.Response(404)
+        return await serve(request)
+
+    asyncio.run(make_scraper(broken).scrape_all())
+    assert archived_pages() == full
+
+    # Crawl completo com menos categorias e páginas: é ele que o reparse reconstrói
+    asyncio.run(make_scraper(site_handler(categories=2, total=1)).scrape_all())
+    assert archived_pages() == [("Cat 0", 1), ("Cat 1", 1)]
+    archive = RawArchive(tmp_path / "archive")
+    try:
+        crawls = archive._conn.execute("SELECT COUNT(*) FROM archive_crawls").fetchone()[0]
+    finally:
+        archive.close()
+    assert crawls == 1
+
+
+def test_copy_codifica_none_como_null():
+    """Testa o CSV do COPY: None vira \\N sem aspas e strings vazias continuam entre aspas."""
+    import csv
+    import io
+    from src.repository.sqlalchemy_repository import WRITE_COLUMNS, encode_copy_rows
+
+    row = dict.fromkeys(WRITE_COLUMNS)
+    row.update(title='Livro "A"', price=1.5, rating=3, availability=True, category="", description="linha 1\nlinha 2")
+    encoded = encode_copy_rows([row]).getvalue()
+    assert encoded == '"Livro ""A""",1.5,3,True,"",\\N,\\N,\\N,\\N,\\N,"linha 1\nlinha 2",\\N,\\N\n'
+
+    parsed = next(csv.reader(io.StringIO(encoded)))
+    assert parsed[WRITE_COLUMNS.index("stock_count")] == "\\N"
+    assert parsed[WRITE_COLUMNS.index("description")] == "linha 1\nlinha 2"
+
+
+def test_workers_dividem_o_orcamento_por_host(monkeypatch):
+    """Testa que N workers dividem a taxa e a concorrência por host em vez de multiplicá-las."""
+    from src.core.config import settings
+    from src.scraper.scraper import BookScraper
+
+    monkeypatch.setattr(settings, "SCRAPE_RATE_LIMIT", 8.0)
+    monkeypatch.setattr(settings, "SCRAPE_RATE_BURST", 4)
+    monkeypatch.setattr(settings, "SCRAPE_SITE_CONCURRENCY", 10)
+
+    single, shared = BookScraper(), BookScraper(share=4)
+    assert (single.rate_limiter.rate, single.rate_limiter.burst, single.scheduler.budget) == (8.0, 4, 10)
+    assert (shared.rate_limiter.rate, shared.rate_limiter.burst, shared.scheduler.budget) == (2.0, 1, 2)
+    assert {slot._value for slot in shared.scheduler._slots.values()} == {2}
+    # Orçamento menor que o número de workers: ainda uma requisição por worker
+    assert BookScraper(share=20).scheduler.budget == 1